@@ -0,0 +1,197 @@
+# backend/app/analytics.py
+from __future__ import annotations
+import argparse
+import asyncio
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+
+# Служебный bucket: сколько ответов заполнили вопрос (для fill rate)
+ANSWERED_BUCKET = "__answered__"
+REBUILD_CHUNK_SIZE = 2000
+UPSERT_CHUNK_SIZE = 500
+
+ChoiceOptions = Dict[str, Set[str]]
+RollupCounts = Counter  # (question_key, bucket) -> count
+
+
+def choice_options_from_brief(brief: Dict[str, Any]) -> ChoiceOptions:
+    """Варианты ответа по вопросам из сериализованного брифа (кэш responses)."""
+    return _choice_options((q["id"], q.get("options")) for step in brief["steps"] for q in step["questions"])
+
+
+async def load_choice_options(db: AsyncSession, brief_id: int) -> ChoiceOptions:
+    result = await db.execute(
+        select(models.Question.id, models.Question.options)
+        .join(models.Step, models.Question.step_id == models.Step.id)
+        .filter(models.Step.brief_id == brief_id)
+    )
+    return _choice_options(result.all())
+
+
+def _choice_options(questions: Iterable[Tuple[int, Optional[List[Any]]]]) -> ChoiceOptions:
+    return {str(question_id): {str(o) for o in options} for question_id, options in questions if options}
+
+
+def is_answered(value: Any) -> bool:
+    return value is not None and value != "" and value != [] and value != {}
+
+
+def answer_counts(answers: Dict[str, Any], choice_options: ChoiceOptions, counts: Optional[RollupCounts] = None) -> RollupCounts:
+    """Вклад одного ответа в счётчики. Варианты вне Question.options не считаются."""
+    counts = Counter() if counts is None else counts
+    for key, value in answers.items():
+        if not is_answered(value):
+            continue
+        counts[(key, ANSWERED_BUCKET)] += 1
+        allowed = choice_options.get(key)
+        if allowed:
+            values = value if isinstance(value, list) else [value]
+            for option in {str(v) for v in values} & allowed:
+                counts[(key, option)] += 1
+    return counts
+
+
+def utc_day(moment: Optional[datetime]) -> date:
+    if moment is None:
+        return datetime.utcnow().date()
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.date()
+
+
+# --- Запись агрегатов ---
+def _upsert_increment(db: AsyncSession, table, rows: List[Dict[str, Any]], index_elements: List[str]):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Rollup upsert is not supported for {dialect}")
+    stmt = insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={"count": table.c["count"] + stmt.excluded["count"]},
+    )
+
+
+async def apply_rollups(db: AsyncSession, brief_id: int, counts: RollupCounts, days: Counter) -> None:
+    """Увеличивает счётчики в текущей транзакции (commit делает вызывающий код).
+
+    Ключи сортируются, чтобы параллельные транзакции брали блокировки строк в одном
+    порядке и не попадали в deadlock.
+    """
+    rows = [
+        {"brief_id": brief_id, "question_key": key, "bucket": bucket, "count": n}
+        for (key, bucket), n in sorted(counts.items())
+    ]
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+        await db.execute(_upsert_increment(db, models.AnswerRollup.__table__, chunk, ["brief_id", "question_key", "bucket"]))
+
+    rows = [{"brief_id": brief_id, "day": day, "count": n} for day, n in sorted(days.items())]
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+        await db.execute(_upsert_increment(db, models.SubmissionDailyRollup.__table__, chunk, ["brief_id", "day"]))
+
+
+async def record_submission(
+    db: AsyncSession, brief_id: int, answers: Dict[str, Any], choice_options: ChoiceOptions, created_at: datetime
+) -> None:
+    """Вклад одного ответа в агрегаты; день — по created_at ответа, как в rebuild_rollups."""
+    await apply_rollups(db, brief_id, answer_counts(answers, choice_options), Counter({utc_day(created_at): 1}))
+
+
+async def rebuild_rollups(db: AsyncSession, brief_id: int) -> int:
+    """Полный пересчёт агрегатов брифа по истории ответов, пачками через серверный курсор.
+
+    Пересчёт заменяет агрегаты целиком, поэтому его стоит запускать, когда поток новых
+    ответов на бриф минимален. Возвращает количество обработанных ответов.
+    """
+    choice_options = await load_choice_options(db, brief_id)
+    counts: RollupCounts = Counter()
+    days: Counter = Counter()
+    result = await db.stream(
+        select(models.Submission.answers_data, models.Submission.created_at)
+        .filter(models.Submission.brief_id == brief_id)
+        .execution_options(yield_per=REBUILD_CHUNK_SIZE)
+    )
+    async for chunk in result.partitions(REBUILD_CHUNK_SIZE):
+        for answers, created_at in chunk:
+            answer_counts(answers or {}, choice_options, counts)
+        days.update(utc_day(created_at) for _, created_at in chunk)
+
+    await db.execute(delete(models.AnswerRollup).where(models.AnswerRollup.brief_id == brief_id))
+    await db.execute(delete(models.SubmissionDailyRollup).where(models.SubmissionDailyRollup.brief_id == brief_id))
+    await apply_rollups(db, brief_id, counts, days)
+    await db.commit()
+    return sum(days.values())
+
+
+# --- Чтение ---
+async def get_brief_analytics(db: AsyncSession, brief: Dict[str, Any]) -> Dict[str, Any]:
+    """Сборка аналитики из агрегатов: O(вопросов), без чтения самих ответов."""
+    brief_id = brief["id"]
+    daily = (await db.execute(
+        select(models.SubmissionDailyRollup.day, models.SubmissionDailyRollup.count)
+        .filter(models.SubmissionDailyRollup.brief_id == brief_id)
+        .order_by(models.SubmissionDailyRollup.day)
+    )).all()
+    rollups = (await db.execute(
+        select(models.AnswerRollup.question_key, models.AnswerRollup.bucket, models.AnswerRollup.count)
+        .filter(models.AnswerRollup.brief_id == brief_id)
+    )).all()
+
+    total = sum(count for _, count in daily)
+    by_question: Dict[str, Dict[str, int]] = {}
+    for key, bucket, count in rollups:
+        by_question.setdefault(key, {})[bucket] = count
+
+    questions = []
+    for step in brief["steps"]:
+        for question in step["questions"]:
+            buckets = by_question.get(str(question["id"]), {})
+            answered = buckets.get(ANSWERED_BUCKET, 0)
+            questions.append({
+                "question_id": question["id"],
+                "text": question["text"],
+                "question_type": question["question_type"],
+                "is_required": question["is_required"],
+                "answered": answered,
+                "fill_rate": answered / total if total else 0.0,
+                "option_counts": {option: buckets.get(str(option), 0) for option in question.get("options") or []},
+            })
+    return {
+        "brief_id": brief_id,
+        "total_submissions": total,
+        "submissions_per_day": [{"day": day, "count": count} for day, count in daily],
+        "questions": questions,
+    }
+
+
+# --- CLI: python -m app.analytics rebuild [--brief-id N] ---
+async def _rebuild_command(brief_id: Optional[int]) -> None:
+    from .database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        if brief_id is None:
+            brief_ids = (await db.execute(select(models.Brief.id).order_by(models.Brief.id))).scalars().all()
+        else:
+            brief_ids = [brief_id]
+        for current_id in brief_ids:
+            processed = await rebuild_rollups(db, current_id)
+            print(f"brief {current_id}: {processed} submissions")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пересчёт агрегатов аналитики по ответам")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--brief-id", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(_rebuild_command(args.brief_id))
@@ -1,7 +1,9 @@
 # backend/app/auth.py
 from __future__ import annotations
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -11,12 +13,19 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 # Импортируем все необходимые модули
 from . import crud, models, schemas, config # <-- Убедитесь, что config импортируется
+from .cache import principal_cache
 from .database import get_db
 
 # Используем переменные из конфига
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Хэши с другой стоимостью считаются устаревшими и пересчитываются при входе
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=config.BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
+# bcrypt отпускает GIL, поэтому отдельного пула потоков достаточно. Пул ограничен:
+# всплеск логинов занимает не больше PASSWORD_HASH_WORKERS ядер, остальные запросы
+# (и общий threadpool Starlette) продолжают обслуживаться
+_hash_executor = ThreadPoolExecutor(max_workers=config.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
 # --- ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ ---
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -24,6 +33,15 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Проверка пароля вне event loop. Второй элемент — новый хэш, если старый устарел."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     # Используем config.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -47,12 +65,16 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     except JWTError:
         raise credentials_exception
     
-    user = await crud.get_user_by_email(db, email=email)
-    if user is None:
-        raise credentials_exception
-    return user
+    # Сначала смотрим в кэш, затем делаем одну выборку колонок без загрузки брифов
+    principal = principal_cache.get(email)
+    if principal is None:
+        principal = await crud.get_principal_by_email(db, email=email)
+        if principal is None:
+            raise credentials_exception
+        principal_cache.set(email, principal)
+    return principal
 
-async def get_current_active_user(current_user: models.User = Depends(get_current_user)):
+async def get_current_active_user(current_user: schemas.Principal = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
\ No newline at end of file
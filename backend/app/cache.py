@@ -0,0 +1,96 @@
+# backend/app/cache.py
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from . import config
+
+
+class TTLCache:
+    """Небольшой in-process кэш с ограничением размера и временем жизни записей.
+
+    Кэш живёт внутри одного воркера, поэтому TTL — это верхняя граница того,
+    сколько устаревшие данные могут прожить в соседних воркерах.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+# Кэш авторизованных пользователей: subject токена (email) -> schemas.Principal.
+# Смена is_active в БД (отключение пользователя) вступает в силу не позже чем через TTL
+principal_cache = TTLCache(
+    maxsize=config.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=config.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+# --- Кэш брифов ---
+# Значение: (etag, json-байты). Ключ включает версию брифа и общее поколение кэша:
+# запись для устаревшей версии просто больше никогда не читается, поэтому чтение,
+# начавшееся до записи в БД, не может «вернуть» старые данные после инвалидации.
+brief_cache = TTLCache(
+    maxsize=config.BRIEF_CACHE_MAX_SIZE,
+    ttl=config.BRIEF_CACHE_TTL_SECONDS,
+)
+MAIN_BRIEF_KEY = "main"
+_brief_versions: Dict[int, int] = {}
+_generation = 0
+
+
+def brief_cache_key(brief_id: int) -> tuple:
+    return (brief_id, _generation, _brief_versions.get(brief_id, 0))
+
+
+def invalidate_brief(brief_id: int) -> None:
+    _brief_versions[brief_id] = _brief_versions.get(brief_id, 0) + 1
+    brief_cache.pop(MAIN_BRIEF_KEY)
+
+
+def invalidate_all_briefs() -> None:
+    global _generation
+    _generation += 1
+    brief_cache.clear()
+
+
+# --- Скомпилированные правила брифов ---
+# Ключ — (вид правил, ETag брифа). ETag — хэш содержимого, поэтому запись не может
+# устареть и не инвалидируется; TTL только освобождает память от брифов без трафика.
+compiled_brief_cache = TTLCache(
+    maxsize=config.BRIEF_CACHE_MAX_SIZE,
+    ttl=3600,
+)
+
+
+# --- Версии брифов: id версии -> (etag, json) ---
+# Версия после вставки не меняется, поэтому запись не инвалидируется и не истекает
+brief_version_cache = TTLCache(
+    maxsize=config.BRIEF_VERSION_CACHE_MAX_SIZE,
+    ttl=float("inf"),
+)
@@ -0,0 +1,101 @@
+# backend/app/cache_sync.py
+"""
+Сброс кэша брифов во всех воркерах через Postgres LISTEN/NOTIFY.
+
+Кэш брифов (cache.brief_cache) у каждого воркера gunicorn свой. Запись брифа в
+той же транзакции ставит NOTIFY в канал brief_cache (payload — id брифа или "*",
+если изменились все), Postgres доставляет его при COMMIT всем слушателям, и каждый
+воркер сбрасывает запись у себя. Воркер, сделавший запись, сбрасывает кэш и сам,
+сразу после COMMIT, не дожидаясь уведомления.
+
+Уведомления, пришедшие, пока соединение слушателя разорвано, не восстанавливаются,
+поэтому при каждом (пере)подключении кэш сбрасывается целиком; без соединения
+устаревание ограничено BRIEF_CACHE_TTL_SECONDS, как и раньше.
+
+В SQLite (тесты, локальный запуск в одном процессе) хватает локального сброса.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import config
+from .cache import invalidate_all_briefs, invalidate_brief
+
+logger = logging.getLogger("uvicorn.error")
+
+CHANNEL = "brief_cache"
+ALL_BRIEFS = "*"
+
+
+async def notify_brief_changed(db: AsyncSession, brief_id: Optional[int]) -> None:
+    """Ставит уведомление в текущую транзакцию (уходит при COMMIT); None — изменились все брифы."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    await db.execute(select(func.pg_notify(CHANNEL, ALL_BRIEFS if brief_id is None else str(brief_id))))
+
+
+def handle_notification(connection, pid: int, channel: str, payload: str) -> None:
+    if payload == ALL_BRIEFS:
+        invalidate_all_briefs()
+    else:
+        invalidate_brief(int(payload))
+
+
+class BriefCacheListener:
+    """Держит отдельное соединение с LISTEN brief_cache и переподключается при обрыве."""
+
+    def __init__(self, url: str, retry_seconds: float = 1.0, ping_seconds: float = 30.0):
+        self.url = url
+        self.retry_seconds = retry_seconds
+        self.ping_seconds = ping_seconds
+        self.connected = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.url.startswith("postgresql") and self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _dsn(self) -> str:
+        # asyncpg принимает обычный postgresql://, без имени драйвера SQLAlchemy
+        return make_url(self.url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+    async def _run(self) -> None:
+        import asyncpg
+
+        while True:
+            try:
+                connection = await asyncpg.connect(self._dsn())
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning("Brief cache listener cannot connect: %s", exc)
+                await asyncio.sleep(self.retry_seconds)
+                continue
+            try:
+                await connection.add_listener(CHANNEL, handle_notification)
+                # Всё, что менялось до подписки, могло пройти мимо этого воркера
+                invalidate_all_briefs()
+                self.connected = True
+                while True:
+                    await asyncio.sleep(self.ping_seconds)
+                    # Обрыв без закрытия сокета иначе не заметен
+                    await connection.fetchval("SELECT 1", timeout=self.ping_seconds)
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                logger.warning("Brief cache listener lost connection: %s", exc)
+            finally:
+                self.connected = False
+                connection.terminate()
+            invalidate_all_briefs()
+            await asyncio.sleep(self.retry_seconds)
+
+
+brief_cache_listener = BriefCacheListener(config.BRIEF_CACHE_LISTEN_URL or config.DATABASE_URL or "")
@@ -7,4 +7,75 @@ load_dotenv() # Загружает переменные из .env файла
 DATABASE_URL = os.getenv("DATABASE_URL")
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
\ No newline at end of file
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+# Кэш авторизованных пользователей (в рамках одного воркера)
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+
+# Кэш сериализованных брифов для публичных страниц
+BRIEF_CACHE_TTL_SECONDS = int(os.getenv("BRIEF_CACHE_TTL_SECONDS", "60"))
+BRIEF_CACHE_MAX_SIZE = int(os.getenv("BRIEF_CACHE_MAX_SIZE", "512"))
+# Соединение для LISTEN со сбросом кэша брифов во всех воркерах (app.cache_sync); пусто — DATABASE_URL.
+# За pgbouncer в режиме transaction LISTEN не работает — здесь нужен прямой адрес Postgres
+BRIEF_CACHE_LISTEN_URL = os.getenv("BRIEF_CACHE_LISTEN_URL", "")
+# Версии брифов неизменяемы и кэшируются без срока жизни, только с ограничением числа
+BRIEF_VERSION_CACHE_MAX_SIZE = int(os.getenv("BRIEF_VERSION_CACHE_MAX_SIZE", "1024"))
+
+# Пул рендеринга PDF: process | thread
+PDF_POOL_KIND = os.getenv("PDF_POOL_KIND", "process")
+PDF_POOL_WORKERS = int(os.getenv("PDF_POOL_WORKERS", "2"))
+PDF_POOL_MAX_QUEUE = int(os.getenv("PDF_POOL_MAX_QUEUE", "16"))
+PDF_RENDER_TIMEOUT_SECONDS = float(os.getenv("PDF_RENDER_TIMEOUT_SECONDS", "30"))
+
+# Дисковый кэш готовых PDF-отчётов
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "pdf_cache")
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Фоновые задачи выгрузки отчётов ZIP-архивом
+REPORT_JOBS_DIR = os.getenv("REPORT_JOBS_DIR", "report_jobs")
+REPORT_JOB_CONCURRENCY = int(os.getenv("REPORT_JOB_CONCURRENCY", str(PDF_POOL_WORKERS)))
+REPORT_JOBS_TTL_HOURS = int(os.getenv("REPORT_JOBS_TTL_HOURS", "24"))
+
+# Загрузка файлов
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+
+# Производные изображений (миниатюры и веб-версии загрузок)
+IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", "2"))
+
+# Хэширование паролей: стоимость bcrypt и пул потоков, чтобы не блокировать event loop
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+
+# Пул соединений с БД (на один воркер gunicorn)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "0"))
+# Общий бюджет соединений на все воркеры (0 — не используется); делится на WEB_CONCURRENCY
+DB_CONNECTION_BUDGET = int(os.getenv("DB_CONNECTION_BUDGET", "0"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "4"))
+
+# Старт воркера: create_all | verify (сверка ревизии Alembic) | skip
+DB_STARTUP_MODE = os.getenv("DB_STARTUP_MODE", "create_all")
+# Прогрев пула PDF при старте (в фоне); по умолчанию воркеры поднимаются при первом рендере
+PDF_POOL_WARM_UP = os.getenv("PDF_POOL_WARM_UP", "false").lower() in ("1", "true", "yes")
+
+# Доля запросов с подробным замером (SQL, сериализация, рендер) и заголовком Server-Timing
+INSTRUMENTATION_SAMPLE_RATE = float(os.getenv("INSTRUMENTATION_SAMPLE_RATE", "0.1"))
+
+# Приём ответов: sync — запись в запросе, batched — журнал на диске, очередь и запись пачками
+SUBMISSION_INGEST_MODE = os.getenv("SUBMISSION_INGEST_MODE", "sync")
+SUBMISSION_BATCH_SIZE = int(os.getenv("SUBMISSION_BATCH_SIZE", "200"))
+SUBMISSION_BATCH_MAX_WAIT_MS = int(os.getenv("SUBMISSION_BATCH_MAX_WAIT_MS", "50"))
+SUBMISSION_QUEUE_MAX = int(os.getenv("SUBMISSION_QUEUE_MAX", "10000"))
+SUBMISSION_SPOOL_DIR = os.getenv("SUBMISSION_SPOOL_DIR", "submission_spool")
+# Сколько ждать записи очереди при остановке воркера; остаток переносится из журнала при старте
+SUBMISSION_SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv("SUBMISSION_SHUTDOWN_TIMEOUT_SECONDS", "10"))
+
+# Черновики ответов: брошенные (без изменений дольше срока) удаляются при старте воркера
+DRAFT_TTL_DAYS = int(os.getenv("DRAFT_TTL_DAYS", "30"))
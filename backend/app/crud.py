@@ -1,13 +1,17 @@
 # backend/app/crud.py
 from __future__ import annotations
+import base64
 import uuid
-from typing import List, Union
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
 
-from sqlalchemy import select, update
+from sqlalchemy import String, bindparam, delete, func, insert, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from . import models, schemas
+from . import analytics, models, schemas, serializers
+from .cache_sync import notify_brief_changed
+from .cache import invalidate_brief, invalidate_all_briefs
 
 # --- Утилитарная функция для загрузки полного брифа ---
 def _get_brief_with_details_query(brief_id: int):
@@ -25,17 +29,40 @@ async def get_user_by_email(db: AsyncSession, email: str) -> Union[models.User,
     result = await db.execute(select(models.User).filter(models.User.email == email))
     return result.scalars().first()
 
+async def get_user_with_briefs_by_email(db: AsyncSession, email: str) -> Union[models.User, None]:
+    """Пользователь вместе с брифами, шагами и вопросами — для профиля."""
+    result = await db.execute(
+        select(models.User)
+        .options(selectinload(models.User.briefs).selectinload(models.Brief.steps).selectinload(models.Step.questions))
+        .filter(models.User.email == email)
+    )
+    return result.scalars().first()
+
+async def get_principal_by_email(db: AsyncSession, email: str) -> Union[schemas.Principal, None]:
+    """Лёгкий поиск пользователя для авторизации: одна выборка колонок без связей."""
+    result = await db.execute(
+        select(models.User.id, models.User.email, models.User.username, models.User.is_active)
+        .filter(models.User.email == email)
+    )
+    row = result.first()
+    return schemas.Principal(**row._mapping) if row else None
+
 async def create_user(db: AsyncSession, user: schemas.UserCreate, hashed_password: str) -> models.User:
     db_user = models.User(
         email=user.email,
         username=user.username,
-        hashed_password=hashed_password
+        hashed_password=hashed_password,
+        # У нового пользователя брифов нет: коллекция сразу загружена и не требует запроса
+        briefs=[],
     )
     db.add(db_user)
     await db.commit()
-    await db.refresh(db_user)
     return db_user
 
+async def update_user_password_hash(db: AsyncSession, user_id: int, hashed_password: str) -> None:
+    await db.execute(update(models.User).where(models.User.id == user_id).values(hashed_password=hashed_password))
+    await db.commit()
+
 # --- CRUD для Брифов ---
 async def create_brief(db: AsyncSession, brief: schemas.BriefCreate, owner_id: int) -> models.Brief:
     db_brief = models.Brief(
@@ -47,141 +74,421 @@ async def create_brief(db: AsyncSession, brief: schemas.BriefCreate, owner_id: i
                 title=step_data.title,
                 description=step_data.description,
                 order=step_index,
+                conditional_logic=_logic_value(step_data.conditional_logic),
                 questions=[
                     models.Question(
                         text=q.text,
                         question_type=q.question_type,
                         options=q.options,
                         is_required=q.is_required,
-                        order=q_idx
+                        order=q_idx,
+                        conditional_logic=_logic_value(q.conditional_logic),
                     ) for q_idx, q in enumerate(step_data.questions)
                 ]
             ) for step_index, step_data in enumerate(brief.steps)
         ]
     )
     db.add(db_brief)
+    await db.flush()
+    await notify_brief_changed(db, db_brief.id)
     await db.commit()
-    # После commit'а запрашиваем объект заново с полной загрузкой
-    result = await db.execute(_get_brief_with_details_query(db_brief.id))
-    return result.scalars().one()
+    # Новый бриф может стать главным, если у владельца ещё не было брифов
+    invalidate_brief(db_brief.id)
+    # Ответ API собирается из опубликованной версии (versions.publish), повторная выборка не нужна
+    return db_brief
 
-async def update_brief(db: AsyncSession, brief_id: int, brief_update: schemas.BriefCreate) -> Union[models.Brief, None]:
-    result = await db.execute(
-        select(models.Brief)
-        .options(selectinload(models.Brief.steps).selectinload(models.Step.questions))
-        .filter(models.Brief.id == brief_id)
-    )
-    db_brief = result.scalars().first()
-    if not db_brief:
-        return None
+_STEP_FIELDS = ("title", "description", "order", "conditional_logic")
+_QUESTION_FIELDS = ("step_id", "text", "question_type", "options", "is_required", "order", "conditional_logic")
 
-    # 1. Обновляем простые поля самого брифа
-    db_brief.title = brief_update.title
-    db_brief.description = brief_update.description
-
-    # 2. Удаляем все старые шаги. Благодаря cascade="all, delete-orphan" в модели,
-    # SQLAlchemy автоматически удалит все вопросы, принадлежащие этим шагам.
-    for step in db_brief.steps:
-        await db.delete(step)
-    
-    # Очищаем коллекцию в памяти
-    db_brief.steps = []
-    await db.flush()
+def _logic_value(logic: Optional[schemas.ConditionalLogic]) -> Optional[dict]:
+    return logic.model_dump() if logic is not None else None
 
-    # 3. Создаем новые шаги и вопросы из данных, пришедших с фронтенда
-    for step_index, step_data in enumerate(brief_update.steps):
-        new_step = models.Step(
-            title=step_data.title,
-            description=step_data.description,
-            order=step_index,
-            questions=[
-                models.Question(
-                    text=q.text,
-                    question_type=q.question_type,
-                    options=q.options,
-                    is_required=q.is_required,
-                    order=q_idx
-                ) for q_idx, q in enumerate(step_data.questions)
-            ]
+async def update_brief(db: AsyncSession, brief_id: int, brief_update: schemas.BriefCreate) -> bool:
+    """
+    Обновление брифа по разнице с текущим деревом шагов и вопросов.
+    Существующие шаги и вопросы сопоставляются по id: изменённые обновляются пачкой,
+    новые вставляются, пропавшие удаляются. Id сохранённых вопросов не меняются,
+    поэтому ключи answers_data в старых ответах остаются валидными.
+    Возвращает False, если брифа нет.
+    """
+    brief_row = (await db.execute(
+        select(models.Brief.title, models.Brief.description).filter(models.Brief.id == brief_id)
+    )).first()
+    if not brief_row:
+        return False
+
+    # Текущее дерево читаем колонками, без ORM-объектов и каскадов selectin
+    existing_steps = {
+        row.id: row for row in (await db.execute(
+            select(models.Step.id, *(getattr(models.Step, f) for f in _STEP_FIELDS))
+            .filter(models.Step.brief_id == brief_id)
+        )).all()
+    }
+    existing_questions = {
+        row.id: row for row in (await db.execute(
+            select(models.Question.id, *(getattr(models.Question, f) for f in _QUESTION_FIELDS))
+            .filter(models.Question.step_id.in_(list(existing_steps)))
+        )).all()
+    } if existing_steps else {}
+
+    # 1. Простые поля самого брифа
+    if (brief_row.title, brief_row.description) != (brief_update.title, brief_update.description):
+        await db.execute(
+            update(models.Brief).where(models.Brief.id == brief_id)
+            .values(title=brief_update.title, description=brief_update.description)
         )
-        db_brief.steps.append(new_step)
-    
+
+    # 2. Шаги: сопоставляем по id, новые вставляем одной пачкой, чтобы получить их id
+    step_updates, step_ids, new_steps = [], [], {}
+    for step_index, step_data in enumerate(brief_update.steps):
+        values = {
+            "title": step_data.title,
+            "description": step_data.description,
+            "order": step_index,
+            "conditional_logic": _logic_value(step_data.conditional_logic),
+        }
+        current = existing_steps.get(step_data.id)
+        # Повтор id (шаг продублирован в редакторе) — новый шаг, как и у вопросов ниже
+        if current is None or current.id in step_ids:
+            new_steps[step_index] = models.Step(brief_id=brief_id, **values)
+            step_ids.append(None)
+            continue
+        step_ids.append(current.id)
+        changed = _changed_fields(current, values, _STEP_FIELDS)
+        if changed:
+            step_updates.append({"_id": current.id, **changed})
+    if new_steps:
+        db.add_all(new_steps.values())
+        await db.flush()
+        for step_index, step in new_steps.items():
+            step_ids[step_index] = step.id
+
+    # 3. Вопросы: сопоставляем по id в пределах брифа (вопрос мог переехать в другой шаг)
+    question_updates, new_questions, kept_question_ids = [], [], set()
+    for step_index, step_data in enumerate(brief_update.steps):
+        for q_idx, q in enumerate(step_data.questions):
+            values = {
+                "step_id": step_ids[step_index],
+                "text": q.text,
+                "question_type": q.question_type,
+                "options": q.options,
+                "is_required": q.is_required,
+                "order": q_idx,
+                "conditional_logic": _logic_value(q.conditional_logic),
+            }
+            current = existing_questions.get(q.id)
+            if current is None or current.id in kept_question_ids:
+                new_questions.append(values)
+                continue
+            kept_question_ids.add(current.id)
+            changed = _changed_fields(current, values, _QUESTION_FIELDS)
+            if changed:
+                question_updates.append({"_id": current.id, **changed})
+
+    await _update_by_ids(db, models.Question.__table__, question_updates)
+    if new_questions:
+        await db.execute(insert(models.Question.__table__), new_questions)
+    removed_questions = existing_questions.keys() - kept_question_ids
+    if removed_questions:
+        await db.execute(delete(models.Question).where(models.Question.id.in_(removed_questions)))
+    removed_steps = existing_steps.keys() - set(step_ids)
+    if removed_steps:
+        await db.execute(delete(models.Step).where(models.Step.id.in_(removed_steps)))
+    await _update_by_ids(db, models.Step.__table__, step_updates)
+
+    await notify_brief_changed(db, brief_id)
     await db.commit()
-    result = await db.execute(_get_brief_with_details_query(brief_id))
-    return result.scalars().one()
+    invalidate_brief(brief_id)
+    return True
+
+def _changed_fields(current, values: dict, fields: Tuple[str, ...]) -> dict:
+    return {f: values[f] for f in fields if getattr(current, f) != values[f]}
+
+def _update_by_id(table):
+    """UPDATE ... WHERE id = :_id для executemany: SET берётся из ключей словарей."""
+    return update(table).where(table.c.id == bindparam("_id"))
+
+async def _update_by_ids(db: AsyncSession, table, rows: List[dict]) -> None:
+    """Обновляет только изменённые колонки; executemany требует одинаковых ключей,
+    поэтому строки группируются по набору колонок (при перестановке это один UPDATE order)."""
+    groups: Dict[Tuple[str, ...], List[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    for group in groups.values():
+        await db.execute(_update_by_id(table), group)
+
+async def get_brief_owner_id(db: AsyncSession, brief_id: int) -> Union[int, None]:
+    result = await db.execute(select(models.Brief.owner_id).filter(models.Brief.id == brief_id))
+    return result.scalar()
 
 async def get_brief_by_id(db: AsyncSession, brief_id: int):
     """Асинхронное получение брифа по ID с полной загрузкой."""
     result = await db.execute(_get_brief_with_details_query(brief_id))
     return result.scalars().first()
 
-async def get_user_briefs(db: AsyncSession, user_id: int) -> List[models.Brief]:
-    result = await db.execute(select(models.Brief).where(models.Brief.owner_id == user_id))
-    return result.scalars().all()
+async def get_brief_tree_rows(db: AsyncSession, brief_id: Optional[int] = None, owner_id: Optional[int] = None) -> Tuple[Sequence, Sequence]:
+    """Строки для serializers.brief_trees: брифы и шаги с вопросами (LEFT JOIN) — две выборки колонок."""
+    brief_filter = models.Brief.id == brief_id if brief_id is not None else models.Brief.owner_id == owner_id
+    briefs = (await db.execute(
+        select(*serializers.BRIEF.columns).where(brief_filter).order_by(models.Brief.id)
+    )).all()
+    if not briefs:
+        return briefs, []
+    steps = (await db.execute(
+        select(*serializers.step_rows_columns())
+        .select_from(models.Step)
+        .outerjoin(models.Question, models.Question.step_id == models.Step.id)
+        .where(models.Step.brief_id.in_([row.id for row in briefs]))
+        .order_by(models.Step.order, models.Step.id, models.Question.order, models.Question.id)
+    )).all()
+    return briefs, steps
+
+async def get_brief_trees(db: AsyncSession, brief_id: Optional[int] = None, owner_id: Optional[int] = None) -> List[dict]:
+    """Бриф по ID или все брифы владельца как словари схемы Brief, без ORM-объектов."""
+    return serializers.brief_trees(*await get_brief_tree_rows(db, brief_id=brief_id, owner_id=owner_id))
 
-async def get_main_brief(db: AsyncSession) -> Union[models.Brief, None]:
-    first_user_res = await db.execute(select(models.User).limit(1))
-    first_user = first_user_res.scalars().first()
-    if not first_user: return None
-    
+async def get_main_brief_id(db: AsyncSession) -> Union[int, None]:
+    """ID главного брифа первого пользователя (или любого его брифа) одним запросом."""
+    first_user_id = select(models.User.id).limit(1).scalar_subquery()
     result = await db.execute(
-        select(models.Brief).filter(models.Brief.owner_id == first_user.id, models.Brief.is_main == True)
+        select(models.Brief.id)
+        .filter(models.Brief.owner_id == first_user_id)
+        .order_by(models.Brief.is_main.desc())
+        .limit(1)
     )
-    main_brief = result.scalars().first()
-    if main_brief: return main_brief
-    
-    result = await db.execute(select(models.Brief).filter(models.Brief.owner_id == first_user.id).limit(1))
-    return result.scalars().first()
+    return result.scalar()
 
 async def set_main_brief(db: AsyncSession, brief_id: int, user_id: int):
     await db.execute(update(models.Brief).where(models.Brief.owner_id == user_id).values(is_main=False))
     await db.execute(update(models.Brief).where(models.Brief.id == brief_id, models.Brief.owner_id == user_id).values(is_main=True))
+    await notify_brief_changed(db, None)
     await db.commit()
+    # Флаг is_main меняется у всех брифов владельца
+    invalidate_all_briefs()
     return await get_brief_by_id(db, brief_id)
 
 async def delete_brief(db: AsyncSession, brief_id: int):
     db_brief = await get_brief_by_id(db, brief_id)
     if db_brief:
+        # Ответы удаляются одним запросом, а не загрузкой всех строк для каскада ORM
+        await db.execute(delete(models.Submission).where(models.Submission.brief_id == brief_id))
+        await db.execute(delete(models.SubmissionDraft).where(models.SubmissionDraft.brief_id == brief_id))
         await db.delete(db_brief)
+        await notify_brief_changed(db, brief_id)
         await db.commit()
+        invalidate_brief(brief_id)
     return db_brief
 
 # --- CRUD для Ответов ---
-async def create_submission(db: AsyncSession, submission: schemas.SubmissionCreate):
-    """Асинхронное создание ответа."""
+async def create_submission(
+    db: AsyncSession,
+    submission: schemas.SubmissionCreate,
+    choice_options: Optional[analytics.ChoiceOptions] = None,
+    brief_version_id: Optional[int] = None,
+):
+    """Асинхронное создание ответа. Агрегаты аналитики обновляются в той же транзакции."""
     session_id = str(uuid.uuid4())
     db_submission = models.Submission(
         brief_id=submission.brief_id, 
         session_id=session_id,
-        answers_data=submission.answers
+        answers_data=submission.answers,
+        brief_version_id=brief_version_id,
     )
     db.add(db_submission)
+    if choice_options is None:
+        choice_options = await analytics.load_choice_options(db, submission.brief_id)
+    # created_at приходит из INSERT (eager_defaults), повторный SELECT не нужен; по нему
+    # же считается день в агрегатах. Бриф в ответ подставляет вызывающий код из кэша
+    await db.flush()
+    await analytics.record_submission(db, submission.brief_id, submission.answers, choice_options, db_submission.created_at)
     await db.commit()
-    
-    # ИСПРАВЛЕНИЕ: Вместо refresh делаем явный запрос с загрузкой связи
+    return db_submission
+
+async def get_submission_rows_by_brief_id(db: AsyncSession, brief_id: int) -> Sequence:
+    """Колонки всех ответов брифа, без загрузки самого брифа."""
     result = await db.execute(
-        select(models.Submission)
-        .options(selectinload(models.Submission.brief))
-        .filter(models.Submission.id == db_submission.id)
+        select(*serializers.SUBMISSION_ROW.columns)
+        .filter(models.Submission.brief_id == brief_id)
+        .order_by(models.Submission.id)
     )
-    return result.scalars().first()
+    return result.all()
 
-async def get_submissions_by_brief_id(db: AsyncSession, brief_id: int):
-    """Асинхронное получение всех ответов для брифа."""
+async def get_submission_row_by_session_id(db: AsyncSession, session_id: str):
+    """Колонки ответа по ID сессии, без загрузки брифа и его связей."""
     result = await db.execute(
-        select(models.Submission)
-            # ИСПРАВЛЕНИЕ: Явно указываем, что нужно сразу загрузить связанный бриф
-            .options(selectinload(models.Submission.brief))
-            .filter(models.Submission.brief_id == brief_id)
+        select(*serializers.SUBMISSION_ROW.columns).filter(models.Submission.session_id == session_id)
     )
-    return result.scalars().all()
+    return result.first()
 
-async def get_submission_by_session_id(db: AsyncSession, session_id: str):
-    """Асинхронное получение ответа по ID сессии."""
+# --- Версии брифов ---
+async def ensure_brief_version(db: AsyncSession, brief_id: int, content_hash: str, body: bytes) -> int:
+    """id версии брифа с таким содержимым; вставляет её, если такой ещё нет.
+
+    Версии адресуются содержимым: параллельные вставки одной версии из разных
+    воркеров сходятся к одной строке (ON CONFLICT DO NOTHING).
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise NotImplementedError(f"Brief versions are not supported for {dialect}")
+    await db.execute(
+        dialect_insert(models.BriefVersion)
+        .values(brief_id=brief_id, content_hash=content_hash, body=body.decode("utf-8"))
+        .on_conflict_do_nothing(index_elements=["brief_id", "content_hash"])
+    )
+    version_id = (await db.execute(
+        select(models.BriefVersion.id)
+        .filter(models.BriefVersion.brief_id == brief_id, models.BriefVersion.content_hash == content_hash)
+    )).scalar_one()
+    await db.commit()
+    return version_id
+
+async def get_brief_version_bodies(db: AsyncSession, version_ids: Sequence[int]) -> List[Tuple[int, str]]:
+    result = await db.execute(
+        select(models.BriefVersion.id, models.BriefVersion.body).filter(models.BriefVersion.id.in_(version_ids))
+    )
+    return result.all()
+
+# --- Черновики ответов ---
+async def create_draft(db: AsyncSession, brief_id: int, answers: dict) -> models.SubmissionDraft:
+    db_draft = models.SubmissionDraft(session_id=str(uuid.uuid4()), brief_id=brief_id, answers_data=answers, version=0)
+    db.add(db_draft)
+    await db.commit()
+    return db_draft
+
+async def get_draft(db: AsyncSession, session_id: str):
+    result = await db.execute(
+        select(
+            models.SubmissionDraft.session_id,
+            models.SubmissionDraft.version,
+            models.SubmissionDraft.brief_id,
+            models.SubmissionDraft.answers_data,
+        ).filter(models.SubmissionDraft.session_id == session_id)
+    )
+    return result.first()
+
+async def get_draft_version(db: AsyncSession, session_id: str) -> Union[int, None]:
+    result = await db.execute(select(models.SubmissionDraft.version).filter(models.SubmissionDraft.session_id == session_id))
+    return result.scalar()
+
+def _merged_answers(db: AsyncSession, answers: dict):
+    """Выражение SET для слияния патча с answers_data на стороне БД: ключи со значением
+    null удаляются, остальные заменяются целиком (без рекурсивного слияния вложенных объектов)."""
+    column = models.SubmissionDraft.answers_data
+    changed = {key: value for key, value in answers.items() if value is not None}
+    removed = [key for key, value in answers.items() if value is None]
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+        merged = column.op("||")(bindparam("changed", changed, type_=JSONB))
+        if removed:
+            merged = merged.op("-")(bindparam("removed", removed, type_=ARRAY(String)))
+        return merged
+    if dialect == "sqlite":
+        merged = column
+        if changed:
+            args = []
+            for key, value in changed.items():
+                args += [f'$."{key}"', func.json(serializers.dumps(value).decode())]
+            merged = func.json_set(merged, *args)
+        if removed:
+            merged = func.json_remove(merged, *(f'$."{key}"' for key in removed))
+        return merged
+    raise NotImplementedError(f"Draft patch is not supported for {dialect}")
+
+async def patch_draft(db: AsyncSession, session_id: str, version: int, answers: dict) -> Union[int, None]:
+    """Сливает патч одним UPDATE, если версия совпала. Возвращает новую версию или None,
+    если черновика нет или его уже изменили (различает get_draft_version)."""
+    result = await db.execute(
+        update(models.SubmissionDraft)
+        .where(models.SubmissionDraft.session_id == session_id, models.SubmissionDraft.version == version)
+        .values(
+            answers_data=_merged_answers(db, answers),
+            version=models.SubmissionDraft.version + 1,
+            updated_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return version + 1 if result.rowcount == 1 else None
+
+async def finalize_draft(
+    db: AsyncSession, draft, answers: dict, choice_options: analytics.ChoiceOptions, brief_version_id: Optional[int] = None
+) -> Union[models.Submission, None]:
+    """Переносит черновик (строку get_draft) с ответами answers в ответы с тем же session_id одной транзакцией.
+
+    Возвращает None, если черновик изменили или отправили параллельно.
+    """
     result = await db.execute(
-        select(models.Submission)
-            # ИСПРАВЛЕНИЕ: Явно указываем, что нужно сразу загрузить связанный бриф
-            .options(selectinload(models.Submission.brief))
-            .filter(models.Submission.session_id == session_id)
+        delete(models.SubmissionDraft)
+        .where(models.SubmissionDraft.session_id == draft.session_id, models.SubmissionDraft.version == draft.version)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        await db.rollback()
+        return None
+    db_submission = models.Submission(
+        brief_id=draft.brief_id, session_id=draft.session_id, answers_data=answers, brief_version_id=brief_version_id
+    )
+    db.add(db_submission)
+    await db.flush()
+    await analytics.record_submission(db, draft.brief_id, answers, choice_options, db_submission.created_at)
+    await db.commit()
+    return db_submission
+
+async def delete_stale_drafts(db: AsyncSession, older_than: datetime) -> int:
+    result = await db.execute(delete(models.SubmissionDraft).where(models.SubmissionDraft.updated_at < older_than))
+    await db.commit()
+    return result.rowcount
+
+# --- Постраничная выдача ответов (keyset по created_at, id) ---
+SubmissionCursor = Tuple[datetime, int]
+
+def encode_submission_cursor(created_at: datetime, submission_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{submission_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_submission_cursor(cursor: str) -> SubmissionCursor:
+    """Разбирает курсор; при некорректном значении бросает ValueError."""
+    try:
+        created_at, submission_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(submission_id)
+    except (TypeError, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+def _submission_rows_query(brief_id: int, after: Optional[SubmissionCursor]):
+    # Выбираем только колонки ответа: без ORM-объектов и без вложенного брифа
+    query = (
+        select(*serializers.SUBMISSION_ROW.columns)
+        .filter(models.Submission.brief_id == brief_id)
+        .order_by(models.Submission.created_at.desc(), models.Submission.id.desc())
     )
-    return result.scalars().first()
\ No newline at end of file
+    if after is not None:
+        query = query.filter(tuple_(models.Submission.created_at, models.Submission.id) < tuple_(*after))
+    return query
+
+async def get_submissions_page(
+    db: AsyncSession, brief_id: int, limit: int, after: Optional[SubmissionCursor] = None, conditions: Sequence = (),
+) -> Tuple[Sequence, Optional[str]]:
+    """Одна страница ответов (от новых к старым) и курсор следующей страницы.
+    conditions — дополнительные условия отбора (поиск, app.search)."""
+    result = await db.execute(_submission_rows_query(brief_id, after).filter(*conditions).limit(limit + 1))
+    rows = result.all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_submission_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+async def count_submissions(db: AsyncSession, brief_id: int) -> int:
+    result = await db.execute(select(func.count(models.Submission.id)).filter(models.Submission.brief_id == brief_id))
+    return result.scalar()
+
+async def stream_submissions(db: AsyncSession, brief_id: int, after: Optional[SubmissionCursor] = None, chunk_size: int = 500) -> AsyncIterator[Sequence]:
+    """Отдаёт ответы пачками через серверный курсор, не держа всю выборку в памяти."""
+    result = await db.stream(_submission_rows_query(brief_id, after).execution_options(yield_per=chunk_size))
+    async for partition in result.partitions(chunk_size):
+        yield partition
@@ -1,9 +1,88 @@
 # backend/app/database.py
+from __future__ import annotations
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from . import config
 
-engine = create_async_engine(config.DATABASE_URL)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, считающий ожидание выдачи соединения и таймауты."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def connect(self):
+        started = time.monotonic()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            # Время выдачи включает ожидание свободного соединения, открытие нового и pre-ping
+            waited = time.monotonic() - started
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def recreate(self):
+        # При пересоздании (например, после dispose) счётчики переносятся в новый пул
+        new_pool = super().recreate()
+        new_pool.checkouts = self.checkouts
+        new_pool.checkout_timeouts = self.checkout_timeouts
+        new_pool.wait_seconds_total = self.wait_seconds_total
+        new_pool.wait_seconds_max = self.wait_seconds_max
+        return new_pool
+
+
+def pool_limits() -> Dict[str, int]:
+    """Размер пула одного воркера.
+
+    Если задан DB_CONNECTION_BUDGET, бюджет соединений делится поровну между
+    WEB_CONCURRENCY воркерами без overflow: все воркеры вместе гарантированно
+    не превысят бюджет (и max_connections Postgres). Из доли воркера вычитается
+    соединение слушателя сброса кэша брифов (app.cache_sync), если он работает.
+    """
+    if config.DB_CONNECTION_BUDGET > 0:
+        listener = 1 if (config.BRIEF_CACHE_LISTEN_URL or config.DATABASE_URL).startswith("postgresql") else 0
+        per_worker = max(config.DB_CONNECTION_BUDGET // max(config.WEB_CONCURRENCY, 1) - listener, 1)
+        return {"pool_size": per_worker, "max_overflow": 0}
+    return {"pool_size": config.DB_POOL_SIZE, "max_overflow": config.DB_MAX_OVERFLOW}
+
+
+def _engine_options() -> Dict[str, Any]:
+    if config.DATABASE_URL.startswith("sqlite"):
+        # Для SQLite (локальная разработка) оставляем пул по умолчанию
+        return {}
+    options: Dict[str, Any] = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        **pool_limits(),
+    }
+    if "asyncpg" in config.DATABASE_URL:
+        connect_args: Dict[str, Any] = {
+            # Кэш подготовленных выражений asyncpg и SQLAlchemy; 0 — для pgbouncer в режиме transaction
+            "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        }
+        if config.DB_COMMAND_TIMEOUT:
+            connect_args["command_timeout"] = config.DB_COMMAND_TIMEOUT
+        options["connect_args"] = connect_args
+    return options
+
+
+engine = create_async_engine(config.DATABASE_URL, **_engine_options())
 
 # Наш создатель сессий называется AsyncSessionLocal
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
@@ -17,4 +96,28 @@ async def get_db():
 
 async def init_db():
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(Base.metadata.create_all)
+
+
+def pool_metrics() -> Dict[str, Any]:
+    pool = engine.sync_engine.pool
+    metrics: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        metrics.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            # overflow() отрицателен, пока пул не заполнен до pool_size
+            overflow=max(pool.overflow(), 0),
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        metrics.update(
+            checkouts=pool.checkouts,
+            checkout_timeouts=pool.checkout_timeouts,
+            wait_seconds_total=round(pool.wait_seconds_total, 3),
+            wait_seconds_max=round(pool.wait_seconds_max, 3),
+            wait_seconds_avg=round(pool.wait_seconds_total / pool.checkouts, 4) if pool.checkouts else 0.0,
+        )
+    return metrics
@@ -0,0 +1,129 @@
+# backend/app/export.py
+from __future__ import annotations
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from . import crud
+
+# Колонка выгрузки: (ключ в answers_data, заголовок)
+Column = Tuple[str, str]
+
+FIXED_HEADERS = ["session_id", "created_at"]
+EXPORT_CHUNK_SIZE = 1000
+
+
+def brief_columns(brief: Dict[str, Any]) -> List[Column]:
+    """Колонки по вопросам брифа в порядке Step.order / Question.order.
+
+    Ключи answers_data, которых нет в текущем брифе (например, удалённые вопросы),
+    в выгрузку не попадают.
+    """
+    columns = []
+    for step in sorted(brief["steps"], key=lambda s: s["order"]):
+        # Вопросы уже отсортированы по Question.order в relationship
+        for question in step["questions"]:
+            columns.append((str(question["id"]), question["text"]))
+    return columns
+
+
+def headers(columns: Sequence[Column]) -> List[str]:
+    return FIXED_HEADERS + [title for _, title in columns]
+
+
+def _cell(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, list):
+        return ", ".join(str(_cell(v)) for v in value)
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _text_cell(value: Any) -> Any:
+    value = _cell(value)
+    return value if value is None or isinstance(value, str) else str(value)
+
+
+def rows_for_chunk(chunk: Sequence, columns: Sequence[Column]) -> List[List[Any]]:
+    result = []
+    for row in chunk:
+        answers = row.answers_data or {}
+        result.append(
+            [row.session_id, row.created_at.isoformat() if row.created_at else None]
+            + [_cell(answers.get(key)) for key, _ in columns]
+        )
+    return result
+
+
+# --- Форматы ---
+async def iter_csv(db: AsyncSession, brief_id: int, columns: Sequence[Column]) -> AsyncIterator[bytes]:
+    """CSV отдаётся по мере чтения курсора, пачками по EXPORT_CHUNK_SIZE строк."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM, чтобы Excel правильно открыл кириллицу
+    buffer.write("\ufeff")
+    writer.writerow(headers(columns))
+    yield buffer.getvalue().encode("utf-8")
+
+    async for chunk in crud.stream_submissions(db, brief_id=brief_id, chunk_size=EXPORT_CHUNK_SIZE):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows_for_chunk(chunk, columns))
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def write_xlsx(path: str, db: AsyncSession, brief_id: int, columns: Sequence[Column]) -> None:
+    """XLSX пишется во временный файл построчно (constant_memory), без сборки в памяти."""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "strings_to_urls": False})
+    sheet = workbook.add_worksheet("Submissions")
+    sheet.write_row(0, 0, headers(columns))
+    row_index = 1
+
+    def write_rows(rows, start):
+        for offset, values in enumerate(rows):
+            sheet.write_row(start + offset, 0, values)
+
+    try:
+        async for chunk in crud.stream_submissions(db, brief_id=brief_id, chunk_size=EXPORT_CHUNK_SIZE):
+            rows = rows_for_chunk(chunk, columns)
+            await run_in_threadpool(write_rows, rows, row_index)
+            row_index += len(rows)
+    finally:
+        await run_in_threadpool(workbook.close)
+
+
+async def write_parquet(path: str, db: AsyncSession, brief_id: int, columns: Sequence[Column]) -> None:
+    """Parquet пишется по row group на каждую пачку курсора."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    names = headers(columns)
+    # Заголовки-вопросы могут повторяться, поэтому в схеме колонки именуются по ключам
+    field_names = FIXED_HEADERS + [key for key, _ in columns]
+    schema = pa.schema(
+        [pa.field(name, pa.string()) for name in field_names],
+        metadata={"titles": json.dumps(names, ensure_ascii=False)},
+    )
+    writer = pq.ParquetWriter(path, schema)
+
+    def write_rows(rows):
+        arrays = [pa.array([_text_cell(r[i]) for r in rows], type=pa.string()) for i in range(len(field_names))]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+    try:
+        async for chunk in crud.stream_submissions(db, brief_id=brief_id, chunk_size=EXPORT_CHUNK_SIZE):
+            await run_in_threadpool(write_rows, rows_for_chunk(chunk, columns))
+    finally:
+        await run_in_threadpool(writer.close)
+
+
+FILE_WRITERS = {
+    "xlsx": (write_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "parquet": (write_parquet, "application/vnd.apache.parquet"),
+}
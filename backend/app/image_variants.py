@@ -0,0 +1,96 @@
+# backend/app/image_variants.py
+"""
+Производные версии загруженных изображений: миниатюра и веб-версия в WebP.
+
+Варианты лежат рядом с оригиналами в UPLOAD_DIR/_variants/<имя>.<вариант>.webp.
+Для новых загрузок они генерируются в фоне сразу после ответа; для старых —
+при первом запросе варианта, после чего берутся с диска.
+"""
+from __future__ import annotations
+import asyncio
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from . import config
+from .uploads import UPLOAD_DIR
+
+VARIANTS_DIR = UPLOAD_DIR / "_variants"
+# имя варианта -> (максимальный размер стороны, качество WebP)
+VARIANTS = {
+    "thumb": (320, 75),
+    "web": (1600, 82),
+}
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+
+# Генерация занимает CPU, поэтому одновременно работает ограниченное число потоков
+_slots = threading.BoundedSemaphore(config.IMAGE_VARIANT_WORKERS)
+_pending: Dict[Path, asyncio.Future] = {}
+
+
+def is_image(filename: str) -> bool:
+    return Path(filename).suffix.lower() in IMAGE_SUFFIXES
+
+
+def variant_path(filename: str, variant: str) -> Path:
+    return VARIANTS_DIR / f"{Path(filename).stem}.{variant}.webp"
+
+
+def variant_urls(filename: str) -> Dict[str, str]:
+    if not is_image(filename):
+        return {}
+    return {variant: f"/briefs/uploads/{variant}/{filename}" for variant in VARIANTS}
+
+
+def _render_variant(source: Path, target: Path, variant: str) -> bool:
+    from PIL import Image, ImageOps
+
+    max_side, quality = VARIANTS[variant]
+    with _slots:
+        try:
+            with Image.open(source) as image:
+                # Для JPEG декодер сразу уменьшает картинку — в разы быстрее полного декодирования
+                image.draft("RGB", (max_side, max_side))
+                image = ImageOps.exif_transpose(image)
+                if image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+                image.thumbnail((max_side, max_side))
+                target.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix=".part")
+                with os.fdopen(fd, "wb") as tmp:
+                    image.save(tmp, "WEBP", quality=quality, method=4)
+                os.replace(tmp_path, target)
+                return True
+        except (OSError, ValueError, Image.DecompressionBombError):
+            # Не изображение или повреждённый файл
+            return False
+
+
+def generate_all(filename: str) -> None:
+    """Фоновая генерация всех вариантов для новой загрузки (запускается в потоке)."""
+    source = UPLOAD_DIR / filename
+    for variant in VARIANTS:
+        target = variant_path(filename, variant)
+        if not target.exists():
+            _render_variant(source, target, variant)
+
+
+async def get_variant(filename: str, variant: str) -> Optional[Path]:
+    """Путь к варианту; при отсутствии генерирует его (параллельные запросы ждут одну генерацию)."""
+    source = UPLOAD_DIR / filename
+    target = variant_path(filename, variant)
+    if target.exists():
+        return target
+    if not await run_in_threadpool(source.is_file):
+        return None
+
+    pending = _pending.get(target)
+    if pending is None:
+        pending = asyncio.ensure_future(run_in_threadpool(_render_variant, source, target, variant))
+        _pending[target] = pending
+        pending.add_done_callback(lambda _: _pending.pop(target, None))
+    return target if await asyncio.shield(pending) else None
@@ -0,0 +1,369 @@
+# backend/app/ingest.py
+"""
+Пакетная запись ответов (SUBMISSION_INGEST_MODE=batched).
+
+Ответ принимается без обращения к БД: запись дописывается в журнал на диске
+(SUBMISSION_SPOOL_DIR), кладётся в ограниченную очередь, и респондент сразу получает
+session_id. Фоновая задача забирает из очереди до SUBMISSION_BATCH_SIZE ответов
+(или сколько накопилось за SUBMISSION_BATCH_MAX_WAIT_MS) и пишет их одной транзакцией:
+multi-row INSERT и агрегаты аналитики, сложенные по брифу.
+
+Журнал делится на сегменты; сегмент удаляется, когда все его записи закоммичены.
+Воркер держит flock на своих сегментах: сегмент создаётся под временным именем и
+получает имя *.jsonl только под блокировкой, поэтому перенос в другом воркере не
+видит сегмент, который ещё не заблокирован. Сегменты без блокировки (воркер остановлен
+или упал) при старте переносятся в БД; session_id, которые уже есть в базе,
+пропускаются, так что повторный перенос не создаёт дублей. Запись в журнал не
+делает fsync: принятый ответ переживает падение процесса, но не ОС.
+
+Пачка, которая не записывается MAX_ATTEMPTS раз подряд не из-за связи с БД (например,
+устаревший brief_version_id нарушает внешний ключ), делится пополам, пока плохие
+ответы не останутся по одному; такие ответы уходят в SUBMISSION_SPOOL_DIR/dead-letter
+и больше не повторяются, чтобы одна строка не останавливала запись всех остальных.
+Обрыв связи с БД повторяется без ограничения: очередь упирается в лимит и отвечает 503.
+"""
+from __future__ import annotations
+import asyncio
+import fcntl
+import logging
+import os
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import exc as sa_exc, insert, select
+
+from . import analytics, config, models, responses, serializers
+from .database import AsyncSessionLocal
+
+logger = logging.getLogger("uvicorn.error")
+
+RETRY_SECONDS = 1.0
+MAX_ATTEMPTS = 3
+REPLAY_CHUNK_SIZE = 1000
+# Не в корне журнала: перенос при старте берёт только *.jsonl верхнего уровня
+DEAD_LETTER_DIR_NAME = "dead-letter"
+# Сегмент до взятия блокировки; в перенос не попадает. Если воркер упал в этот момент,
+# остаётся пустой файл: записей в нём нет, переносить нечего
+_CREATING_SUFFIX = ".creating"
+
+
+class IngestQueueFull(Exception):
+    """Очередь записи заполнена: БД не успевает за потоком ответов."""
+
+
+def _is_transient(error: Exception) -> bool:
+    # Связь с БД: после восстановления та же пачка запишется
+    return isinstance(error, (OSError, asyncio.TimeoutError, sa_exc.OperationalError, sa_exc.InterfaceError)) or bool(
+        getattr(error, "connection_invalidated", False)
+    )
+
+
+class _Segment:
+    """Файл журнала; удаляется, когда все его записи закоммичены и он больше не пишется."""
+
+    def __init__(self, directory: Path):
+        name = f"{os.getpid()}-{uuid.uuid4().hex}"
+        creating = directory / f"{name}{_CREATING_SUFFIX}"
+        self.path = directory / f"{name}.jsonl"
+        self.fd = os.open(creating, os.O_CREAT | os.O_EXCL | os.O_WRONLY | os.O_APPEND, 0o644)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        os.rename(creating, self.path)
+        self.pending = 0
+        self.sealed = False
+
+    def close(self, remove: bool) -> None:
+        # Файл удаляется до снятия блокировки, чтобы его не подхватил перенос в другом воркере
+        if remove:
+            self.path.unlink(missing_ok=True)
+        os.close(self.fd)
+
+
+class _Entry:
+    __slots__ = ("row", "segment")
+
+    def __init__(self, row: Dict[str, Any], segment: _Segment):
+        self.row = row
+        self.segment = segment
+
+
+class SubmissionIngestor:
+    def __init__(self, spool_dir: str, batch_size: int, max_wait: float, max_queue: int):
+        self.spool_dir = Path(spool_dir)
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._segment: Optional[_Segment] = None
+        self._segments: Set[_Segment] = set()
+        self._flusher: Optional[asyncio.Task] = None
+        # Метрики
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.dead_lettered = 0
+        self.replayed = 0
+        self.flush_seconds_total = 0.0
+
+    # --- Приём ---
+    def submit(self, brief_id: int, answers: Dict[str, Any], brief_version_id: Optional[int] = None) -> str:
+        """Журналирует ответ и ставит его в очередь; возвращает session_id."""
+        self._start()
+        if self._queue.full():
+            self.rejected += 1
+            raise IngestQueueFull()
+        row = {
+            "brief_id": brief_id,
+            "session_id": str(uuid.uuid4()),
+            "answers_data": answers,
+            "brief_version_id": brief_version_id,
+            # Время приёма, а не записи: не сдвигается ни ожиданием в очереди, ни переносом журнала
+            "created_at": datetime.now(timezone.utc),
+        }
+        segment = self._segment
+        # Короткая дозапись в page cache; поток из пула обошёлся бы дороже самой записи
+        os.write(segment.fd, serializers.dumps(row) + b"\n")
+        segment.pending += 1
+        self._queue.put_nowait(_Entry(row, segment))
+        self.accepted += 1
+        return row["session_id"]
+
+    def _start(self) -> None:
+        if self._flusher is not None:
+            return
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._segment = self._open_segment()
+        self._flusher = asyncio.create_task(self._run())
+
+    def _open_segment(self) -> _Segment:
+        segment = _Segment(self.spool_dir)
+        self._segments.add(segment)
+        return segment
+
+    # --- Запись пачками ---
+    async def _next_batch(self) -> List[_Entry]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            if self._queue.empty():
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                batch.append(self._queue.get_nowait())
+        return batch
+
+    def _rotate(self) -> None:
+        # Новые ответы пишутся в новый сегмент, старый удалится после коммита своих записей
+        if self._segment.pending:
+            self._segment.sealed = True
+            self._segment = self._open_segment()
+
+    def _committed(self, batch: List[_Entry], written: bool = True) -> None:
+        for entry in batch:
+            segment = entry.segment
+            segment.pending -= 1
+            if segment.sealed and segment.pending == 0:
+                segment.close(remove=True)
+                self._segments.discard(segment)
+        if written:
+            self.written += len(batch)
+        for _ in batch:
+            self._queue.task_done()
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            self._rotate()
+            await self._write_until_done(batch)
+
+    async def _write_until_done(self, batch: List[_Entry]) -> None:
+        if await self._write_with_retries(batch):
+            return
+        if len(batch) == 1:
+            self._dead_letter(batch)
+            self._committed(batch, written=False)
+            return
+        # Плохие ответы ищутся делением пополам; остальные записываются
+        middle = len(batch) // 2
+        await self._write_until_done(batch[:middle])
+        await self._write_until_done(batch[middle:])
+
+    async def _write_with_retries(self, batch: List[_Entry]) -> bool:
+        """True — пачка закоммичена; False — MAX_ATTEMPTS ошибок не из-за связи с БД."""
+        deduplicate = False
+        attempts = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                await write_batch([entry.row for entry in batch], deduplicate=deduplicate)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                # Записи остаются в журнале и в памяти; очередь тем временем упрётся в лимит
+                self.failures += 1
+                # Коммит мог пройти до обрыва соединения: при повторе пропускаем уже записанное
+                deduplicate = True
+                if not _is_transient(error):
+                    attempts += 1
+                    if attempts >= MAX_ATTEMPTS:
+                        logger.warning("Submission batch of %d failed %d times: %s", len(batch), attempts, error)
+                        return False
+                logger.exception("Submission batch of %d failed, retrying", len(batch))
+                await asyncio.sleep(RETRY_SECONDS)
+                continue
+            self.batches += 1
+            self.flush_seconds_total += time.perf_counter() - started
+            self._committed(batch)
+            return True
+
+    def _dead_letter(self, batch: List[_Entry]) -> None:
+        directory = self.spool_dir / DEAD_LETTER_DIR_NAME
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{os.getpid()}-{uuid.uuid4().hex}.jsonl"
+        with open(path, "wb") as f:
+            f.writelines(serializers.dumps(entry.row) + b"\n" for entry in batch)
+        self.dead_lettered += len(batch)
+        logger.error("Moved %d unwritable submissions to %s", len(batch), path)
+
+    # --- Старт и остановка ---
+    async def replay_orphans(self) -> int:
+        """Переносит в БД сегменты, которые не держит ни один воркер. Возвращает число ответов."""
+        if not self.spool_dir.exists():
+            return 0
+        total = 0
+        for path in sorted(self.spool_dir.glob("*.jsonl")):
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue  # сегмент удалён владельцем после коммита
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # сегмент живого воркера
+                if os.fstat(fd).st_nlink == 0:
+                    continue  # владелец закоммитил и удалил сегмент между open и flock
+                rows = _read_segment(fd)
+                for start in range(0, len(rows), REPLAY_CHUNK_SIZE):
+                    await write_batch(rows[start:start + REPLAY_CHUNK_SIZE], deduplicate=True)
+                path.unlink(missing_ok=True)
+                total += len(rows)
+            finally:
+                os.close(fd)
+        if total:
+            self.replayed += total
+            logger.info("Replayed %d spooled submissions", total)
+        return total
+
+    async def drain(self) -> None:
+        """Ждёт, пока все принятые ответы будут записаны."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def shutdown(self, timeout: float) -> None:
+        """Дописывает очередь; что не успело, остаётся в журнале и переносится при следующем старте."""
+        if self._flusher is None:
+            return
+        try:
+            await asyncio.wait_for(self.drain(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Submission queue not drained on shutdown: %d left in spool", self._queue.qsize())
+        self._flusher.cancel()
+        await asyncio.gather(self._flusher, return_exceptions=True)
+        self._flusher = None
+        # Сегменты с незаписанными ответами остаются на диске: снимается только блокировка
+        for segment in self._segments:
+            segment.close(remove=segment.pending == 0)
+        self._segments.clear()
+        self._queue = None
+        self._segment = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "mode": config.SUBMISSION_INGEST_MODE,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "written": self.written,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dead_lettered": self.dead_lettered,
+            "replayed": self.replayed,
+            "flush_seconds_total": round(self.flush_seconds_total, 3),
+        }
+
+
+def _read_segment(fd: int) -> List[Dict[str, Any]]:
+    """Строки сегмента через уже заблокированный дескриптор (не по имени: файл могли удалить)."""
+    rows = []
+    with open(fd, "rb", closefd=False) as f:
+        for line in f:
+            try:
+                row = serializers.loads(line)
+            except ValueError:
+                # Оборванная последняя строка: ответ не был подтверждён респонденту
+                continue
+            row["created_at"] = datetime.fromisoformat(row["created_at"].replace("Z", "+00:00"))
+            # Журнал, записанный до появления версий брифов
+            row.setdefault("brief_version_id", None)
+            rows.append(row)
+    return rows
+
+
+async def write_batch(rows: List[Dict[str, Any]], deduplicate: bool = False) -> int:
+    """Одна транзакция: INSERT всех ответов и агрегаты аналитики по каждому брифу.
+
+    Ответы на удалённые брифы отбрасываются. deduplicate — пропустить session_id,
+    которые уже есть в базе (перенос журнала, повтор после ошибки).
+    """
+    async with AsyncSessionLocal() as db:
+        if deduplicate:
+            existing = set((await db.execute(
+                select(models.Submission.session_id)
+                .filter(models.Submission.session_id.in_([row["session_id"] for row in rows]))
+            )).scalars())
+            rows = [row for row in rows if row["session_id"] not in existing]
+
+        by_brief: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            by_brief[row["brief_id"]].append(row)
+
+        accepted = []
+        for brief_id, brief_rows in sorted(by_brief.items()):
+            # Бриф и варианты ответов берутся из кэша брифов, без запроса при попадании
+            brief = await responses.get_brief_json(db, brief_id)
+            if brief is None:
+                logger.warning("Dropping %d submissions for missing brief %d", len(brief_rows), brief_id)
+                continue
+            choice_options = analytics.choice_options_from_brief(serializers.loads(brief[1]))
+            counts: analytics.RollupCounts = Counter()
+            for row in brief_rows:
+                analytics.answer_counts(row["answers_data"], choice_options, counts)
+            days = Counter(analytics.utc_day(row["created_at"]) for row in brief_rows)
+            await analytics.apply_rollups(db, brief_id, counts, days)
+            accepted.extend(brief_rows)
+
+        if accepted:
+            await db.execute(insert(models.Submission), accepted)
+        await db.commit()
+    return len(accepted)
+
+
+submission_ingestor = SubmissionIngestor(
+    spool_dir=config.SUBMISSION_SPOOL_DIR,
+    batch_size=config.SUBMISSION_BATCH_SIZE,
+    max_wait=config.SUBMISSION_BATCH_MAX_WAIT_MS / 1000,
+    max_queue=config.SUBMISSION_QUEUE_MAX,
+)
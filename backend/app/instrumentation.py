@@ -0,0 +1,201 @@
+# backend/app/instrumentation.py
+"""
+Замер времени запроса по составляющим: SQL, сериализация, рендер PDF.
+
+Для выбранных запросов (INSTRUMENTATION_SAMPLE_RATE) middleware заводит RequestTimings
+в contextvar. События движка SQLAlchemy и блоки `timed(...)` дописывают в него время,
+а в ответ уходит заголовок Server-Timing. Гистограммы по маршрутам копятся в памяти
+воркера и отдаются в формате Prometheus на /metrics. Для запросов вне выборки
+считается только общая длительность, остальные хуки сводятся к проверке contextvar.
+"""
+from __future__ import annotations
+import random
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from . import config
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestTimings:
+    __slots__ = ("db", "queries", "serialize", "render")
+
+    def __init__(self):
+        self.db = 0.0
+        self.queries = 0
+        self.serialize = 0.0
+        self.render = 0.0
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def timed(component: str) -> Iterator[None]:
+    """Добавляет время блока к компоненту текущего запроса: serialize или render."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(timings, component, getattr(timings, component) + time.perf_counter() - started)
+
+
+# --- SQL ---
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    if timings is None:
+        return
+    started = conn.info.get("query_started")
+    if started:
+        timings.db += time.perf_counter() - started.pop()
+    timings.queries += 1
+
+
+def instrument_engine(sync_engine) -> None:
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# --- Гистограммы ---
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        # После границ бакетов: число значений выше последней границы, затем сумма
+        series = self.counts.get(labels)
+        if series is None:
+            series = self.counts[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self, name: str, help_text: str, label_names: Tuple[str, ...]) -> List[str]:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for labels, series in sorted(self.counts.items()):
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            total = cumulative + series[len(self.buckets)]
+            lines.append(f'{name}_bucket{{{base},le="+Inf"}} {total}')
+            lines.append(f"{name}_sum{{{base}}} {series[-1]:.6f}")
+            lines.append(f"{name}_count{{{base}}} {total}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+ROUTE_LABELS = ("method", "route")
+request_duration = Histogram(DURATION_BUCKETS)
+request_db = Histogram(DURATION_BUCKETS)
+request_queries = Histogram(QUERY_BUCKETS)
+request_serialize = Histogram(DURATION_BUCKETS)
+request_render = Histogram(DURATION_BUCKETS)
+requests_total: Dict[Tuple[str, str, str], int] = {}
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        return getattr(endpoint, "__name__", "unknown")
+    # Mount (например, /uploads) и 404 — без пути, чтобы не плодить метки по каждому URL
+    return "unmatched"
+
+
+def _server_timing(timings: RequestTimings, total: float) -> bytes:
+    parts = [
+        f"db;dur={timings.db * 1000:.1f}",
+        f'queries;desc="{timings.queries}"',
+        f"serialize;dur={timings.serialize * 1000:.1f}",
+    ]
+    if timings.render:
+        parts.append(f"render;dur={timings.render * 1000:.1f}")
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+class InstrumentationMiddleware:
+    def __init__(self, app, sample_rate: float = config.INSTRUMENTATION_SAMPLE_RATE,
+                 random_fn: Callable[[], float] = random.random):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.random_fn = random_fn
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        timings = RequestTimings() if self.sample_rate > 0 and self.random_fn() < self.sample_rate else None
+        token = _current.set(timings)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if timings is not None:
+                    header = _server_timing(timings, time.perf_counter() - started)
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            labels = (scope["method"], _route_template(scope))
+            request_duration.observe(labels, time.perf_counter() - started)
+            key = (*labels, str(status_code))
+            requests_total[key] = requests_total.get(key, 0) + 1
+            if timings is not None:
+                request_db.observe(labels, timings.db)
+                request_queries.observe(labels, timings.queries)
+                request_serialize.observe(labels, timings.serialize)
+                if timings.render:
+                    request_render.observe(labels, timings.render)
+
+
+def _gauges(prefix: str, values: Dict[str, object]) -> List[str]:
+    lines = []
+    for key, value in values.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            lines.append(f"# TYPE {prefix}_{key} gauge")
+            lines.append(f"{prefix}_{key} {value}")
+    return lines
+
+
+def render_prometheus(extra_gauges: Dict[str, Dict[str, object]]) -> str:
+    lines = ["# HELP http_requests_total Requests by route and status", "# TYPE http_requests_total counter"]
+    for (method, route, status_code), count in sorted(requests_total.items()):
+        lines.append(f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status_code}"}} {count}')
+    lines += request_duration.render("http_request_duration_seconds", "Request duration", ROUTE_LABELS)
+    lines += request_db.render("http_request_db_seconds", "SQL time per sampled request", ROUTE_LABELS)
+    lines += request_queries.render("http_request_queries", "SQL statements per sampled request", ROUTE_LABELS)
+    lines += request_serialize.render("http_request_serialize_seconds", "Serialization time per sampled request", ROUTE_LABELS)
+    lines += request_render.render("http_request_render_seconds", "PDF render time per sampled request", ROUTE_LABELS)
+    for prefix, values in extra_gauges.items():
+        lines += _gauges(prefix, values)
+    return "\n".join(lines) + "\n"
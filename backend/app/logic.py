@@ -0,0 +1,110 @@
+# backend/app/logic.py
+"""
+Условия показа шагов и вопросов (conditional_logic).
+
+Правила брифа компилируются один раз в список замыканий-предикатов и кэшируются
+по ETag брифа: ETag — хэш содержимого, поэтому правка брифа даёт новый ключ, а
+запись для старой версии просто вытесняется. Проверка ответов — один проход по
+шагам в порядке брифа без разбора JSON.
+
+Условие видит только ответы на вопросы, которые сами видимы и стоят раньше: если
+шаг скрыт, его ответы не влияют на дальнейшие шаги, как будто их не давали.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from . import serializers
+from .cache import compiled_brief_cache
+
+Answers = Dict[str, Any]
+Predicate = Callable[[Answers], bool]
+
+
+def _matches(answer: Any, value: Any) -> bool:
+    # Ответ-список (multi_choice) совпадает, если содержит значение
+    if isinstance(answer, list):
+        return value in answer
+    return answer == value
+
+
+def _never(answers: Answers) -> bool:
+    return False
+
+
+def compile_condition(logic: Optional[dict]) -> Optional[Predicate]:
+    """Предикат по conditional_logic; None — показывать всегда."""
+    show_if = (logic or {}).get("show_if") or {}
+    question_id = show_if.get("question_id")
+    if question_id is None:
+        return None
+    key = str(question_id)
+    value = show_if.get("value")
+    operator = show_if.get("operator")
+    if operator in ("equals", "contains"):
+        return lambda answers: _matches(answers.get(key), value)
+    if operator in ("not_equals", "not_contains"):
+        return lambda answers: not _matches(answers.get(key), value)
+    # Неизвестный оператор (данные старше схемы): шаг скрыт, как и во фронтенде
+    return _never
+
+
+class BriefLogic:
+    """Скомпилированные условия брифа: шаги по порядку, у каждого — вопросы с предикатами."""
+
+    def __init__(self, brief: dict):
+        self.steps: List[Tuple[int, Optional[Predicate], List[Tuple[int, str, Optional[Predicate]]]]] = [
+            (
+                step["id"],
+                compile_condition(step.get("conditional_logic")),
+                [(q["id"], str(q["id"]), compile_condition(q.get("conditional_logic"))) for q in step["questions"]],
+            )
+            for step in brief["steps"]
+        ]
+        self.step_positions = {step_id: index for index, (step_id, _, _) in enumerate(self.steps)}
+        self.question_keys = frozenset(key for _, _, questions in self.steps for _, key, _ in questions)
+        self.has_conditions = any(
+            step_condition is not None or any(condition is not None for _, _, condition in questions)
+            for _, step_condition, questions in self.steps
+        )
+
+    def evaluate(self, answers: Answers) -> Tuple[List[Tuple[int, List[int]]], Answers]:
+        """Видимые шаги с id видимых вопросов и ответы, которые на них даны."""
+        seen: Answers = {}
+        visible = []
+        for step_id, step_condition, questions in self.steps:
+            if step_condition is not None and not step_condition(seen):
+                continue
+            shown = []
+            for question_id, key, condition in questions:
+                if condition is not None and not condition(seen):
+                    continue
+                shown.append(question_id)
+                if key in answers:
+                    seen[key] = answers[key]
+            visible.append((step_id, shown))
+        return visible, seen
+
+    def next_step_id(self, visible: List[Tuple[int, List[int]]], current_step_id: Optional[int]) -> Optional[int]:
+        """Первый видимый шаг после current_step_id по порядку брифа; сам текущий шаг мог скрыться."""
+        current = self.step_positions.get(current_step_id, -1)
+        return next((step_id for step_id, _ in visible if self.step_positions[step_id] > current), None)
+
+    def visible(self, answers: Answers) -> Tuple[Answers, Optional[Set[str]]]:
+        """Ответы без ответов на скрытые вопросы (ключи не из брифа не трогаются) и ключи
+        видимых вопросов; None вместо ключей — условий нет, видимы все вопросы."""
+        if not self.has_conditions:
+            return answers, None
+        visible, seen = self.evaluate(answers)
+        visible_keys = {str(question_id) for _, question_ids in visible for question_id in question_ids}
+        return {key: value for key, value in answers.items() if key in seen or key not in self.question_keys}, visible_keys
+
+
+def get_brief_logic(brief: Tuple[str, bytes]) -> BriefLogic:
+    """Условия брифа по (etag, json) из responses.get_brief_json; компилируются при первом обращении."""
+    etag, body = brief
+    key = ("logic", etag)
+    compiled = compiled_brief_cache.get(key)
+    if compiled is None:
+        compiled = BriefLogic(serializers.loads(body))
+        compiled_brief_cache.set(key, compiled)
+    return compiled
@@ -1,19 +1,45 @@
 # backend/app/main.py
 from __future__ import annotations
+import time
+_import_started = time.perf_counter()
+
+import asyncio
+from datetime import datetime, timedelta, timezone
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from pathlib import Path
+from fastapi.responses import PlainTextResponse, Response
 
-from .database import init_db
+from . import cache_sync, config, crud, ingest, instrumentation, report_jobs, serializers, startup
+from .database import AsyncSessionLocal, engine, pool_metrics
+from .pdf_pool import pdf_pool
+from .static_uploads import UploadFiles
+from .uploads import UPLOAD_DIR
 from .routers import users, briefs, main_router
 
+startup.mark_imported(_import_started)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Выполняет код при старте приложения, например, инициализацию БД."""
-    await init_db()
+    await startup.prepare_database()
+    cache_sync.brief_cache_listener.start()
+    # Пул PDF поднимается при первом рендере; прогрев по желанию и не задерживает старт
+    warm_up = asyncio.ensure_future(pdf_pool.warm_up()) if config.PDF_POOL_WARM_UP else None
+    await report_jobs.resume_pending()
+    await ingest.submission_ingestor.replay_orphans()
+    async with AsyncSessionLocal() as db:
+        await crud.delete_stale_drafts(db, datetime.now(timezone.utc) - timedelta(days=config.DRAFT_TTL_DAYS))
+    startup.mark_started()
     yield
+    if warm_up is not None:
+        await asyncio.gather(warm_up, return_exceptions=True)
+    await ingest.submission_ingestor.shutdown(config.SUBMISSION_SHUTDOWN_TIMEOUT_SECONDS)
+    await report_jobs.shutdown()
+    await cache_sync.brief_cache_listener.shutdown()
+    pdf_pool.shutdown()
 
 app = FastAPI(
     title="Interactive Brief API",
@@ -25,7 +51,7 @@ app = FastAPI(
     contact={
         "name": "Development 1853",
         "url": "https://dev1853.ru",
-        "email": "  
+    },
     lifespan=lifespan
 )
 
@@ -42,12 +68,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.mount("/uploads", StaticFiles(directory=Path("uploads")), name="uploads")
+app.add_middleware(instrumentation.InstrumentationMiddleware)
+app.add_middleware(startup.FirstRequestTimer)
+instrumentation.instrument_engine(engine.sync_engine)
+
+app.mount("/uploads", UploadFiles(UPLOAD_DIR), name="uploads")
 
 app.include_router(main_router.router)
 app.include_router(users.router)
 app.include_router(briefs.router)
 
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    # Как стандартный обработчик, но через orjson: в ошибке повторяется input, и число
+    # вроде 1e999 (inf) роняло JSONResponse с allow_nan=False в 500 вместо 422
+    body = serializers.dumps({"detail": jsonable_encoder(exc.errors())})
+    return Response(content=body, status_code=422, media_type="application/json")
+
 @app.get("/", tags=["Root"])
 async def root():
-    return {"message": "Welcome to the Interactive Brief API"}
\ No newline at end of file
+    return {"message": "Welcome to the Interactive Brief API"}
+
+@app.get("/metrics/pdf-pool", tags=["Root"])
+async def pdf_pool_metrics():
+    return pdf_pool.metrics()
+
+@app.get("/metrics/db-pool", tags=["Root"])
+async def db_pool_metrics():
+    return pool_metrics()
+
+@app.get("/metrics/ingest", tags=["Root"])
+async def ingest_metrics():
+    return ingest.submission_ingestor.metrics()
+
+@app.get("/metrics/startup", tags=["Root"])
+async def startup_metrics():
+    return startup.startup_report()
+
+@app.get("/metrics", tags=["Root"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+    body = instrumentation.render_prometheus({
+        "pdf_pool": pdf_pool.metrics(),
+        "db_pool": pool_metrics(),
+        "submission_ingest": ingest.submission_ingestor.metrics(),
+    })
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
\ No newline at end of file
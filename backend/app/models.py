@@ -1,6 +1,7 @@
 # backend/app/models.py
-from sqlalchemy import (Column, Integer, String, Text, Boolean, DateTime,
-                        ForeignKey, JSON)
+from sqlalchemy import (Column, Integer, String, Text, Boolean, Date, DateTime,
+                        ForeignKey, JSON, Index, UniqueConstraint)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -16,7 +17,8 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
-    briefs = relationship("Brief", back_populates="owner", lazy="selectin")
+    # Брифы нужны только профилю (/users/me), там они загружаются явно
+    briefs = relationship("Brief", back_populates="owner", lazy="select")
 
 class Brief(Base):
     __tablename__ = "briefs"
@@ -32,7 +34,8 @@ class Brief(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     steps = relationship("Step", back_populates="brief", cascade="all, delete-orphan", lazy="selectin", order_by="Step.order")
-    submissions = relationship("Submission", back_populates="brief", cascade="all, delete-orphan", lazy="selectin")
+    # Ответы не входят в схему брифа: грузятся только по явному обращению (и при каскадном удалении)
+    submissions = relationship("Submission", back_populates="brief", cascade="all, delete-orphan", lazy="select")
 
 class Step(Base):
     __tablename__ = "steps"
@@ -61,10 +64,67 @@ class Question(Base):
 
 class Submission(Base):
     __tablename__ = "submissions"
+    __table_args__ = (
+        # Для keyset-пагинации ответов брифа по (created_at, id)
+        Index("ix_submissions_brief_created_id", "brief_id", "created_at", "id"),
+        # GIN-индексы поиска по answers_data (app.search) есть только в Postgres и
+        # создаются миграцией d5e1b7f3a9c4, а не здесь
+    )
     id = Column(Integer, primary_key=True, index=True)
     brief_id = Column(Integer, ForeignKey("briefs.id"), nullable=False)
     session_id = Column(String, index=True, nullable=False)
     answers_data = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Версия брифа, на которую дан ответ; NULL у ответов, записанных до появления версий
+    brief_version_id = Column(Integer, ForeignKey("brief_versions.id", name="fk_submissions_brief_version_id"), nullable=True)
     
-    brief = relationship("Brief", back_populates="submissions")
\ No newline at end of file
+    brief = relationship("Brief", back_populates="submissions")
+
+    # created_at возвращается самим INSERT: ответ на создание собирается без повторного SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
+# --- Версии брифов: неизменяемые снимки для ответов ---
+class BriefVersion(Base):
+    """JSON брифа (схема Brief) в том виде, в каком его видел респондент. Строка не меняется
+    после вставки; одинаковое содержимое брифа — одна версия (content_hash — sha256 JSON)."""
+    __tablename__ = "brief_versions"
+    __table_args__ = (UniqueConstraint("brief_id", "content_hash", name="uq_brief_versions_content"),)
+    id = Column(Integer, primary_key=True)
+    brief_id = Column(Integer, ForeignKey("briefs.id", ondelete="CASCADE"), nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    body = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# --- Черновики ответов: автосохранение по шагам до отправки ---
+class SubmissionDraft(Base):
+    """Незавершённый ответ. В списки ответов и аналитику не попадает; при отправке
+    переносится в submissions с тем же session_id и удаляется."""
+    __tablename__ = "submission_drafts"
+    id = Column(Integer, primary_key=True)
+    session_id = Column(String, unique=True, nullable=False)
+    brief_id = Column(Integer, ForeignKey("briefs.id", ondelete="CASCADE"), nullable=False, index=True)
+    # В Postgres — jsonb: патч сливается в БД оператором ||, без чтения всего черновика
+    answers_data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    # Версия для оптимистичной блокировки: каждый патч увеличивает её на 1
+    version = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+# --- Агрегаты для аналитики (обновляются вместе с созданием ответа) ---
+class AnswerRollup(Base):
+    """Счётчик по вопросу: bucket — вариант ответа или ANSWERED_BUCKET для заполненности."""
+    __tablename__ = "answer_rollups"
+    __table_args__ = (UniqueConstraint("brief_id", "question_key", "bucket", name="uq_answer_rollups_key"),)
+    id = Column(Integer, primary_key=True)
+    brief_id = Column(Integer, ForeignKey("briefs.id", ondelete="CASCADE"), nullable=False, index=True)
+    question_key = Column(String, nullable=False)
+    bucket = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+class SubmissionDailyRollup(Base):
+    __tablename__ = "submission_daily_rollups"
+    __table_args__ = (UniqueConstraint("brief_id", "day", name="uq_submission_daily_rollups_key"),)
+    id = Column(Integer, primary_key=True)
+    brief_id = Column(Integer, ForeignKey("briefs.id", ondelete="CASCADE"), nullable=False, index=True)
+    day = Column(Date, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
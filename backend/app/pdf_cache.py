@@ -0,0 +1,90 @@
+# backend/app/pdf_cache.py
+"""
+Дисковый кэш PDF-отчётов с адресацией по содержимому.
+
+Ключ — id ответа плюс хэш содержимого брифа, поэтому после изменения брифа отчёт
+просто получает новый ключ, а старый файл со временем вытесняется. Вытеснение —
+LRU по mtime (mtime обновляется при каждом чтении) с ограничением по общему размеру.
+Каталог общий для всех воркеров; запись атомарная (временный файл + os.replace).
+"""
+from __future__ import annotations
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from . import config
+
+# Как часто пересчитывать реальный размер каталога: файлы пишут и другие воркеры
+RESCAN_EVERY_PUTS = 50
+
+
+class PdfDiskCache:
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._approx_bytes: Optional[int] = None
+        self._puts = 0
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.pdf"
+
+    def get(self, key: str) -> Optional[Path]:
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, data: bytes) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        self._puts += 1
+        if self._approx_bytes is None or self._puts % RESCAN_EVERY_PUTS == 0:
+            self._approx_bytes = self._scan_size()
+        else:
+            self._approx_bytes += len(data)
+        if self._approx_bytes > self.max_bytes:
+            self._evict(keep=path)
+        return path
+
+    def _entries(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pdf"):
+                try:
+                    yield entry, entry.stat()
+                except FileNotFoundError:
+                    continue
+
+    def _scan_size(self) -> int:
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def _evict(self, keep: Path) -> None:
+        """Удаляет самые давно читавшиеся файлы, пока каталог не займёт 90% лимита."""
+        entries = sorted(self._entries(), key=lambda item: item[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        target = int(self.max_bytes * 0.9)
+        for entry, stat in entries:
+            if total <= target:
+                break
+            if entry.path == str(keep):
+                continue
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+            total -= stat.st_size
+        self._approx_bytes = total
+
+
+pdf_cache = PdfDiskCache(Path(config.PDF_CACHE_DIR), config.PDF_CACHE_MAX_BYTES)
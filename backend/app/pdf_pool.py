@@ -0,0 +1,158 @@
+# backend/app/pdf_pool.py
+"""
+Пул рендеринга PDF вне event loop.
+
+reportlab работает синхронно и занимает CPU, поэтому рендер выполняется в отдельных
+процессах (или потоках, PDF_POOL_KIND=thread). Воркеры один раз при старте регистрируют
+шрифт и собирают стили. Очередь ограничена: при переполнении запрос сразу получает
+PdfPoolBusy, а не ждёт, занимая соединение.
+
+Если процесс-воркер умер (OOM, падение reportlab), ProcessPoolExecutor ломается целиком
+и отклоняет все следующие задачи. Такой пул заменяется новым, а запрос, попавший на
+сломанный пул, получает PdfWorkerCrashed.
+"""
+from __future__ import annotations
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from . import config
+
+
+class PdfPoolBusy(Exception):
+    """Очередь рендеринга заполнена."""
+
+
+class PdfRenderTimeout(Exception):
+    """Рендер не уложился в PDF_RENDER_TIMEOUT_SECONDS."""
+
+
+class PdfWorkerCrashed(Exception):
+    """Воркер пула умер во время рендера; пул уже заменён, запрос можно повторить."""
+
+
+def _init_worker() -> None:
+    from . import pdf_render
+    pdf_render.init_renderer()
+
+
+def _render(report: Dict[str, Any]) -> bytes:
+    from . import pdf_render
+    return pdf_render.render_submission_pdf(report)
+
+
+class PdfRenderPool:
+    def __init__(self, kind: str, workers: int, max_queue: int, timeout: float):
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        # Метрики
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.render_seconds_total = 0.0
+
+    def _new_executor(self) -> Executor:
+        if self.kind == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pdf", initializer=_init_worker)
+        # spawn: дочерние процессы не наследуют event loop и соединения с БД
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker
+        )
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        self._executor = self._new_executor()
+        self._slots = asyncio.Semaphore(self.workers + self.max_queue)
+
+    def _replace_broken(self, executor: Executor) -> None:
+        # Заменяет только тот пул, что сломался: параллельные запросы видят одну и ту же поломку
+        if self._executor is executor:
+            executor.shutdown(wait=False)
+            self._executor = self._new_executor()
+            self.restarts += 1
+
+    async def warm_up(self) -> None:
+        """Поднимает воркеров заранее, чтобы первый запрос не платил за загрузку шрифтов."""
+        self.start()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _init_worker) for _ in range(self.workers)))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def render(self, report: Dict[str, Any]) -> bytes:
+        self.start()
+        if self._slots.locked():
+            self.rejected += 1
+            raise PdfPoolBusy()
+        await self._slots.acquire()
+
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        executor = self._executor
+        try:
+            future = loop.run_in_executor(executor, _render, report)
+        except BrokenExecutor:
+            # Пул сломался раньше, задача в него не попала
+            self._slots.release()
+            self.failed += 1
+            self._replace_broken(executor)
+            raise PdfWorkerCrashed()
+        self.in_flight += 1
+        # Слот освобождается, только когда воркер действительно закончил,
+        # даже если клиент уже получил таймаут — иначе очередь в пуле растёт без границ
+        future.add_done_callback(self._on_done(started))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise PdfRenderTimeout()
+        except BrokenExecutor:
+            self._replace_broken(executor)
+            raise PdfWorkerCrashed()
+
+    def _on_done(self, started: float):
+        def callback(future: asyncio.Future) -> None:
+            self.in_flight -= 1
+            self.render_seconds_total += time.monotonic() - started
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+            self._slots.release()
+        return callback
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": max(self.in_flight - self.workers, 0),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+            "render_seconds_total": round(self.render_seconds_total, 3),
+        }
+
+
+pdf_pool = PdfRenderPool(
+    kind=config.PDF_POOL_KIND,
+    workers=config.PDF_POOL_WORKERS,
+    max_queue=config.PDF_POOL_MAX_QUEUE,
+    timeout=config.PDF_RENDER_TIMEOUT_SECONDS,
+)
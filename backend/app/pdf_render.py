@@ -0,0 +1,87 @@
+# backend/app/pdf_render.py
+"""
+Рендер PDF-отчёта по ответу. Модуль выполняется в воркерах пула (app.pdf_pool)
+и не зависит от БД: на вход приходит готовый словарь отчёта.
+"""
+from __future__ import annotations
+import io
+import os
+from typing import Any, Dict, Optional
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+FONT_PATH = "DejaVuSans.ttf"
+
+# Шрифт и стили загружаются один раз на процесс воркера
+_font_name: Optional[str] = None
+_styles = None
+
+
+def init_renderer() -> None:
+    global _font_name, _styles
+    if _styles is not None:
+        return
+
+    font_name = "DejaVuSans"
+    # Убедитесь, что шрифт DejaVuSans.ttf находится в корневой папке вашего бэкенд-проекта
+    if os.path.exists(FONT_PATH):
+        pdfmetrics.registerFont(TTFont(font_name, FONT_PATH))
+    else:
+        # Если шрифта нет, используем стандартный
+        font_name = "Helvetica"
+
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='MainTitle', fontName=font_name, fontSize=24, spaceAfter=20, alignment=1))
+    styles.add(ParagraphStyle(name='SubTitle', fontName=font_name, fontSize=14, spaceAfter=20, alignment=1))
+    styles.add(ParagraphStyle(name='StepTitle', fontName=font_name, fontSize=16, spaceBefore=16, spaceAfter=8))
+    styles.add(ParagraphStyle(name='Question', fontName=font_name, fontSize=12, spaceBefore=10, spaceAfter=6, textColor=colors.darkblue))
+    styles.add(ParagraphStyle(name='Answer', fontName=font_name, fontSize=11, leading=14))
+    _font_name, _styles = font_name, styles
+
+
+def _format_answer(value: Any) -> str:
+    if value is None or value == "" or value == []:
+        return "—"
+    if isinstance(value, list):
+        value = ", ".join(str(v) for v in value)
+    return escape(str(value)).replace("\n", "<br/>")
+
+
+def render_submission_pdf(report: Dict[str, Any]) -> bytes:
+    """
+    report: {"session_id", "created_at", "answers", "brief": {"title", "description", "steps": [...]}}
+    """
+    init_renderer()
+    brief = report["brief"]
+    answers = report["answers"] or {}
+
+    story = [
+        Paragraph(escape(brief["title"]), _styles["MainTitle"]),
+        Paragraph(escape(f"Ответ {report['session_id']} от {report['created_at']}"), _styles["SubTitle"]),
+    ]
+    if brief.get("description"):
+        story.append(Paragraph(escape(brief["description"]), _styles["Answer"]))
+    for step in brief["steps"]:
+        story.append(Paragraph(escape(step["title"]), _styles["StepTitle"]))
+        for question in step["questions"]:
+            story.append(Paragraph(escape(question["text"]), _styles["Question"]))
+            story.append(Paragraph(_format_answer(answers.get(str(question["id"]))), _styles["Answer"]))
+        story.append(Spacer(1, 0.2 * inch))
+
+    def add_page_number(canvas, doc):
+        page_num = canvas.getPageNumber()
+        canvas.setFont(_font_name, 9)
+        canvas.drawRightString(letter[0] - inch, 0.75 * inch, f"Страница {page_num}")
+
+    buffer = io.BytesIO()
+    # invariant: без даты создания и случайного ID, один и тот же отчёт даёт те же байты
+    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18, invariant=True)
+    doc.build(story, onFirstPage=add_page_number, onLaterPages=add_page_number)
+    return buffer.getvalue()
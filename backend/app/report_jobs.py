@@ -0,0 +1,227 @@
+# backend/app/report_jobs.py
+"""
+Фоновая выгрузка всех PDF-отчётов брифа одним ZIP-архивом.
+
+Внешнего брокера нет: задача выполняется asyncio-таском в том воркере, который её
+принял. Состояние хранится на диске (REPORT_JOBS_DIR/<job_id>/job.json), поэтому
+статус видят все воркеры. Задачу выполняет тот, кто держит flock на её lock-файле;
+после перезапуска незавершённые задачи подхватываются заново. Уже отрендеренные
+отчёты берутся из дискового кэша PDF, так что повторный проход почти ничего не стоит.
+"""
+from __future__ import annotations
+import asyncio
+import fcntl
+import functools
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from . import config, crud, reports, responses, versions
+from .database import AsyncSessionLocal
+from .pdf_pool import PdfPoolBusy
+
+JOBS_DIR = Path(config.REPORT_JOBS_DIR)
+PAGE_SIZE = 50
+BUSY_RETRY_SECONDS = 1.0
+ACTIVE_STATUSES = ("queued", "running")
+
+_tasks: Dict[str, asyncio.Task] = {}
+
+
+class JobNotFound(Exception):
+    pass
+
+
+# --- Состояние задачи на диске ---
+def _job_dir(job_id: str) -> Path:
+    # job_id приходит из URL: допускаем только uuid, чтобы не выйти за пределы каталога
+    return JOBS_DIR / str(uuid.UUID(job_id))
+
+
+def archive_path(job_id: str) -> Path:
+    return _job_dir(job_id) / "reports.zip"
+
+
+def read_state(job_id: str) -> Dict[str, Any]:
+    try:
+        with open(_job_dir(job_id) / "job.json", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        # ValueError: и битый JSON, и job_id, не являющийся uuid
+        raise JobNotFound(job_id)
+
+
+def _write_state(state: Dict[str, Any]) -> None:
+    job_dir = _job_dir(state["job_id"])
+    state["updated_at"] = time.time()
+    fd, tmp_path = tempfile.mkstemp(dir=job_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+        json.dump(state, tmp)
+    os.replace(tmp_path, job_dir / "job.json")
+
+
+def _try_lock(job_id: str) -> Optional[int]:
+    fd = os.open(_job_dir(job_id) / "lock", os.O_CREAT | os.O_RDWR)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+# --- Публичный API ---
+async def create_job(brief_id: int, owner_id: int) -> Dict[str, Any]:
+    job_id = str(uuid.uuid4())
+    now = time.time()
+    state = {
+        "job_id": job_id,
+        "brief_id": brief_id,
+        "owner_id": owner_id,
+        "status": "queued",
+        "total": None,
+        "done": 0,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    await run_in_threadpool(_job_dir(job_id).mkdir, parents=True)
+    await run_in_threadpool(_write_state, state)
+    start(job_id)
+    return state
+
+
+def start(job_id: str) -> None:
+    """Запускает задачу в этом воркере, если она ещё не выполняется здесь."""
+    task = _tasks.get(job_id)
+    if task is None or task.done():
+        task = _tasks[job_id] = asyncio.create_task(_run(job_id))
+        task.add_done_callback(functools.partial(_forget, job_id))
+
+
+def _forget(job_id: str, task: asyncio.Task) -> None:
+    # Завершённая задача больше не нужна; опросы статуса не копят таски в _tasks
+    if _tasks.get(job_id) is task:
+        del _tasks[job_id]
+
+
+async def get_status(job_id: str) -> Dict[str, Any]:
+    state = await run_in_threadpool(read_state, job_id)
+    if state["status"] in ACTIVE_STATUSES:
+        # Если воркер, выполнявший задачу, умер, lock свободен — подхватываем её здесь
+        start(job_id)
+    return state
+
+async def resume_pending() -> None:
+    """При старте воркера: продолжить незавершённые задачи и удалить устаревшие."""
+    if not JOBS_DIR.exists():
+        return
+    ttl = config.REPORT_JOBS_TTL_HOURS * 3600
+    for entry in await run_in_threadpool(lambda: list(JOBS_DIR.iterdir())):
+        try:
+            state = await run_in_threadpool(read_state, entry.name)
+        except JobNotFound:
+            continue
+        if state["status"] in ACTIVE_STATUSES:
+            start(state["job_id"])
+        elif time.time() - state["updated_at"] > ttl:
+            await run_in_threadpool(shutil.rmtree, entry, True)
+
+
+async def shutdown() -> None:
+    # Отменённая задача остаётся в статусе running и будет продолжена после рестарта
+    tasks = list(_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _tasks.clear()
+
+
+# --- Выполнение ---
+async def _report_path(submission, brief):
+    while True:
+        try:
+            return await reports.get_report_path(submission, brief)
+        except PdfPoolBusy:
+            # Пул занят интерактивными запросами — ждём, а не отбираем у них слоты
+            await asyncio.sleep(BUSY_RETRY_SECONDS)
+
+
+async def _add_to_archive(archive: zipfile.ZipFile, submission, brief, path: Path) -> None:
+    arcname = f"report_{submission.session_id}.pdf"
+    try:
+        await run_in_threadpool(archive.write, path, arcname)
+    except FileNotFoundError:
+        # Файл вытеснили из кэша между рендером и чтением — рендерим ещё раз
+        path = await _report_path(submission, brief)
+        await run_in_threadpool(archive.write, path, arcname)
+
+
+async def _run(job_id: str) -> None:
+    lock_fd = await run_in_threadpool(_try_lock, job_id)
+    if lock_fd is None:
+        return  # задачу уже выполняет другой воркер
+    state = None
+    try:
+        state = await run_in_threadpool(read_state, job_id)
+        if state["status"] not in ACTIVE_STATUSES:
+            return
+        brief_id = state["brief_id"]
+        async with AsyncSessionLocal() as db:
+            brief = await responses.get_brief_json(db, brief_id)
+            state.update(status="running", done=0, total=await crud.count_submissions(db, brief_id))
+        if brief is None:
+            raise RuntimeError("Brief not found")
+        await run_in_threadpool(_write_state, state)
+
+        # Архив всегда собирается заново: готовые PDF берутся из кэша
+        part_path = archive_path(job_id).with_suffix(".zip.part")
+        archive = await run_in_threadpool(zipfile.ZipFile, part_path, "w", zipfile.ZIP_STORED)
+        try:
+            after = None
+            concurrency = asyncio.Semaphore(max(config.REPORT_JOB_CONCURRENCY, 1))
+
+            async def render(submission, submission_brief):
+                async with concurrency:
+                    return await _report_path(submission, submission_brief)
+
+            while True:
+                # Короткая сессия на страницу: соединение не держится, пока идёт рендер
+                async with AsyncSessionLocal() as db:
+                    rows, next_cursor = await crud.get_submissions_page(db, brief_id=brief_id, limit=PAGE_SIZE, after=after)
+                    # Каждый отчёт — по версии брифа, на которую дан ответ
+                    briefs = await versions.briefs_for(db, brief_id, [row.brief_version_id for row in rows])
+                briefs = [row_brief or brief for row_brief in briefs]
+                # Рендер параллельно, запись в архив последовательно
+                paths = await asyncio.gather(*(render(row, row_brief) for row, row_brief in zip(rows, briefs)))
+                for row, row_brief, path in zip(rows, briefs, paths):
+                    await _add_to_archive(archive, row, row_brief, path)
+                state["done"] += len(rows)
+                await run_in_threadpool(_write_state, state)
+                if next_cursor is None:
+                    break
+                after = crud.decode_submission_cursor(next_cursor)
+        finally:
+            await run_in_threadpool(archive.close)
+        await run_in_threadpool(os.replace, part_path, archive_path(job_id))
+        state.update(status="done", error=None)
+    except asyncio.CancelledError:
+        raise
+    except JobNotFound:
+        return  # каталог задачи уже удалён по сроку хранения
+    except Exception as exc:
+        if state is None:
+            raise
+        state.update(status="failed", error=str(exc))
+    finally:
+        if state is not None and state["status"] in ("done", "failed"):
+            await run_in_threadpool(_write_state, state)
+        os.close(lock_fd)
@@ -0,0 +1,56 @@
+# backend/app/reports.py
+"""Получение PDF-отчёта по ответу: из дискового кэша или рендером в пуле."""
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from . import serializers
+from .instrumentation import timed
+from .pdf_cache import pdf_cache
+from .pdf_pool import pdf_pool
+
+
+def report_cache_key(submission, brief: Tuple[str, bytes]) -> str:
+    # Отчёт однозначно определяется ответом и содержимым брифа (ETag брифа — хэш его JSON)
+    brief_hash = brief[0].strip('"')
+    return f"{submission.id}_{brief_hash}"
+
+
+def build_report(submission, brief: Tuple[str, bytes]) -> dict:
+    return {
+        "session_id": submission.session_id,
+        "created_at": submission.created_at.strftime("%d.%m.%Y %H:%M") if submission.created_at else "",
+        "answers": submission.answers_data,
+        "brief": serializers.loads(brief[1]),
+    }
+
+
+async def get_report_path(submission, brief: Tuple[str, bytes]) -> Path:
+    """
+    Путь к готовому PDF. При промахе кэша рендерит отчёт в пуле;
+    исключения пула (PdfPoolBusy, PdfRenderTimeout, PdfWorkerCrashed) пробрасываются вызывающему.
+    """
+    cache_key = report_cache_key(submission, brief)
+    path = await run_in_threadpool(pdf_cache.get, cache_key)
+    if path is None:
+        with timed("render"):
+            pdf = await pdf_pool.render(build_report(submission, brief))
+        path = await run_in_threadpool(pdf_cache.put, cache_key, pdf)
+    return path
+
+
+async def get_report_file(submission, brief: Tuple[str, bytes]) -> Tuple[Path, os.stat_result]:
+    """
+    Путь и stat готового PDF для отдачи с диска. Другой воркер мог вытеснить файл из
+    кэша между get_report_path и отдачей — тогда отчёт рендерится заново. Файл после
+    get только что прочитан (свежий mtime), поэтому при вытеснении он идёт последним.
+    """
+    path = await get_report_path(submission, brief)
+    try:
+        return path, await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        path = await get_report_path(submission, brief)
+        return path, await run_in_threadpool(os.stat, path)
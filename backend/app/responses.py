@@ -0,0 +1,67 @@
+# backend/app/responses.py
+from __future__ import annotations
+import hashlib
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, serializers
+from .instrumentation import timed
+from .cache import brief_cache, brief_cache_key, invalidate_brief, MAIN_BRIEF_KEY
+
+
+async def get_brief_json(db: AsyncSession, brief_id: int) -> Optional[Tuple[str, bytes]]:
+    """Возвращает (etag, json) брифа из кэша, при промахе — из БД с сохранением в кэш."""
+    key = brief_cache_key(brief_id)
+    cached = brief_cache.get(key)
+    if cached is not None:
+        return cached
+
+    trees = await crud.get_brief_trees(db, brief_id=brief_id)
+    if not trees:
+        return None
+    with timed("serialize"):
+        body = serializers.dumps(trees[0])
+    entry = (make_etag(body), body)
+    brief_cache.set(key, entry)
+    return entry
+
+
+async def reload_brief_json(db: AsyncSession, brief_id: int) -> Optional[Tuple[str, bytes]]:
+    """(etag, json) брифа заново из БД — когда запись в кэше могла устареть, а уведомление
+    о правке (app.cache_sync) ещё не дошло до этого воркера."""
+    invalidate_brief(brief_id)
+    return await get_brief_json(db, brief_id)
+
+
+async def get_main_brief_id(db: AsyncSession) -> Optional[int]:
+    brief_id = brief_cache.get(MAIN_BRIEF_KEY)
+    if brief_id is None:
+        brief_id = await crud.get_main_brief_id(db)
+        if brief_id is not None:
+            brief_cache.set(MAIN_BRIEF_KEY, brief_id)
+    return brief_id
+
+
+def make_etag(body: bytes) -> str:
+    # Сильный ETag по содержимому: одинаковый во всех воркерах для одинакового ответа
+    return '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Для If-None-Match используется слабое сравнение (RFC 7232, 3.2)
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(tag[2:] == etag if tag.startswith("W/") else tag == etag for tag in candidates)
+
+
+def json_response(request: Request, etag: str, body: bytes) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,27 +1,22 @@
 # backend/app/routers/briefs.py
 from __future__ import annotations
-from typing import List
-import uuid
-import shutil
+from typing import List, Literal, Optional
+import json
+import tempfile
 from pathlib import Path
-import io
 
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status, File, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi.responses import StreamingResponse
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 import os
 
 
 # Импортируем все необходимые модули из нашего приложения
-from .. import crud, models, schemas, auth
-from ..database import get_db
+from .. import crud, models, schemas, auth, config, responses, serializers, logic, validation, versions, search, ingest, export, analytics, reports, report_jobs, uploads, image_variants
+from ..database import get_db, AsyncSessionLocal
+from ..instrumentation import timed
+from ..pdf_pool import PdfPoolBusy, PdfRenderTimeout, PdfWorkerCrashed
 
 # Создаем роутер
 router = APIRouter(
@@ -29,35 +24,37 @@ router = APIRouter(
     tags=["Briefs & Submissions"], # Группировка в документации Swagger
 )
 
-# Для загрузки файлов
-UPLOAD_DIR = Path("uploads")
-
 
 # --- Эндпоинты для Брифов ---
 
 @router.get("/", response_model=List[schemas.Brief], summary="Получить все брифы текущего пользователя")
 async def read_user_briefs_endpoint(
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user),
+    current_user: schemas.Principal = Depends(auth.get_current_active_user),
 ):
-    return await crud.get_user_briefs(db=db, user_id=current_user.id)
+    trees = await crud.get_brief_trees(db, owner_id=current_user.id)
+    with timed("serialize"):
+        body = serializers.dumps(trees)
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/{brief_id}", response_model=schemas.Brief, summary="Получить конкретный бриф по ID")
-async def read_brief_endpoint(brief_id: int, db: AsyncSession = Depends(get_db)):
-    db_brief = await crud.get_brief_by_id(db, brief_id=brief_id)
-    if db_brief is None:
+async def read_brief_endpoint(brief_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    # Публичная страница брифа: отдаём готовый JSON из кэша и 304 по If-None-Match
+    cached = await responses.get_brief_json(db, brief_id)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Brief not found")
-    return db_brief
+    return responses.json_response(request, *cached)
 
 
 @router.post("", response_model=schemas.Brief, status_code=status.HTTP_201_CREATED, summary="Создать новый бриф")
 async def create_brief_endpoint(
     brief: schemas.BriefCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user),
+    current_user: schemas.Principal = Depends(auth.get_current_active_user),
 ):
-    return await crud.create_brief(db=db, brief=brief, owner_id=current_user.id)
+    db_brief = await crud.create_brief(db=db, brief=brief, owner_id=current_user.id)
+    return await _published_response(db, db_brief.id, status_code=status.HTTP_201_CREATED)
 
 # --- НОВЫЙ ЭНДПОИНТ ДЛЯ ОБНОВЛЕНИЯ ---
 @router.put("/{brief_id}", response_model=schemas.Brief)
@@ -65,22 +62,32 @@ async def update_brief_endpoint(
     brief_id: int,
     brief_update: schemas.BriefCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: schemas.Principal = Depends(auth.get_current_active_user)
 ):
-    db_brief = await crud.get_brief_by_id(db, brief_id)
-    if not db_brief or db_brief.owner_id != current_user.id:
+    owner_id = await crud.get_brief_owner_id(db, brief_id)
+    if owner_id is None or owner_id != current_user.id:
         raise HTTPException(status_code=404, detail="Бриф не найден")
     
-    return await crud.update_brief(db, brief_id=brief_id, brief_update=brief_update)
+    if not await crud.update_brief(db, brief_id=brief_id, brief_update=brief_update):
+        raise HTTPException(status_code=404, detail="Бриф не найден")
+    return await _published_response(db, brief_id)
+
+
+async def _published_response(db: AsyncSession, brief_id: int, status_code: int = status.HTTP_200_OK) -> Response:
+    # Сохранённый бриф публикуется новой версией; её JSON и есть ответ (тот же, что у GET /briefs/{id})
+    brief = await versions.publish(db, brief_id)
+    if brief is None:
+        raise HTTPException(status_code=404, detail="Бриф не найден")
+    return Response(content=brief[1], media_type="application/json", status_code=status_code, headers={"ETag": brief[0]})
 
 @router.put("/{brief_id}/set-main", response_model=schemas.Brief, summary="Назначить бриф главным")
 async def set_main_brief_endpoint(
     brief_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user),
+    current_user: schemas.Principal = Depends(auth.get_current_active_user),
 ):
-    brief = await crud.get_brief_by_id(db, brief_id)
-    if not brief or brief.owner_id != current_user.id:
+    owner_id = await crud.get_brief_owner_id(db, brief_id)
+    if owner_id is None or owner_id != current_user.id:
          raise HTTPException(status_code=404, detail="Бриф не найден или не принадлежит вам")
     return await crud.set_main_brief(db, brief_id=brief_id, user_id=current_user.id)
     
@@ -89,86 +96,436 @@ async def set_main_brief_endpoint(
 async def delete_brief_endpoint(
     brief_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: schemas.Principal = Depends(auth.get_current_active_user)
 ):
-    brief = await crud.get_brief_by_id(db, brief_id=brief_id)
-    if not brief:
+    owner_id = await crud.get_brief_owner_id(db, brief_id)
+    if owner_id is None:
         raise HTTPException(status_code=404, detail="Brief not found")
-    if brief.owner_id != current_user.id:
+    if owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this brief")
     
     await crud.delete_brief(db, brief_id=brief_id)
     return
 
 
+@router.get("/{brief_id}/analytics", response_model=schemas.BriefAnalytics, summary="Аналитика ответов по вопросам брифа")
+async def get_brief_analytics_endpoint(
+    brief_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.Principal = Depends(auth.get_current_active_user),
+):
+    brief = await responses.get_brief_json(db, brief_id)
+    if brief is None:
+        raise HTTPException(status_code=404, detail="Brief not found")
+    brief_data = serializers.loads(brief[1])
+    if brief_data["owner_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Бриф не найден")
+    return await analytics.get_brief_analytics(db, brief_data)
+
+
+@router.post("/{brief_id}/visibility", response_model=schemas.Visibility, summary="Видимые шаги и вопросы при данных ответах")
+async def get_visibility_endpoint(brief_id: int, request: schemas.VisibilityRequest, db: AsyncSession = Depends(get_db)):
+    brief = await responses.get_brief_json(db, brief_id)
+    if brief is None:
+        raise HTTPException(status_code=404, detail="Brief not found")
+    brief_logic = logic.get_brief_logic(brief)
+    visible, _ = brief_logic.evaluate(request.answers)
+    return {
+        "steps": [{"id": step_id, "question_ids": question_ids} for step_id, question_ids in visible],
+        "next_step_id": brief_logic.next_step_id(visible, request.current_step_id),
+    }
+
+
+@router.get("/versions/{version_id}", response_model=schemas.Brief, summary="Версия брифа, на которую давались ответы")
+async def read_brief_version_endpoint(version_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    brief = await versions.get_version(db, version_id)
+    if brief is None:
+        raise HTTPException(status_code=404, detail="Brief version not found")
+    etag, body = brief
+    # Версия не меняется: её можно кэшировать где угодно и без перепроверки
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if responses.etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 # --- Эндпоинты для Ответов (Submissions) ---
 
-@router.post("/submissions", response_model=schemas.Submission)
+def _validated(brief, answers: dict):
+    answers, visible_keys = logic.get_brief_logic(brief).visible(answers)
+    return answers, validation.get_validator(brief).validate(answers, visible_keys)
+
+
+async def _checked_answers(db: AsyncSession, brief_id: int, brief, answers: dict, drop_unknown: bool = False):
+    """(бриф, ответы без ответов на скрытые вопросы), проверенные по брифу; иначе 422 с ошибками по вопросам.
+
+    Перед отказом бриф перечитывается из БД: кэш воркера мог ещё не получить уведомление
+    о правке, и ответ на только что добавленный вопрос не должен отклоняться по старому брифу.
+    drop_unknown — отбросить ответы на вопросы, которых в (перечитанном) брифе нет, вместо отказа.
+    """
+    checked, errors = _validated(brief, answers)
+    if errors:
+        fresh = await responses.reload_brief_json(db, brief_id)
+        if fresh is not None and fresh[0] != brief[0]:
+            brief = fresh
+            checked, errors = _validated(brief, answers)
+    if errors and drop_unknown:
+        checked, errors = _validated(brief, validation.get_validator(brief).known(answers))
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    return brief, checked
+
+
+@router.post(
+    "/submissions",
+    response_model=schemas.Submission,
+    responses={status.HTTP_202_ACCEPTED: {"model": schemas.SubmissionAccepted, "description": "Принят в очередь (batched)"}},
+)
 async def create_submission_endpoint(submission: schemas.SubmissionCreate, db: AsyncSession = Depends(get_db)):
-    return await crud.create_submission(db=db, submission=submission)
+    brief = await responses.get_brief_json(db, submission.brief_id)
+    if brief is None:
+        raise HTTPException(status_code=404, detail="Brief not found")
+    brief, submission.answers = await _checked_answers(db, submission.brief_id, brief, submission.answers)
+    brief_version_id = await versions.current_version_id(db, submission.brief_id, brief)
+    if config.SUBMISSION_INGEST_MODE == "batched":
+        # Без записи в запросе: ответ журналируется и пишется в БД пачкой в фоне
+        try:
+            session_id = ingest.submission_ingestor.submit(submission.brief_id, submission.answers, brief_version_id)
+        except ingest.IngestQueueFull:
+            raise HTTPException(status_code=503, detail="Submission queue is full", headers={"Retry-After": "1"})
+        body = serializers.dumps({"session_id": session_id, "brief_id": submission.brief_id})
+        return Response(content=body, media_type="application/json", status_code=status.HTTP_202_ACCEPTED)
+    choice_options = analytics.choice_options_from_brief(serializers.loads(brief[1]))
+    db_submission = await crud.create_submission(
+        db=db, submission=submission, choice_options=choice_options, brief_version_id=brief_version_id
+    )
+    with timed("serialize"):
+        body = serializers.submission_json(serializers.SUBMISSION_ROW.values(db_submission), brief[1])
+    return Response(content=body, media_type="application/json")
 
 # ИСПРАВЛЕНО: функция стала async def
 @router.get("/{brief_id}/submissions", response_model=List[schemas.Submission])
 async def get_submissions_for_brief_endpoint(brief_id: int, db: AsyncSession = Depends(get_db)):
-    return await crud.get_submissions_by_brief_id(db, brief_id=brief_id)
+    # Каждый ответ идёт со своей версией брифа; версия сериализована один раз и
+    # подставляется готовыми байтами во все ответы на неё
+    rows = await crud.get_submission_rows_by_brief_id(db, brief_id=brief_id)
+    briefs = await versions.briefs_for(db, brief_id, [row.brief_version_id for row in rows])
+    rows, briefs = [row for row, brief in zip(rows, briefs) if brief is not None], [brief[1] for brief in briefs if brief is not None]
+    with timed("serialize"):
+        body = serializers.submission_list_json(rows, briefs)
+    return Response(content=body, media_type="application/json")
+
+@router.get("/{brief_id}/submissions/page", response_model=schemas.SubmissionPage, summary="Постраничный список ответов брифа")
+async def get_submissions_page_endpoint(
+    brief_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ответы от новых к старым с keyset-пагинацией по (created_at, id).
+    Бриф отдаётся один раз, а не внутри каждого ответа.
+    format=ndjson: первая строка — бриф, далее по строке на ответ начиная с cursor, без limit.
+    """
+    try:
+        after = crud.decode_submission_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    brief = await responses.get_brief_json(db, brief_id)
+    if brief is None:
+        raise HTTPException(status_code=404, detail="Brief not found")
+    _, brief_body = brief
+
+    if format == "ndjson":
+        return StreamingResponse(_stream_submissions_ndjson(brief_id, brief_body, after), media_type="application/x-ndjson")
+
+    rows, next_cursor = await crud.get_submissions_page(db, brief_id=brief_id, limit=limit, after=after)
+    with timed("serialize"):
+        items = b",".join(serializers.submission_row_json(row) for row in rows)
+    body = b'{"brief":%s,"items":[%s],"next_cursor":%s}' % (
+        brief_body if after is None else b"null", items, json.dumps(next_cursor).encode()
+    )
+    return Response(content=body, media_type="application/json")
+
+
+@router.post("/{brief_id}/submissions/search", response_model=schemas.SubmissionSearchPage, summary="Поиск по ответам брифа")
+async def search_submissions_endpoint(
+    brief_id: int,
+    request: schemas.SubmissionSearch,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.Principal = Depends(auth.get_current_active_user),
+):
+    """
+    Ответы, в тексте которых есть query и которые проходят все filters, от новых к старым.
+    Следующая страница — тот же запрос с cursor из next_cursor.
+    """
+    brief = await responses.get_brief_json(db, brief_id)
+    if brief is None or serializers.loads(brief[1])["owner_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Brief not found")
+    try:
+        after = crud.decode_submission_cursor(request.cursor) if request.cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    conditions = search.submission_conditions(db, request.query, request.filters)
+    rows, next_cursor = await crud.get_submissions_page(db, brief_id=brief_id, limit=request.limit, after=after, conditions=conditions)
+    with timed("serialize"):
+        items = b",".join(serializers.submission_row_json(row) for row in rows)
+    body = b'{"items":[%s],"next_cursor":%s}' % (items, json.dumps(next_cursor).encode())
+    return Response(content=body, media_type="application/json")
+
+
+async def _stream_submissions_ndjson(brief_id: int, brief_body: bytes, after):
+    # Своя сессия: зависимость get_db может закрыться раньше, чем отдан весь поток
+    yield brief_body + b"\n"
+    async with AsyncSessionLocal() as session:
+        async for chunk in crud.stream_submissions(session, brief_id=brief_id, after=after):
+            with timed("serialize"):
+                lines = b"".join(serializers.submission_row_json(row) + b"\n" for row in chunk)
+            yield lines
+
+
+@router.get("/{brief_id}/submissions/export", summary="Выгрузить ответы брифа в CSV / XLSX / Parquet")
+async def export_submissions_endpoint(
+    brief_id: int,
+    format: Literal["csv", "xlsx", "parquet"] = "csv",
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.Principal = Depends(auth.get_current_active_user),
+):
+    """Одна колонка на вопрос в порядке шагов и вопросов брифа; строки читаются курсором пачками."""
+    brief = await responses.get_brief_json(db, brief_id)
+    if brief is None:
+        raise HTTPException(status_code=404, detail="Brief not found")
+    brief_data = serializers.loads(brief[1])
+    if brief_data["owner_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Бриф не найден")
+    columns = export.brief_columns(brief_data)
+    filename = f"brief_{brief_id}_submissions.{format}"
+
+    if format == "csv":
+        return StreamingResponse(
+            _stream_csv_export(brief_id, columns),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+
+    # XLSX и Parquet собираются во временном файле на диске и отдаются с него
+    writer, media_type = export.FILE_WRITERS[format]
+    with tempfile.NamedTemporaryFile(suffix=f".{format}", delete=False) as tmp:
+        path = tmp.name
+    try:
+        await writer(path, db, brief_id, columns)
+    except BaseException:
+        os.remove(path)
+        raise
+    return FileResponse(path, media_type=media_type, filename=filename, background=BackgroundTask(os.remove, path))
+
+
+async def _stream_csv_export(brief_id: int, columns):
+    async with AsyncSessionLocal() as session:
+        async for chunk in export.iter_csv(session, brief_id, columns):
+            yield chunk
+
 
 @router.get("/submission/{session_id}", response_model=schemas.Submission)
 async def get_submission_by_session_id_endpoint(session_id: str, db: AsyncSession = Depends(get_db)):
-    submission = await crud.get_submission_by_session_id(db, session_id=session_id)
+    submission = await crud.get_submission_row_by_session_id(db, session_id=session_id)
     if submission is None:
         raise HTTPException(status_code=404, detail="Submission not found")
-    return submission
+    (brief,) = await versions.briefs_for(db, submission.brief_id, [submission.brief_version_id])
+    if brief is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    with timed("serialize"):
+        body = serializers.submission_json(submission, brief[1])
+    return Response(content=body, media_type="application/json")
+
+
+# --- Черновики ответов (автосохранение по шагам) ---
 
+def _draft_conflict(version: Optional[int]) -> HTTPException:
+    return HTTPException(status_code=409, detail={"message": "Draft was changed", "version": version})
+
+
+@router.post("/{brief_id}/drafts", response_model=schemas.Draft, status_code=status.HTTP_201_CREATED, summary="Начать черновик ответа")
+async def create_draft_endpoint(brief_id: int, draft: schemas.DraftCreate, db: AsyncSession = Depends(get_db)):
+    brief = await responses.get_brief_json(db, brief_id)
+    if brief is None:
+        raise HTTPException(status_code=404, detail="Brief not found")
+    answers = {key: value for key, value in draft.answers.items() if value is not None}
+    db_draft = await crud.create_draft(db, brief_id=brief_id, answers=answers)
+    return {"session_id": db_draft.session_id, "version": db_draft.version, "brief_id": brief_id, "answers_data": answers}
+
+
+@router.get("/drafts/{session_id}", response_model=schemas.Draft, summary="Получить черновик ответа")
+async def get_draft_endpoint(session_id: str, db: AsyncSession = Depends(get_db)):
+    draft = await crud.get_draft(db, session_id=session_id)
+    if draft is None:
+        raise HTTPException(status_code=404, detail="Draft not found")
+    return draft
+
+
+@router.patch("/drafts/{session_id}", response_model=schemas.DraftVersion, summary="Сохранить изменённые ответы черновика")
+async def patch_draft_endpoint(session_id: str, patch: schemas.DraftPatch, db: AsyncSession = Depends(get_db)):
+    """
+    Патч сливается с ответами черновика в БД одним UPDATE: передаются только изменённые
+    ответы, null удаляет ответ. Если черновик успели изменить (version устарела) — 409
+    с текущей версией.
+    """
+    version = await crud.patch_draft(db, session_id=session_id, version=patch.version, answers=patch.answers)
+    if version is None:
+        current = await crud.get_draft_version(db, session_id=session_id)
+        if current is None:
+            raise HTTPException(status_code=404, detail="Draft not found")
+        raise _draft_conflict(current)
+    return {"session_id": session_id, "version": version}
+
+
+@router.post("/drafts/{session_id}/finalize", response_model=schemas.Submission, summary="Отправить черновик как ответ")
+async def finalize_draft_endpoint(session_id: str, finalize: schemas.DraftFinalize, db: AsyncSession = Depends(get_db)):
+    """
+    Черновик переносится в ответы с тем же session_id. Повторный вызов после успешной
+    отправки возвращает уже созданный ответ. version — защита от отправки устаревшего
+    состояния формы.
+    """
+    draft = await crud.get_draft(db, session_id=session_id)
+    if draft is None:
+        submission = await crud.get_submission_row_by_session_id(db, session_id=session_id)
+        if submission is None:
+            raise HTTPException(status_code=404, detail="Draft not found")
+    elif finalize.version is not None and finalize.version != draft.version:
+        raise _draft_conflict(draft.version)
+
+    if draft is None:
+        # Уже отправлен: отдаём ответ с версией брифа, на которую он дан
+        (brief,) = await versions.briefs_for(db, submission.brief_id, [submission.brief_version_id])
+    else:
+        brief = await responses.get_brief_json(db, draft.brief_id)
+    if brief is None:
+        raise HTTPException(status_code=404, detail="Brief not found")
+    if draft is not None:
+        # Черновик с ошибками остаётся черновиком: респондент может исправить и отправить снова.
+        # Ответы на вопросы, удалённые из брифа после начала заполнения, отбрасываются
+        brief, answers = await _checked_answers(db, draft.brief_id, brief, draft.answers_data, drop_unknown=True)
+        choice_options = analytics.choice_options_from_brief(serializers.loads(brief[1]))
+        brief_version_id = await versions.current_version_id(db, draft.brief_id, brief)
+        db_submission = await crud.finalize_draft(db, draft, answers, choice_options=choice_options, brief_version_id=brief_version_id)
+        if db_submission is None:
+            raise _draft_conflict(await crud.get_draft_version(db, session_id=session_id))
+        submission = serializers.SUBMISSION_ROW.values(db_submission)
+    with timed("serialize"):
+        body = serializers.submission_json(submission, brief[1])
+    return Response(content=body, media_type="application/json")
 
 # --- Эндпоинты для загрузки файлов и PDF ---
 
 @router.post("/uploadfile", summary="Загрузить файл")
-async def create_upload_file_endpoint(file: UploadFile = File(...)):
-    session_id = str(uuid.uuid4())
-    file_extension = Path(file.filename).suffix
-    new_filename = f"{session_id}{file_extension}"
-    file_location = UPLOAD_DIR / new_filename
-    
-    with open(file_location, "wb+") as file_object:
-        shutil.copyfileobj(file.file, file_object)
-        
-    return {"url": f"/uploads/{new_filename}"}
+async def create_upload_file_endpoint(request: Request, background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+    # Content-Length включает multipart-обвязку, поэтому это лишь ранняя отсечка;
+    # точный лимит проверяется при копировании
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > config.UPLOAD_MAX_BYTES + 64 * 1024:
+        raise HTTPException(status_code=413, detail="File is too large")
+    try:
+        new_filename = await uploads.store_upload(file.file, file.filename)
+    except uploads.UploadTooLarge:
+        raise HTTPException(status_code=413, detail="File is too large")
+    finally:
+        await file.close()
+
+    # Миниатюра и веб-версия генерируются в фоне уже после ответа
+    variants = image_variants.variant_urls(new_filename)
+    if variants:
+        background_tasks.add_task(image_variants.generate_all, new_filename)
+    return {"url": f"/uploads/{new_filename}", "variants": variants}
+
+
+@router.get("/uploads/{variant}/{filename}", summary="Миниатюра или веб-версия загруженного изображения")
+async def get_upload_variant_endpoint(variant: Literal["thumb", "web"], filename: str):
+    # Только имя файла из каталога загрузок, без путей
+    if Path(filename).name != filename or not image_variants.is_image(filename):
+        raise HTTPException(status_code=404, detail="Image not found")
+    path = await image_variants.get_variant(filename, variant)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    # Имена загрузок не переиспользуются, поэтому вариант можно кэшировать навсегда
+    return FileResponse(path, media_type="image/webp", headers={"Cache-Control": "public, max-age=31536000, immutable"})
 
 
 @router.get("/submissions/{session_id}/pdf", summary="Сгенерировать PDF-отчет")
-async def generate_pdf_report_endpoint(session_id: str, db: AsyncSession = Depends(get_db)):
-    submission = await crud.get_submission_by_session_id(db, session_id=session_id)
+async def generate_pdf_report_endpoint(session_id: str, request: Request, db: AsyncSession = Depends(get_db)):
+    submission = await crud.get_submission_row_by_session_id(db, session_id=session_id)
 
     if not submission:
         raise HTTPException(status_code=404, detail="Submission not found")
 
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
-    
-    FONT_NAME = "DejaVuSans"
-    # Убедитесь, что шрифт DejaVuSans.ttf находится в корневой папке вашего бэкенд-проекта
-    if os.path.exists('DejaVuSans.ttf'):
-        pdfmetrics.registerFont(TTFont(FONT_NAME, "DejaVuSans.ttf"))
-    else:
-        # Если шрифта нет, используем стандартный
-        FONT_NAME = 'Helvetica'
+    # Отчёт строится по версии брифа, на которую дан ответ
+    (brief,) = await versions.briefs_for(db, submission.brief_id, [submission.brief_version_id])
+    if brief is None:
+        raise HTTPException(status_code=404, detail="Brief not found")
 
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name='MainTitle', fontName=FONT_NAME, fontSize=24, spaceAfter=20, alignment=1))
-    styles.add(ParagraphStyle(name='SubTitle', fontName=FONT_NAME, fontSize=14, spaceAfter=20, alignment=1))
-    styles.add(ParagraphStyle(name='Question', fontName=FONT_NAME, fontSize=12, spaceBefore=10, spaceAfter=6, textColor=colors.darkblue))
-    styles.add(ParagraphStyle(name='Answer', fontName=FONT_NAME, fontSize=11, leading=14))
+    cache_key = reports.report_cache_key(submission, brief)
+    headers = {
+        "ETag": f'"{cache_key}"',
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f"inline; filename=report_{session_id}.pdf",
+    }
+    if responses.etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
 
-    story = []
-    
-    # ... (остальная логика генерации PDF)
+    # Рендер идёт в пуле воркеров, event loop в это время обслуживает другие запросы
+    try:
+        path, stat = await reports.get_report_file(submission, brief)
+    except PdfPoolBusy:
+        raise HTTPException(status_code=503, detail="PDF renderer is busy", headers={"Retry-After": "5"})
+    except PdfRenderTimeout:
+        raise HTTPException(status_code=504, detail="PDF rendering timed out")
+    except PdfWorkerCrashed:
+        # Пул уже заменён новым: повтор запроса отрендерит отчёт
+        raise HTTPException(status_code=503, detail="PDF renderer restarted", headers={"Retry-After": "1"})
+    # FileResponse сам выставляет Last-Modified и отвечает на Range-запросы; stat уже
+    # проверен, иначе вытесненный файл дал бы RuntimeError и 500 при отправке
+    return FileResponse(path, media_type="application/pdf", headers=headers, stat_result=stat)
 
-    def add_page_number(canvas, doc):
-        page_num = canvas.getPageNumber()
-        canvas.setFont(FONT_NAME, 9)
-        canvas.drawRightString(letter[0] - inch, 0.75 * inch, f"Страница {page_num}")
 
-    doc.build(story, onFirstPage=add_page_number, onLaterPages=add_page_number)
-    
-    buffer.seek(0)
-    return StreamingResponse(buffer, media_type="application/pdf", headers={"Content-Disposition": f"inline; filename=report_{session_id}.pdf"})
\ No newline at end of file
+
+# --- Массовая выгрузка PDF-отчётов ---
+
+@router.post("/{brief_id}/reports/jobs", response_model=schemas.ReportJob, status_code=status.HTTP_202_ACCEPTED, summary="Запустить выгрузку всех PDF-отчётов брифа в ZIP")
+async def create_report_job_endpoint(
+    brief_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.Principal = Depends(auth.get_current_active_user),
+):
+    owner_id = await crud.get_brief_owner_id(db, brief_id)
+    if owner_id is None or owner_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Бриф не найден")
+    return await report_jobs.create_job(brief_id, owner_id=current_user.id)
+
+
+async def _get_own_job(job_id: str, current_user: schemas.Principal) -> dict:
+    try:
+        state = await report_jobs.get_status(job_id)
+    except report_jobs.JobNotFound:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if state["owner_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return state
+
+
+@router.get("/reports/jobs/{job_id}", response_model=schemas.ReportJob, summary="Статус и прогресс выгрузки отчётов")
+async def get_report_job_endpoint(job_id: str, current_user: schemas.Principal = Depends(auth.get_current_active_user)):
+    return await _get_own_job(job_id, current_user)
+
+
+@router.get("/reports/jobs/{job_id}/download", summary="Скачать ZIP с отчётами")
+async def download_report_job_endpoint(job_id: str, current_user: schemas.Principal = Depends(auth.get_current_active_user)):
+    state = await _get_own_job(job_id, current_user)
+    if state["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {state['status']}")
+    return FileResponse(
+        report_jobs.archive_path(job_id),
+        media_type="application/zip",
+        filename=f"brief_{state['brief_id']}_reports.zip",
+    )
@@ -1,15 +1,16 @@
 # backend/app/routers/main_router.py
 from __future__ import annotations
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from .. import crud, schemas
+from .. import schemas, responses
 from ..database import get_db
 
 router = APIRouter(tags=["Main"])
 
 @router.get("/main-brief", response_model=schemas.Brief)
-async def get_main_brief_endpoint(db: AsyncSession = Depends(get_db)):
-    main_brief = await crud.get_main_brief(db)
-    if not main_brief:
+async def get_main_brief_endpoint(request: Request, db: AsyncSession = Depends(get_db)):
+    main_brief_id = await responses.get_main_brief_id(db)
+    cached = await responses.get_brief_json(db, main_brief_id) if main_brief_id is not None else None
+    if not cached:
         raise HTTPException(status_code=404, detail="Главный бриф не найден.")
-    return main_brief
\ No newline at end of file
+    return responses.json_response(request, *cached)
\ No newline at end of file
@@ -12,8 +12,14 @@ router = APIRouter(tags=["Authentication"])
 @router.post("/token", response_model=schemas.Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     user = await crud.get_user_by_email(db, email=form_data.username)
-    if not user or not auth.verify_password(form_data.password, user.hashed_password):
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect username or password")
+    verified, new_hash = await auth.verify_and_update_password(form_data.password, user.hashed_password)
+    if not verified:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect username or password")
+    if new_hash:
+        # Стоимость bcrypt изменилась — пересохраняем хэш, пока знаем пароль
+        await crud.update_user_password_hash(db, user_id=user.id, hashed_password=new_hash)
     access_token = auth.create_access_token(data={"sub": user.email})
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -24,10 +30,14 @@ async def create_user_endpoint(user: schemas.UserCreate, db: AsyncSession = Depe
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = auth.get_password_hash(user.password)
+    hashed_password = await auth.hash_password(user.password)
     # Используем await, так как функция асинхронная
     return await crud.create_user(db=db, user=user, hashed_password=hashed_password)
 
 @router.get("/users/me", response_model=schemas.User)
-async def read_users_me(current_user: models.User = Depends(auth.get_current_active_user)):
-    return current_user
\ No newline at end of file
+async def read_users_me(
+    current_user: schemas.Principal = Depends(auth.get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    # Полный профиль с брифами нужен только здесь, авторизация идёт по облегчённой модели
+    return await crud.get_user_with_briefs_by_email(db, email=current_user.email)
\ No newline at end of file
@@ -1,8 +1,21 @@
 # backend/app/schemas.py
 from __future__ import annotations
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any, Union
-from datetime import datetime
+from typing import List, Literal, Optional, Dict, Any, Union
+from typing_extensions import Annotated
+from datetime import date, datetime
+
+# --- Условия показа шагов и вопросов ---
+class ShowIf(BaseModel):
+    # Вопрос, от ответа на который зависит показ; None — условие не задано
+    question_id: Optional[int] = None
+    operator: Literal["equals", "not_equals", "contains", "not_contains"] = "equals"
+    # Для ответа-списка (multi_choice) equals означает «список содержит value»;
+    # contains/not_contains из конструктора — те же проверки, что equals/not_equals
+    value: Optional[Union[str, int, float, bool]] = None
+
+class ConditionalLogic(BaseModel):
+    show_if: Optional[ShowIf] = None
 
 # --- Вопросы ---
 class QuestionBase(BaseModel):
@@ -11,9 +24,11 @@ class QuestionBase(BaseModel):
     options: Optional[List[str]] = None
     is_required: bool = False
     config: Optional[Dict[str, Any]] = None
+    conditional_logic: Optional[ConditionalLogic] = None
 
 class QuestionCreate(QuestionBase):
-    pass
+    # id существующего вопроса при обновлении брифа; без id вопрос считается новым
+    id: Optional[int] = None
 
 class Question(QuestionBase):
     id: int
@@ -24,8 +39,10 @@ class Question(QuestionBase):
 class StepBase(BaseModel):
     title: str
     description: Optional[str] = None
+    conditional_logic: Optional[ConditionalLogic] = None
 
 class StepCreate(StepBase):
+    id: Optional[int] = None
     questions: List[QuestionCreate] = []
 
 class Step(StepBase):
@@ -52,6 +69,20 @@ class Brief(BriefBase):
     class Config:
         orm_mode = True
         
+# --- Видимость шагов по ответам ---
+class VisibilityRequest(BaseModel):
+    answers: Dict[str, Any] = {}
+    # Шаг, на котором сейчас респондент: в ответе будет следующий видимый шаг после него
+    current_step_id: Optional[int] = None
+
+class VisibleStep(BaseModel):
+    id: int
+    question_ids: List[int]
+
+class Visibility(BaseModel):
+    steps: List[VisibleStep]
+    next_step_id: Optional[int] = None
+
 # --- Ответы ---
 class SubmissionBase(BaseModel):
     brief_id: int
@@ -64,10 +95,106 @@ class Submission(SubmissionBase):
     session_id: str
     created_at: datetime
     answers_data: Dict[str, Any]
+    # Версия брифа, на которую дан ответ; brief — эта версия (у старых ответов без версии — текущий бриф)
+    brief_version_id: Optional[int] = None
     brief: Brief
     class Config:
         orm_mode = True
 
+class SubmissionRow(SubmissionBase):
+    """Ответ без вложенного брифа — для постраничных списков и выгрузок."""
+    id: int
+    session_id: str
+    created_at: datetime
+    answers_data: Dict[str, Any]
+    brief_version_id: Optional[int] = None
+    class Config:
+        orm_mode = True
+
+class SubmissionAccepted(BaseModel):
+    """Ответ принят в очередь пакетной записи (SUBMISSION_INGEST_MODE=batched)."""
+    session_id: str
+    brief_id: int
+
+# --- Черновики ответов ---
+# Ключ ответа — id вопроса; при слиянии в БД он попадает в путь JSON
+QuestionKey = Annotated[str, Field(pattern=r"^[0-9]+$", max_length=18)]
+
+class DraftCreate(BaseModel):
+    answers: Dict[QuestionKey, Any] = {}
+
+class DraftPatch(BaseModel):
+    # Версия, на которой основан патч; при расхождении с текущей — 409
+    version: int
+    # Только изменённые ответы; null удаляет ответ из черновика
+    answers: Dict[QuestionKey, Any]
+
+class DraftFinalize(BaseModel):
+    version: Optional[int] = None
+
+class DraftVersion(BaseModel):
+    session_id: str
+    version: int
+
+class Draft(DraftVersion):
+    brief_id: int
+    answers_data: Dict[str, Any]
+
+class SubmissionPage(BaseModel):
+    # Бриф возвращается только на первой странице (без курсора)
+    brief: Optional[Brief] = None
+    items: List[SubmissionRow] = []
+    next_cursor: Optional[str] = None
+
+# --- Поиск по ответам ---
+class SearchFilter(BaseModel):
+    question_id: int
+    operator: Literal["equals", "gt", "gte", "lt", "lte"] = "equals"
+    # Число сравнивается как число (в том числе с ответом-строкой "1000000"), строка — как строка
+    # (ISO-даты сравниваются по порядку). Для ответа-списка условие выполняется, если подходит хотя бы один элемент.
+    # 1e999 и подобные разбираются в inf, которого нет в jsonpath, — такие числа отклоняются
+    value: Union[Annotated[float, Field(allow_inf_nan=False)], str]
+
+class SubmissionSearch(BaseModel):
+    # Полнотекстовый запрос по тексту ответов (синтаксис websearch_to_tsquery: "фраза", or, -слово)
+    query: Optional[str] = Field(None, max_length=500)
+    filters: List[SearchFilter] = Field([], max_length=20)
+    cursor: Optional[str] = None
+    limit: int = Field(100, ge=1, le=1000)
+
+class SubmissionSearchPage(BaseModel):
+    items: List[SubmissionRow] = []
+    next_cursor: Optional[str] = None
+
+# --- Аналитика ---
+class QuestionAnalytics(BaseModel):
+    question_id: int
+    text: str
+    question_type: str
+    is_required: bool
+    answered: int
+    fill_rate: float
+    option_counts: Dict[str, int] = {}
+
+class DailyCount(BaseModel):
+    day: date
+    count: int
+
+class BriefAnalytics(BaseModel):
+    brief_id: int
+    total_submissions: int
+    submissions_per_day: List[DailyCount] = []
+    questions: List[QuestionAnalytics] = []
+
+# --- Выгрузка отчётов ---
+class ReportJob(BaseModel):
+    job_id: str
+    brief_id: int
+    status: str
+    total: Optional[int] = None
+    done: int = 0
+    error: Optional[str] = None
+
 # --- Пользователи ---
 class UserBase(BaseModel):
     email: str
@@ -83,6 +210,11 @@ class User(UserBase):
     class Config:
         orm_mode = True
 
+class Principal(UserBase):
+    """Облегчённый пользователь для авторизации: только колонки, без брифов."""
+    id: int
+    is_active: bool
+
 # --- Токены ---
 class Token(BaseModel):
     access_token: str
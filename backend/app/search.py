@@ -0,0 +1,106 @@
+# backend/app/search.py
+"""
+Поиск по ответам брифа: полнотекстовый запрос по тексту ответов и фильтры по
+значениям отдельных вопросов. Условия добавляются к обычной постраничной выборке
+(crud.get_submissions_page), поэтому результат идёт от новых к старым с тем же
+курсором, а не по релевантности: так страница не требует ранжировать все совпадения.
+
+В Postgres условия опираются на GIN-индексы миграции d5e1b7f3a9c4:
+  - ix_submissions_answers_text — tsvector строковых и числовых значений answers_data;
+  - ix_submissions_answers_path — jsonb_path_ops по answers_data.
+Выражения ниже должны совпадать с выражениями индексов, иначе планировщик их не
+узнает. Все фильтры собираются в один jsonpath для оператора @?: равенства из
+него индекс извлекает, сравнения «больше/меньше» проверяются уже на строках,
+отобранных по brief_id и остальным условиям. В lax-режиме jsonpath ответ-список
+(multi_choice) разворачивается, так что «вопрос = значение» находит и ответы,
+содержащие значение; .double() на нечисловой строке не ошибка, а несовпадение.
+
+В SQLite (тесты, локальный запуск) те же условия проверяются перебором через
+json_each/json_tree без индексов: все слова запроса должны встретиться в ответах
+подстрокой (без словоформ и операторов websearch, регистр — только для латиницы).
+"""
+from __future__ import annotations
+import json
+import operator
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Float, and_, cast, func, literal, not_, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models, schemas
+
+# Конфигурация разбора текста; менять вместе с индексом ix_submissions_answers_text
+TEXT_SEARCH_CONFIG = "russian"
+
+_TSVECTOR = f"""jsonb_to_tsvector('{TEXT_SEARCH_CONFIG}', answers_data::jsonb, '["string", "numeric"]')"""
+
+_COMPARISONS = {"equals": "==", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+_OPERATORS = {"equals": operator.eq, "gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}
+
+
+def _jsonpath_condition(search_filter: schemas.SearchFilter) -> str:
+    accessor = f'@."{search_filter.question_id}"'
+    value = search_filter.value
+    if isinstance(value, float):
+        accessor, value = accessor + ".double()", repr(value)
+    else:
+        value = json.dumps(value)
+    return f"{accessor} {_COMPARISONS[search_filter.operator]} {value}"
+
+
+def _postgresql_conditions(query: Optional[str], filters: Sequence[schemas.SearchFilter]) -> List:
+    conditions = []
+    if query:
+        conditions.append(
+            text(f"{_TSVECTOR} @@ websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', :search_query)").bindparams(search_query=query)
+        )
+    if filters:
+        path = "$ ? (%s)" % " && ".join(_jsonpath_condition(f) for f in filters)
+        conditions.append(text("answers_data::jsonb @? CAST(:search_path AS jsonpath)").bindparams(search_path=path))
+    return conditions
+
+
+def _like_pattern(word: str) -> str:
+    return "%" + word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _sqlite_is_number(value):
+    # Строка из цифр, точки, знака и экспоненты; CAST нечисловой строки в SQLite даёт 0, а не ошибку
+    return and_(value.op("GLOB")("*[0-9]*"), not_(value.op("GLOB")("*[^0-9.eE+-]*")))
+
+
+def _sqlite_filter(search_filter: schemas.SearchFilter):
+    # json_each по скаляру даёт одну строку, по списку — его элементы, как lax-режим jsonpath
+    items = func.json_each(models.Submission.answers_data, f'$."{search_filter.question_id}"').table_valued("value", "type")
+    value = items.c.value
+    if isinstance(search_filter.value, float):
+        matches = or_(items.c.type.in_(("integer", "real")), and_(items.c.type == "text", _sqlite_is_number(value)))
+        value = cast(value, Float)
+    else:
+        matches = items.c.type == "text"
+    compare = _OPERATORS[search_filter.operator]
+    return select(literal(1)).select_from(items).where(matches, compare(value, search_filter.value)).exists()
+
+
+def _sqlite_conditions(query: Optional[str], filters: Sequence[schemas.SearchFilter]) -> List:
+    conditions = []
+    for word in (query or "").split():
+        leaves = func.json_tree(models.Submission.answers_data).table_valued("value", "type")
+        conditions.append(
+            select(literal(1)).select_from(leaves)
+            .where(leaves.c.type.in_(("text", "integer", "real")), leaves.c.value.like(_like_pattern(word.strip('"')), escape="\\"))
+            .exists()
+        )
+    conditions.extend(_sqlite_filter(f) for f in filters)
+    return conditions
+
+
+def submission_conditions(db: AsyncSession, query: Optional[str], filters: Sequence[schemas.SearchFilter]) -> List:
+    """Условия WHERE для выборки ответов по поисковому запросу и фильтрам."""
+    query = (query or "").strip() or None
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return _postgresql_conditions(query, filters)
+    if dialect == "sqlite":
+        return _sqlite_conditions(query, filters)
+    raise NotImplementedError(f"Submission search is not supported for {dialect}")
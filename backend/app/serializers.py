@@ -0,0 +1,109 @@
+# backend/app/serializers.py
+"""
+Быстрая сериализация брифов и ответов в JSON без ORM-объектов и повторной валидации.
+
+Колонки выбираются в порядке полей схем (schemas.Brief, Step, Question, SubmissionRow)
+и собираются в словари, поэтому результат байт в байт совпадает с model_dump_json().
+Поля схемы без колонки в модели (Question.config) выбираются константой — значением
+по умолчанию из схемы.
+
+Брифы кодируются orjson: в них только строки, целые, bool, None и даты.
+В answers_data может быть что угодно от респондента, в том числе float, которые
+orjson пишет иначе (1e20 против 1e+20), поэтому ответы кодирует Rust-сериализатор
+pydantic — тот же, что у model_dump_json. Бриф внутри ответа не сериализуется
+заново: подставляются готовые байты из кэша брифов.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import orjson
+import pydantic_core
+from sqlalchemy import literal, null
+
+from . import models, schemas
+
+loads = orjson.loads
+
+
+def dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, option=orjson.OPT_UTC_Z)
+
+
+class _Layout:
+    """Поля схемы по порядку и выражения для их выборки: колонка модели или константа default.
+
+    Строка выборки по `columns` превращается в словарь схемы одним zip без обращения по именам.
+    """
+
+    def __init__(self, schema, model, nested: Optional[str] = None):
+        self.fields = tuple(name for name in schema.model_fields if name != nested)
+        table_columns = model.__table__.c
+        self.columns = [
+            table_columns[name] if name in table_columns else _constant(schema.model_fields[name].default).label(name)
+            for name in self.fields
+        ]
+
+    def build(self, row) -> Dict[str, Any]:
+        return dict(zip(self.fields, row))
+
+    def values(self, obj) -> Tuple[Any, ...]:
+        """Строка для build() из ORM-объекта (все поля схемы — колонки модели)."""
+        return tuple(getattr(obj, name) for name in self.fields)
+
+
+def _constant(value):
+    return null() if value is None else literal(value)
+
+
+BRIEF = _Layout(schemas.Brief, models.Brief, nested="steps")
+STEP = _Layout(schemas.Step, models.Step, nested="questions")
+QUESTION = _Layout(schemas.Question, models.Question)
+SUBMISSION_ROW = _Layout(schemas.SubmissionRow, models.Submission)
+
+# Строка шагов: колонки STEP, brief_id, затем колонки QUESTION (NULL у шага без вопросов)
+_STEP_ID = STEP.fields.index("id")
+_STEP_BRIEF_ID = len(STEP.fields)
+_QUESTION_START = _STEP_BRIEF_ID + 1
+_QUESTION_ID = _QUESTION_START + QUESTION.fields.index("id")
+
+
+def step_rows_columns() -> list:
+    return [*STEP.columns, models.Step.brief_id, *QUESTION.columns]
+
+
+def brief_trees(brief_rows: Iterable, step_rows: Iterable) -> List[Dict[str, Any]]:
+    """Сборка деревьев брифов: brief_rows — по BRIEF.columns, step_rows — по step_rows_columns(),
+    шаг с вопросами идёт подряд, в нужном порядке шагов и вопросов."""
+    steps_by_brief: Dict[int, List[Dict[str, Any]]] = {}
+    step: Optional[Dict[str, Any]] = None
+    questions: List[Dict[str, Any]] = []
+    for row in step_rows:
+        if step is None or row[_STEP_ID] != step["id"]:
+            step = STEP.build(row)
+            questions = step["questions"] = []
+            steps_by_brief.setdefault(row[_STEP_BRIEF_ID], []).append(step)
+        if row[_QUESTION_ID] is not None:
+            questions.append(QUESTION.build(row[_QUESTION_START:]))
+
+    trees = []
+    for row in brief_rows:
+        brief = BRIEF.build(row)
+        brief["steps"] = steps_by_brief.get(brief["id"], [])
+        trees.append(brief)
+    return trees
+
+
+# --- Ответы ---
+def submission_row_json(row) -> bytes:
+    """Ответ без брифа, как schemas.SubmissionRow; row — по SUBMISSION_ROW.columns или SUBMISSION_ROW.values()."""
+    return pydantic_core.to_json(SUBMISSION_ROW.build(row))
+
+
+def submission_json(row, brief_body: bytes) -> bytes:
+    """Ответ с брифом, как schemas.Submission: бриф — последнее поле схемы."""
+    return submission_row_json(row)[:-1] + b',"brief":' + brief_body + b"}"
+
+
+def submission_list_json(rows: Sequence, brief_bodies: Sequence[bytes]) -> bytes:
+    """Список ответов с брифами: brief_bodies[i] — JSON брифа (версии) для rows[i]."""
+    return b"[" + b",".join(submission_json(row, body) for row, body in zip(rows, brief_bodies)) + b"]"
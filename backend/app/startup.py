@@ -0,0 +1,108 @@
+# backend/app/startup.py
+"""
+Старт воркера: подготовка БД и замер времени запуска.
+
+DB_STARTUP_MODE:
+  create_all — Base.metadata.create_all (локальная разработка без миграций);
+  verify     — только сверка ревизии БД с head Alembic; схему создаёт `alembic upgrade head`
+               один раз до запуска воркеров, и воркеры не гоняются друг с другом за DDL;
+  skip       — ничего не проверять.
+"""
+from __future__ import annotations
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+from . import config
+from .database import engine, init_db
+
+logger = logging.getLogger("uvicorn.error")
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+_timings: Dict[str, Optional[float]] = {
+    "import_seconds": None,
+    "startup_seconds": None,
+    "first_request_seconds": None,
+}
+_import_started: Optional[float] = None
+
+
+class SchemaRevisionMismatch(RuntimeError):
+    pass
+
+
+def _alembic_heads() -> set:
+    # Alembic нужен только в режиме verify, поэтому импортируется здесь
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    alembic_config = Config(str(ALEMBIC_INI))
+    alembic_config.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
+    return set(ScriptDirectory.from_config(alembic_config).get_heads())
+
+
+async def verify_revision() -> None:
+    async with engine.connect() as conn:
+        try:
+            current = set((await conn.execute(text("SELECT version_num FROM alembic_version"))).scalars().all())
+        except Exception as exc:
+            raise SchemaRevisionMismatch("alembic_version not found: run `alembic upgrade head`") from exc
+    heads = _alembic_heads()
+    if current != heads:
+        raise SchemaRevisionMismatch(
+            f"Database revision {sorted(current)} != migrations head {sorted(heads)}: run `alembic upgrade head`"
+        )
+
+
+async def prepare_database() -> None:
+    mode = config.DB_STARTUP_MODE
+    if mode == "create_all":
+        await init_db()
+    elif mode == "verify":
+        await verify_revision()
+    elif mode != "skip":
+        raise ValueError(f"Unknown DB_STARTUP_MODE: {mode}")
+
+
+# --- Замер времени запуска ---
+def mark_imported(import_started: float) -> None:
+    """Вызывается из main после импорта роутеров; import_started — время начала импорта main."""
+    global _import_started
+    _import_started = import_started
+    _timings["import_seconds"] = _elapsed()
+
+
+def mark_started() -> None:
+    _timings["startup_seconds"] = _elapsed()
+    logger.info("Worker started: import %.3fs, ready %.3fs", _timings["import_seconds"] or 0.0, _timings["startup_seconds"])
+
+
+def _elapsed() -> float:
+    return round(time.perf_counter() - (_import_started or time.perf_counter()), 4)
+
+
+def startup_report() -> Dict[str, Any]:
+    return {"db_startup_mode": config.DB_STARTUP_MODE, **_timings}
+
+
+class FirstRequestTimer:
+    """ASGI-middleware: фиксирует время от импорта приложения до первого обработанного запроса."""
+
+    def __init__(self, app):
+        self.app = app
+        self.pending = True
+
+    async def __call__(self, scope, receive, send):
+        if not self.pending or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if self.pending:
+                self.pending = False
+                _timings["first_request_seconds"] = _elapsed()
+                logger.info("First request served %.3fs after import", _timings["first_request_seconds"])
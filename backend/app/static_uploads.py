@@ -0,0 +1,178 @@
+# backend/app/static_uploads.py
+"""
+Раздача /uploads с расчётом на кэширование браузером и CDN.
+
+Имена загрузок уникальны и файлы не перезаписываются, поэтому ответы помечаются
+Cache-Control: immutable и сильным ETag (для файлов с именем-хэшем это сам хэш).
+Сжимаемые типы (SVG, PDF, текст) один раз сжимаются в gzip/brotli рядом с
+оригиналом (UPLOAD_DIR/_compressed) и дальше отдаются готовыми. Сжатие идёт в фоне
+после первого запроса (brotli 11 на файле в мегабайты — секунды), одно на файл и
+кодировку даже при параллельных запросах; пока оно не готово или если не удалось,
+отдаётся оригинал. Range-запросы обслуживаются по несжатому оригиналу.
+"""
+from __future__ import annotations
+import asyncio
+import gzip
+import logging
+import mimetypes
+import os
+import re
+import tempfile
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import FileResponse, PlainTextResponse, Response
+
+from .responses import etag_matches
+
+try:
+    from starlette._utils import get_route_path
+except ImportError:  # старые версии Starlette сами обрезают scope["path"] у Mount
+    def get_route_path(scope) -> str:
+        return scope["path"]
+
+logger = logging.getLogger("uvicorn.error")
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+COMPRESSED_DIR_NAME = "_compressed"
+COMPRESSIBLE_TYPES = {
+    "image/svg+xml", "application/pdf", "application/json", "application/xml",
+    "application/javascript", "text/javascript",
+}
+MIN_COMPRESS_BYTES = 1024
+MAX_COMPRESS_BYTES = 10 * 1024 * 1024
+_CONTENT_HASH = re.compile(r"^[0-9a-f]{64}$")
+# Идущие сжатия по целевому файлу: параллельные запросы не запускают второе
+_pending: Dict[Path, asyncio.Future] = {}
+
+
+def _is_compressible(media_type: str) -> bool:
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+def _accepted_encodings(request: Request):
+    accepted = set()
+    for item in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    # brotli предпочтительнее: сжимает текст и SVG заметно лучше gzip
+    return [enc for enc in ("br", "gzip") if enc in accepted]
+
+
+def _compress(source: Path, target: Path, encoding: str) -> None:
+    data = source.read_bytes()
+    if encoding == "br":
+        import brotli
+        compressed = brotli.compress(data, quality=11)
+    else:
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(compressed)
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _compress_quietly(source: Path, target: Path, encoding: str) -> None:
+    try:
+        _compress(source, target, encoding)
+    except ImportError:
+        pass  # brotli не установлен — остаётся gzip
+    except Exception:
+        # Нет места, нет прав и т. п.: файл и дальше отдаётся несжатым
+        logger.exception("Cannot compress %s to %s", source, encoding)
+
+
+class UploadFiles:
+    """ASGI-приложение для app.mount("/uploads", ...), заменяет StaticFiles."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.root = self.directory.resolve()
+
+    async def __call__(self, scope, receive, send) -> None:
+        assert scope["type"] == "http"
+        response = await self.get_response(Request(scope, receive))
+        await response(scope, receive, send)
+
+    def _lookup(self, route_path: str) -> Optional[Path]:
+        name = route_path.lstrip("/")
+        parts = name.split("/")
+        # Скрытые, временные и служебные файлы не отдаём
+        if not name or any(not p or p.startswith(".") or p == ".." for p in parts):
+            return None
+        if parts[0] == COMPRESSED_DIR_NAME or name.endswith(".part"):
+            return None
+        path = (self.directory / name).resolve()
+        try:
+            path.relative_to(self.root)
+        except ValueError:
+            return None
+        return path if path.is_file() else None
+
+    async def get_response(self, request: Request) -> Response:
+        if request.method not in ("GET", "HEAD"):
+            return PlainTextResponse("Method Not Allowed", status_code=405)
+        path = await run_in_threadpool(self._lookup, get_route_path(request.scope))
+        if path is None:
+            return PlainTextResponse("Not Found", status_code=404)
+
+        stat = await run_in_threadpool(os.stat, path)
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        # Имя загрузки — sha256 содержимого, он и есть сильный ETag
+        stem = path.name.split(".", 1)[0]
+        etag = f'"{stem}"' if _CONTENT_HASH.match(stem) else f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        headers = {"Cache-Control": CACHE_CONTROL}
+        compressible = _is_compressible(media_type)
+        if compressible:
+            headers["Vary"] = "Accept-Encoding"
+
+        encoding = None
+        if compressible and "range" not in request.headers and MIN_COMPRESS_BYTES <= stat.st_size <= MAX_COMPRESS_BYTES:
+            for candidate in _accepted_encodings(request):
+                compressed = await self._compressed_path(path, candidate)
+                if compressed is not None and compressed.stat().st_size < stat.st_size:
+                    encoding, path = candidate, compressed
+                    break
+        if encoding:
+            etag = f'{etag[:-1]}-{encoding}"'
+            headers["Content-Encoding"] = encoding
+        headers["ETag"] = etag
+
+        if self._not_modified(request, etag, stat.st_mtime):
+            return Response(status_code=304, headers=headers)
+        # FileResponse выставляет Last-Modified и отвечает на Range / If-Range
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    async def _compressed_path(self, path: Path, encoding: str) -> Optional[Path]:
+        """Готовая сжатая копия; иначе None и запуск сжатия в фоне, если оно ещё не идёт."""
+        relative = path.relative_to(self.root)
+        target = self.root / COMPRESSED_DIR_NAME / f"{relative}.{'br' if encoding == 'br' else 'gz'}"
+        if target.exists():
+            return target
+        if target not in _pending:
+            pending = asyncio.ensure_future(run_in_threadpool(_compress_quietly, path, target, encoding))
+            _pending[target] = pending
+            pending.add_done_callback(lambda _: _pending.pop(target, None))
+        return None
+
+    @staticmethod
+    def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+        if "if-none-match" in request.headers:
+            return etag_matches(request, etag)
+        since = request.headers.get("if-modified-since")
+        if since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
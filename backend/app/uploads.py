@@ -0,0 +1,70 @@
+# backend/app/uploads.py
+"""
+Сохранение загруженных файлов с адресацией по содержимому.
+
+Файл копируется пачками в отдельном потоке (event loop не блокируется на диске),
+по пути считается sha256 и размер; превышение UPLOAD_MAX_BYTES прерывает копирование.
+Итоговое имя — хэш содержимого, поэтому повторная загрузка того же файла
+не создаёт копию на диске.
+"""
+from __future__ import annotations
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import BinaryIO
+
+from starlette.concurrency import run_in_threadpool
+
+from . import config
+
+UPLOAD_DIR = Path(config.UPLOAD_DIR)
+CHUNK_SIZE = 1024 * 1024
+_SAFE_SUFFIX = re.compile(r"^\.[a-z0-9]{1,10}$")
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def safe_suffix(filename: str) -> str:
+    suffix = Path(filename or "").suffix.lower()
+    return suffix if _SAFE_SUFFIX.match(suffix) else ""
+
+
+def _store(source: BinaryIO, suffix: str, max_bytes: int) -> str:
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                tmp.write(chunk)
+
+        filename = f"{digest.hexdigest()}{suffix}"
+        target = UPLOAD_DIR / filename
+        if target.exists():
+            # Такой файл уже есть — дубликат не сохраняем
+            os.unlink(tmp_path)
+        else:
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, target)
+        return filename
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+async def store_upload(source: BinaryIO, original_filename: str) -> str:
+    """Сохраняет файл и возвращает его имя в каталоге загрузок."""
+    return await run_in_threadpool(_store, source, safe_suffix(original_filename), config.UPLOAD_MAX_BYTES)
@@ -0,0 +1,160 @@
+# backend/app/validation.py
+"""
+Проверка ответа на бриф перед записью.
+
+Из вопросов брифа один раз собирается таблица «ключ ответа → проверка значения»
+и список обязательных вопросов; таблица кэшируется по ETag брифа, как и условия
+показа (app.logic), так что правка брифа (update_brief меняет содержимое и ETag)
+сама выводит из употребления старую. Проверка ответа — один проход по его ключам
+и по обязательным вопросам.
+
+Значения проверяются в той форме, в какой их шлёт форма: числа и шкала приходят
+строками из <input>, файл — списком {name, url} загруженных файлов. Пустые значения
+(analytics.is_answered) считаются неотвеченными и проверяются только на обязательность.
+"""
+from __future__ import annotations
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from . import analytics, serializers
+from .cache import compiled_brief_cache
+
+# Проверка значения: None — значение подходит, иначе (type, msg) ошибки
+Check = Callable[[Any], Optional[Tuple[str, str]]]
+
+
+def _is_scalar(value: Any) -> bool:
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+
+def _is_number(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return True
+    if isinstance(value, str):
+        try:
+            float(value)
+        except ValueError:
+            return False
+        return True
+    return False
+
+
+def _accept(value: Any) -> None:
+    return None
+
+
+def _check_text(value: Any):
+    if not _is_scalar(value):
+        return "type_error", "Expected a string"
+    return None
+
+
+def _check_number(value: Any):
+    if not _is_number(value):
+        return "type_error", "Expected a number"
+    return None
+
+
+def _check_date(value: Any):
+    try:
+        date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return "type_error", "Expected a date in YYYY-MM-DD format"
+    return None
+
+
+def _check_files(value: Any):
+    if not isinstance(value, list) or not all(isinstance(f, dict) and isinstance(f.get("url"), str) for f in value):
+        return "type_error", "Expected a list of uploaded files"
+    return None
+
+
+def _one_of(options: Set[str]) -> Check:
+    def check(value: Any):
+        if not _is_scalar(value) or str(value) not in options:
+            return "invalid_option", "Value is not one of the question options"
+        return None
+    return check
+
+
+def _many_of(options: Set[str]) -> Check:
+    def check(value: Any):
+        if not isinstance(value, list) or not all(_is_scalar(v) for v in value):
+            return "type_error", "Expected a list of options"
+        if not {str(v) for v in value} <= options:
+            return "invalid_option", "Value is not one of the question options"
+        return None
+    return check
+
+
+def compile_check(question: Dict[str, Any]) -> Check:
+    kind = question["question_type"]
+    options = {str(o) for o in question.get("options") or ()}
+    if kind == "single_choice":
+        return _one_of(options) if options else _check_text
+    if kind == "multi_choice":
+        return _many_of(options) if options else _accept
+    if kind == "linear_scale":
+        return _one_of(options) if options else _check_number
+    if kind == "number":
+        return _check_number
+    if kind == "date":
+        return _check_date
+    if kind == "file":
+        return _check_files
+    if kind == "text":
+        return _check_text
+    # Тип, о котором сервер не знает: значение сохраняется как есть
+    return _accept
+
+
+class SubmissionValidator:
+    """Скомпилированные проверки ответов на вопросы брифа."""
+
+    def __init__(self, brief: dict):
+        questions = [q for step in brief["steps"] for q in step["questions"]]
+        self.checks: Dict[str, Check] = {str(q["id"]): compile_check(q) for q in questions}
+        self.required: List[str] = [str(q["id"]) for q in questions if q.get("is_required")]
+
+    def known(self, answers: Dict[str, Any]) -> Dict[str, Any]:
+        """Ответы только на вопросы этого брифа."""
+        checks = self.checks
+        return {key: value for key, value in answers.items() if key in checks}
+
+    def validate(self, answers: Dict[str, Any], visible_keys: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Ошибки по вопросам в формате ошибок валидации FastAPI; пустой список — ответ корректен.
+
+        visible_keys — ключи вопросов, видимых при этих ответах (logic.BriefLogic.visible);
+        скрытый обязательный вопрос не требует ответа. None — видимы все.
+        """
+        errors = []
+        checks = self.checks
+        for key, value in answers.items():
+            check = checks.get(key)
+            if check is None:
+                errors.append(_error(key, "unknown_question", "Question does not belong to this brief"))
+            elif analytics.is_answered(value):
+                failure = check(value)
+                if failure is not None:
+                    errors.append(_error(key, *failure))
+        for key in self.required:
+            if (visible_keys is None or key in visible_keys) and not analytics.is_answered(answers.get(key)):
+                errors.append(_error(key, "required", "Answer is required"))
+        return errors
+
+
+def _error(key: str, error_type: str, message: str) -> Dict[str, Any]:
+    return {"loc": ["body", "answers", key], "msg": message, "type": error_type, "question_id": key}
+
+
+def get_validator(brief: Tuple[str, bytes]) -> SubmissionValidator:
+    """Проверки для (etag, json) брифа из responses.get_brief_json; собираются при первом обращении."""
+    etag, body = brief
+    key = ("validator", etag)
+    compiled = compiled_brief_cache.get(key)
+    if compiled is None:
+        compiled = SubmissionValidator(serializers.loads(body))
+        compiled_brief_cache.set(key, compiled)
+    return compiled
@@ -0,0 +1,77 @@
+# backend/app/versions.py
+"""
+Неизменяемые версии брифов.
+
+Версия — JSON брифа в том виде, в каком его отдаёт GET /briefs/{id}, адресуемый
+sha256 содержимого. Версия создаётся при публикации (создание и правка брифа), а
+если содержимое изменилось в обход публикации (назначение главным меняет is_main),
+— при первом ответе на новое содержимое. Ответ хранит id версии и читается вместе
+с ней: ни список ответов, ни PDF-отчёт не обращаются к текущему дереву брифа.
+
+Версии не меняются, поэтому воркер кэширует их без срока жизни, а GET
+/briefs/versions/{id} отдаётся с Cache-Control: immutable, чтобы снимок держали
+браузеры и общий HTTP-кэш перед воркерами.
+"""
+from __future__ import annotations
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, responses
+from .cache import brief_version_cache, compiled_brief_cache
+
+# (etag, json) — как у responses.get_brief_json; ETag версии совпадает с ETag брифа того же содержимого
+BriefJson = Tuple[str, bytes]
+
+
+async def current_version_id(db: AsyncSession, brief_id: int, brief: BriefJson) -> int:
+    """id версии для текущего (etag, json) брифа; при первом обращении к содержимому — из БД."""
+    etag, body = brief
+    key = ("version_id", etag)
+    version_id = compiled_brief_cache.get(key)
+    if version_id is None:
+        version_id = await crud.ensure_brief_version(db, brief_id, hashlib.sha256(body).hexdigest(), body)
+        compiled_brief_cache.set(key, version_id)
+        brief_version_cache.set(version_id, brief)
+    return version_id
+
+
+async def publish(db: AsyncSession, brief_id: int) -> Optional[BriefJson]:
+    """Фиксирует текущее содержимое брифа как версию; возвращает его (etag, json)."""
+    brief = await responses.get_brief_json(db, brief_id)
+    if brief is not None:
+        await current_version_id(db, brief_id, brief)
+    return brief
+
+
+async def get_versions(db: AsyncSession, version_ids: Iterable[int]) -> Dict[int, BriefJson]:
+    """Версии по id: из кэша, недостающие — одним запросом."""
+    found: Dict[int, BriefJson] = {}
+    missing = []
+    for version_id in set(version_ids):
+        cached = brief_version_cache.get(version_id)
+        if cached is None:
+            missing.append(version_id)
+        else:
+            found[version_id] = cached
+    if missing:
+        for version_id, body in await crud.get_brief_version_bodies(db, missing):
+            body = body.encode("utf-8")
+            found[version_id] = entry = (responses.make_etag(body), body)
+            brief_version_cache.set(version_id, entry)
+    return found
+
+
+async def get_version(db: AsyncSession, version_id: int) -> Optional[BriefJson]:
+    return (await get_versions(db, (version_id,))).get(version_id)
+
+
+async def briefs_for(db: AsyncSession, brief_id: int, version_ids: List[Optional[int]]) -> List[Optional[BriefJson]]:
+    """Бриф для каждого ответа по его brief_version_id. Текущий бриф загружается только
+    для ответов без версии (записанных до появления версий)."""
+    versions = await get_versions(db, (v for v in version_ids if v is not None))
+    live = None
+    if any(v is None or v not in versions for v in version_ids):
+        live = await responses.get_brief_json(db, brief_id)
+    return [versions.get(v, live) if v is not None else live for v in version_ids]
@@ -0,0 +1,162 @@
+# backend/benchmarks/api.py
+"""
+Нагрузочный прогон основных эндпоинтов API.
+
+Поднимает app.main:app (вместе с lifespan) на локальной базе, наполняет её брифами
+и ответами (benchmarks.seed) и гоняет каждый сценарий конкурентным async-клиентом.
+Результат — JSON с пропускной способностью и p50/p95/p99 по сценариям, пригодный
+для сравнения прогонов между коммитами.
+
+    python -m benchmarks.api --briefs 20 --submissions 500 --requests 500 --concurrency 20 --output bench.json
+    python -m benchmarks.api --scenarios main_brief,brief
+
+--base-url направляет запросы в уже запущенный сервер (uvicorn/gunicorn); сервер
+и бенчмарк должны смотреть в одну базу (DATABASE_URL), наполнять её будет бенчмарк.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from benchmarks.common import configure_env, drive, run_metadata, write_results
+
+SCENARIOS = [
+    "main_brief",
+    "main_brief_not_modified",
+    "brief",
+    "submissions_page",
+    "submission_get",
+    "submission_create",
+    "analytics",
+    "pdf",
+    "pdf_cached",
+]
+
+
+def build_scenarios(client, data, token: str, rng: random.Random) -> Dict[str, Callable[[int], Awaitable[Any]]]:
+    from benchmarks.seed import answers_for
+
+    auth_headers = {"Authorization": f"Bearer {token}"}
+    briefs = data.brief_ids
+    sessions = data.session_ids
+    etags: Dict[str, str] = {}
+
+    async def main_brief(i):
+        return await client.get("/main-brief")
+
+    async def main_brief_not_modified(i):
+        if "main" not in etags:
+            etags["main"] = (await client.get("/main-brief")).headers.get("etag", "")
+        return await client.get("/main-brief", headers={"If-None-Match": etags["main"]})
+
+    async def brief(i):
+        return await client.get(f"/briefs/{briefs[i % len(briefs)]}")
+
+    async def submissions_page(i):
+        return await client.get(f"/briefs/{briefs[i % len(briefs)]}/submissions/page", params={"limit": 50})
+
+    async def submission_get(i):
+        return await client.get(f"/briefs/submission/{sessions[i * 7919 % len(sessions)]}")
+
+    async def submission_create(i):
+        brief_id = briefs[i % len(briefs)]
+        return await client.post(
+            "/briefs/submissions", json={"brief_id": brief_id, "answers": answers_for(data.questions[brief_id], rng)}
+        )
+
+    async def analytics(i):
+        return await client.get(f"/briefs/{briefs[i % len(briefs)]}/analytics", headers=auth_headers)
+
+    async def pdf(i):
+        # Каждый запрос — новый ответ: промах дискового кэша, полноценный рендер
+        return await client.get(f"/briefs/submissions/{sessions[i % len(sessions)]}/pdf")
+
+    async def pdf_cached(i):
+        # Небольшой набор ответов: после первого круга всё отдаётся из кэша
+        return await client.get(f"/briefs/submissions/{sessions[-(i % 10) - 1]}/pdf")
+
+    return {
+        "main_brief": main_brief,
+        "main_brief_not_modified": main_brief_not_modified,
+        "brief": brief,
+        "submissions_page": submissions_page,
+        "submission_get": submission_get,
+        "submission_create": submission_create,
+        "analytics": analytics,
+        "pdf": pdf,
+        "pdf_cached": pdf_cached,
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    import httpx
+    from benchmarks import seed
+
+    if args.base_url:
+        from app.database import init_db
+        await init_db()
+        app = None
+    else:
+        from app.main import app
+
+    async def measure(client) -> Dict[str, Any]:
+        seed_started = time.perf_counter()
+        data = await seed.seed(args.briefs, args.steps, args.questions, args.submissions)
+        seed_seconds = time.perf_counter() - seed_started
+
+        token = (await client.post("/token", data={"username": seed.OWNER_EMAIL, "password": seed.OWNER_PASSWORD})).json()["access_token"]
+        scenarios = build_scenarios(client, data, token, random.Random(args.seed))
+        selected = args.scenarios.split(",") if args.scenarios else SCENARIOS
+        results: Dict[str, Any] = {}
+        for name in selected:
+            call = scenarios[name]
+            requests = args.pdf_requests if name == "pdf" else args.requests
+            if name != "pdf":
+                await drive(call, args.warmup, args.concurrency)
+            results[name] = await drive(call, requests, args.concurrency)
+            print(f"{name}: {results[name]['throughput_rps']} rps, p99 {results[name]['p99_ms']} ms", flush=True)
+        return {"seed_seconds": round(seed_seconds, 2), "scenarios": results}
+
+    timeout = httpx.Timeout(120.0)
+    if app is None:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout) as client:
+            return await measure(client)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+            return await measure(client)
+
+
+def parse_args(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон API")
+    parser.add_argument("--briefs", type=int, default=10)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=6, help="вопросов на шаг")
+    parser.add_argument("--submissions", type=int, default=200, help="ответов на бриф")
+    parser.add_argument("--requests", type=int, default=300, help="запросов на сценарий")
+    parser.add_argument("--pdf-requests", type=int, default=40, help="запросов в сценарии pdf (рендер без кэша)")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--scenarios", default="", help="через запятую: " + ",".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=1853)
+    parser.add_argument("--base-url", default="", help="адрес запущенного сервера вместо ASGI-транспорта")
+    parser.add_argument("--output", default="", help="файл для JSON с результатами")
+    args = parser.parse_args(argv)
+    unknown = set(filter(None, args.scenarios.split(","))) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    configure_env()
+    params = {k: v for k, v in vars(args).items() if k != "output"}
+    results = asyncio.run(run(args))
+    write_results({"benchmark": "api", **run_metadata(params), **results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
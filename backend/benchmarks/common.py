@@ -0,0 +1,121 @@
+# backend/benchmarks/common.py
+"""
+Общее для бенчмарков: окружение, прогон запросов с ограниченной конкурентностью,
+перцентили и запись результатов в JSON.
+
+Окружение настраивается до импорта app: по умолчанию временная SQLite-база
+и временные каталоги для кэшей, чтобы прогон не трогал рабочие данные.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def configure_env() -> Path:
+    """Должна вызываться до первого `import app`. Возвращает временный каталог прогона."""
+    work_dir = Path(tempfile.mkdtemp(prefix="bench-"))
+    os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{work_dir}/bench.sqlite")
+    os.environ.setdefault("SECRET_KEY", "bench")
+    os.environ.setdefault("DB_STARTUP_MODE", "create_all")
+    for name in ("PDF_CACHE_DIR", "REPORT_JOBS_DIR", "SUBMISSION_SPOOL_DIR", "UPLOAD_DIR"):
+        os.environ.setdefault(name, str(work_dir / name.lower()))
+    # Бенчмарки не замеряют bcrypt, кроме login, где стоимость задаётся явно
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    os.chdir(BACKEND_DIR)  # DejaVuSans.ttf и alembic.ini ищутся относительно backend/
+    return work_dir
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+def ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def latency_summary(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, Any]:
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p95_ms": ms(percentile(latencies, 0.95)),
+        "p99_ms": ms(percentile(latencies, 0.99)),
+        "max_ms": ms(max(latencies, default=0.0)),
+    }
+
+
+async def drive(call: Callable[[int], Awaitable[Any]], requests: int, concurrency: int) -> Dict[str, Any]:
+    """Выполняет call(i) requests раз, не больше concurrency одновременно.
+
+    call возвращает HTTP-ответ; статус >= 400 считается ошибкой и в перцентили не входит.
+    """
+    latencies: List[float] = []
+    errors = 0
+    statuses: Dict[str, int] = {}
+    queue = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in queue:
+            started = time.perf_counter()
+            try:
+                response = await call(i)
+                status = response.status_code
+            except Exception as exc:
+                status = type(exc).__name__
+            if isinstance(status, int) and status < 400:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    summary = latency_summary(latencies, time.perf_counter() - started, errors)
+    summary["statuses"] = statuses
+    return summary
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_metadata(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+        "params": params,
+    }
+
+
+def write_results(results: Dict[str, Any], output: Optional[str]) -> None:
+    body = json.dumps(results, ensure_ascii=False, indent=2)
+    if output:
+        Path(output).write_text(body + "\n", encoding="utf-8")
+    print(body)
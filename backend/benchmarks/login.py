@@ -0,0 +1,96 @@
+# backend/benchmarks/login.py
+"""
+Нагрузочный замер /token: задержка event loop при одновременных логинах.
+
+Пока идут логины, фоновая задача каждые PROBE_INTERVAL секунд засыпает и меряет,
+насколько позже запланированного она проснулась. Если bcrypt выполняется в event loop,
+эта задержка растёт вместе с числом логинов; в пуле потоков она остаётся плоской.
+
+    python -m benchmarks.login --logins 200 --concurrency 20
+    python -m benchmarks.login --inline   # bcrypt прямо в event loop, для сравнения
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.common import configure_env, latency_summary, ms, percentile, run_metadata, write_results
+
+PROBE_INTERVAL = 0.005
+
+
+async def _probe_lag(stop: asyncio.Event, lags: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def run(logins: int, concurrency: int, inline: bool) -> dict:
+    import httpx
+    from app import auth
+    from app.database import init_db
+    from app.main import app
+
+    if inline:
+        async def verify_inline(plain_password, hashed_password):
+            return auth.pwd_context.verify_and_update(plain_password, hashed_password)
+        auth.verify_and_update_password = verify_inline
+
+    await init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        credentials = {"email": "bench@example.com", "username": "bench", "password": "bench-password"}
+        await client.post("/users", json=credentials)
+        form = {"username": credentials["email"], "password": credentials["password"]}
+
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: list = []
+
+        async def login():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/token", data=form)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        lags: list = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe_lag(stop, lags))
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+
+    return {
+        "mode": "inline" if inline else "executor",
+        "bcrypt_rounds": auth.pwd_context.to_dict().get("bcrypt__rounds"),
+        "login": latency_summary(latencies, elapsed),
+        "loop_lag": {
+            "p50_ms": ms(percentile(lags, 0.50)),
+            "p99_ms": ms(percentile(lags, 0.99)),
+            "max_ms": ms(max(lags, default=0.0)),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--inline", action="store_true", help="проверять пароль в event loop (поведение до пула)")
+    parser.add_argument("--output", default="", help="файл для JSON с результатами")
+    args = parser.parse_args()
+
+    # Стоимость bcrypt — предмет замера, поэтому берётся рабочая, а не облегчённая из configure_env
+    os.environ.setdefault("BCRYPT_ROUNDS", "12")
+    configure_env()
+    params = {"logins": args.logins, "concurrency": args.concurrency, "inline": args.inline}
+    results = asyncio.run(run(args.logins, args.concurrency, args.inline))
+    write_results({"benchmark": "login", **run_metadata(params), **results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
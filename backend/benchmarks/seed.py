@@ -0,0 +1,115 @@
+# backend/benchmarks/seed.py
+"""
+Наполнение базы для бенчмарков: пользователь, брифы с шагами и вопросами всех типов
+и ответы на них. Данные детерминированы (random с фиксированным seed), поэтому
+прогоны на разных коммитах сравнимы.
+"""
+from __future__ import annotations
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+
+OWNER_EMAIL = "bench-owner@example.com"
+OWNER_PASSWORD = "bench-password"
+SUBMISSION_CHUNK_SIZE = 1000
+
+QUESTION_TYPES = ["text", "number", "single_choice", "multi_choice", "date", "linear_scale"]
+CHOICE_OPTIONS = ["Вариант A", "Вариант B", "Вариант C", "Вариант D"]
+
+
+@dataclass
+class SeedResult:
+    owner_id: int
+    brief_ids: List[int]
+    main_brief_id: int
+    # По брифу: список (id вопроса, тип, варианты) — для генерации новых ответов
+    questions: Dict[int, List[Dict[str, Any]]] = field(default_factory=dict)
+    session_ids: List[str] = field(default_factory=list)
+
+
+def answer_for(question: Dict[str, Any], rng: random.Random) -> Any:
+    kind = question["question_type"]
+    if kind == "number":
+        return rng.randint(1, 1000)
+    if kind == "single_choice":
+        return rng.choice(question["options"])
+    if kind == "multi_choice":
+        return rng.sample(question["options"], rng.randint(1, len(question["options"])))
+    if kind == "date":
+        return (datetime(2024, 1, 1) + timedelta(days=rng.randint(0, 365))).date().isoformat()
+    if kind == "linear_scale":
+        return rng.randint(1, 10)
+    return "Ответ " + " ".join(rng.choice(["быстро", "удобно", "дорого", "надёжно", "сайт", "бренд"]) for _ in range(8))
+
+
+def answers_for(questions: List[Dict[str, Any]], rng: random.Random) -> Dict[str, Any]:
+    return {str(q["id"]): answer_for(q, rng) for q in questions}
+
+
+async def seed(briefs: int, steps: int, questions: int, submissions: int, seed_value: int = 1853) -> SeedResult:
+    """briefs × steps × questions вопросов и submissions ответов на каждый бриф."""
+    from app import analytics, auth, models
+    from app.database import AsyncSessionLocal
+
+    rng = random.Random(seed_value)
+    async with AsyncSessionLocal() as db:
+        owner = models.User(email=OWNER_EMAIL, username="bench-owner", hashed_password=auth.get_password_hash(OWNER_PASSWORD))
+        db.add(owner)
+        await db.flush()
+
+        result = SeedResult(owner_id=owner.id, brief_ids=[], main_brief_id=0)
+        for brief_index in range(briefs):
+            brief = models.Brief(
+                title=f"Бриф {brief_index + 1}",
+                description="Тестовый бриф для нагрузочного прогона",
+                owner_id=owner.id,
+                is_main=brief_index == 0,
+                steps=[
+                    models.Step(
+                        title=f"Шаг {step_index + 1}",
+                        order=step_index,
+                        questions=[
+                            models.Question(
+                                text=f"Вопрос {step_index + 1}.{q_index + 1}",
+                                question_type=QUESTION_TYPES[q_index % len(QUESTION_TYPES)],
+                                options=CHOICE_OPTIONS if QUESTION_TYPES[q_index % len(QUESTION_TYPES)].endswith("_choice") else None,
+                                is_required=q_index % 2 == 0,
+                                order=q_index,
+                            )
+                            for q_index in range(questions)
+                        ],
+                    )
+                    for step_index in range(steps)
+                ],
+            )
+            db.add(brief)
+            await db.flush()
+            result.brief_ids.append(brief.id)
+            result.questions[brief.id] = [
+                {"id": q.id, "question_type": q.question_type, "options": q.options}
+                for step in brief.steps for q in step.questions
+            ]
+        result.main_brief_id = result.brief_ids[0]
+        await db.commit()
+
+        started = datetime.now(timezone.utc)
+        for brief_id in result.brief_ids:
+            rows = []
+            for index in range(submissions):
+                session_id = str(uuid.UUID(int=rng.getrandbits(128)))
+                rows.append({
+                    "brief_id": brief_id,
+                    "session_id": session_id,
+                    "answers_data": answers_for(result.questions[brief_id], rng),
+                    "created_at": started - timedelta(minutes=index),
+                })
+                result.session_ids.append(session_id)
+            for start in range(0, len(rows), SUBMISSION_CHUNK_SIZE):
+                await db.execute(insert(models.Submission), rows[start:start + SUBMISSION_CHUNK_SIZE])
+            await db.commit()
+            await analytics.rebuild_rollups(db, brief_id)
+    return result
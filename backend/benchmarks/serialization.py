@@ -0,0 +1,132 @@
+# backend/benchmarks/serialization.py
+"""
+Процессорное время сборки JSON большого брифа и списка ответов: прежний путь
+(ORM-объекты с selectinload → валидация pydantic-схем → dump_json) против
+app.serializers (выборки колонок → словари → orjson / pydantic-core, бриф в ответы
+подставляется готовыми байтами). Для каждого пути считается выборка вместе
+с сериализацией (total) и отдельно сериализация уже выбранных данных (serialize), без HTTP.
+
+    python -m benchmarks.serialization --steps 10 --questions 20 --submissions 500
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from benchmarks.common import configure_env, ms, run_metadata, write_results
+
+
+async def cpu_per_call(call: Callable[[], Awaitable[Any]], repeat: int) -> float:
+    await call()
+    started = time.process_time()
+    for _ in range(repeat):
+        await call()
+    return (time.process_time() - started) / repeat
+
+
+class ResponsePath:
+    """Путь ответа: выборка из БД и сериализация выбранного отдельно."""
+
+    def __init__(self, fetch: Callable[[], Awaitable[Any]], serialize: Callable[[Any], bytes]):
+        self.fetch = fetch
+        self.serialize = serialize
+
+    async def respond(self) -> bytes:
+        return self.serialize(await self.fetch())
+
+    async def measure(self, repeat: int) -> Dict[str, float]:
+        fetched = await self.fetch()
+
+        async def serialize_only():
+            return self.serialize(fetched)
+
+        return {"total": await cpu_per_call(self.respond, repeat), "serialize": await cpu_per_call(serialize_only, repeat)}
+
+
+async def run(args) -> Dict[str, Any]:
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+    from app import crud, models, schemas, serializers
+    from app.database import AsyncSessionLocal, init_db
+    from benchmarks import seed
+
+    await init_db()
+    data = await seed.seed(1, args.steps, args.questions, args.submissions)
+    brief_id = data.brief_ids[0]
+    submissions_adapter = TypeAdapter(List[schemas.Submission])
+    brief_options = selectinload(models.Brief.steps).selectinload(models.Step.questions)
+
+    async with AsyncSessionLocal() as db:
+        async def orm_brief():
+            db.expunge_all()
+            result = await db.execute(select(models.Brief).options(brief_options).filter(models.Brief.id == brief_id))
+            return result.scalars().first()
+
+        async def orm_submissions():
+            db.expunge_all()
+            result = await db.execute(
+                select(models.Submission)
+                .options(selectinload(models.Submission.brief).options(brief_options))
+                .filter(models.Submission.brief_id == brief_id)
+                .order_by(models.Submission.id)
+            )
+            return result.scalars().all()
+
+        async def brief_rows():
+            return await crud.get_brief_tree_rows(db, brief_id=brief_id)
+
+        def brief_json(rows) -> bytes:
+            return serializers.dumps(serializers.brief_trees(*rows)[0])
+
+        async def submission_rows():
+            # Без кэша брифов: бриф собирается на каждом вызове, как при промахе
+            return await brief_rows(), await crud.get_submission_rows_by_brief_id(db, brief_id=brief_id)
+
+        scenarios = {
+            "brief": (
+                ResponsePath(orm_brief, lambda brief: schemas.Brief.model_validate(brief, from_attributes=True).model_dump_json().encode()),
+                ResponsePath(brief_rows, brief_json),
+            ),
+            "submissions": (
+                ResponsePath(orm_submissions, lambda rows: submissions_adapter.dump_json(submissions_adapter.validate_python(rows, from_attributes=True))),
+                ResponsePath(submission_rows, lambda fetched: serializers.submission_list_json(fetched[1], [brief_json(fetched[0])] * len(fetched[1]))),
+            ),
+        }
+
+        results: Dict[str, Any] = {}
+        for name, (before, after) in scenarios.items():
+            body = await after.respond()
+            assert body == await before.respond(), f"{name}: output differs"
+            cpu_before = await before.measure(args.repeat)
+            cpu_after = await after.measure(args.repeat)
+            results[name] = {"bytes": len(body)}
+            for part in ("total", "serialize"):
+                results[name][part] = {
+                    "before_cpu_ms": ms(cpu_before[part]),
+                    "after_cpu_ms": ms(cpu_after[part]),
+                    "speedup": round(cpu_before[part] / cpu_after[part], 2) if cpu_after[part] else None,
+                }
+                line = results[name][part]
+                print(f"{name} {part}: {line['before_cpu_ms']} ms -> {line['after_cpu_ms']} ms (x{line['speedup']})", flush=True)
+    return {"results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CPU-время сериализации брифа и списка ответов")
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=20, help="вопросов на шаг")
+    parser.add_argument("--submissions", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default="", help="файл для JSON с результатами")
+    args = parser.parse_args()
+
+    configure_env()
+    params = {k: v for k, v in vars(args).items() if k != "output"}
+    results = asyncio.run(run(args))
+    write_results({"benchmark": "serialization", **run_metadata(params), **results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
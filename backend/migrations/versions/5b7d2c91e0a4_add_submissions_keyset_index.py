@@ -0,0 +1,26 @@
+"""add submissions keyset index
+
+Revision ID: 5b7d2c91e0a4
+Revises: 4ecf91dab07b
+Create Date: 2026-10-17 10:12:04.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7d2c91e0a4'
+down_revision: Union[str, None] = '4ecf91dab07b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_submissions_brief_created_id', 'submissions', ['brief_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_submissions_brief_created_id', table_name='submissions')
@@ -0,0 +1,49 @@
+"""add analytics rollups
+
+Revision ID: 9c3e41f7a2d6
+Revises: 5b7d2c91e0a4
+Create Date: 2026-10-17 11:40:27.503918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3e41f7a2d6'
+down_revision: Union[str, None] = '5b7d2c91e0a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('answer_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('brief_id', sa.Integer(), nullable=False),
+    sa.Column('question_key', sa.String(), nullable=False),
+    sa.Column('bucket', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['brief_id'], ['briefs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('brief_id', 'question_key', 'bucket', name='uq_answer_rollups_key')
+    )
+    op.create_index(op.f('ix_answer_rollups_brief_id'), 'answer_rollups', ['brief_id'], unique=False)
+    op.create_table('submission_daily_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('brief_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['brief_id'], ['briefs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('brief_id', 'day', name='uq_submission_daily_rollups_key')
+    )
+    op.create_index(op.f('ix_submission_daily_rollups_brief_id'), 'submission_daily_rollups', ['brief_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_submission_daily_rollups_brief_id'), table_name='submission_daily_rollups')
+    op.drop_table('submission_daily_rollups')
+    op.drop_index(op.f('ix_answer_rollups_brief_id'), table_name='answer_rollups')
+    op.drop_table('answer_rollups')
@@ -0,0 +1,42 @@
+"""add submission drafts
+
+Revision ID: a7d3c5e9f1b2
+Revises: 9c3e41f7a2d6
+Create Date: 2026-10-17 15:32:48.201734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3c5e9f1b2'
+down_revision: Union[str, None] = '9c3e41f7a2d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('submission_drafts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.String(), nullable=False),
+    sa.Column('brief_id', sa.Integer(), nullable=False),
+    sa.Column('answers_data', sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql'), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['brief_id'], ['briefs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('session_id')
+    )
+    op.create_index(op.f('ix_submission_drafts_brief_id'), 'submission_drafts', ['brief_id'], unique=False)
+    op.create_index(op.f('ix_submission_drafts_updated_at'), 'submission_drafts', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_submission_drafts_updated_at'), table_name='submission_drafts')
+    op.drop_index(op.f('ix_submission_drafts_brief_id'), table_name='submission_drafts')
+    op.drop_table('submission_drafts')
@@ -0,0 +1,40 @@
+"""add brief versions
+
+Revision ID: c4f8a2d6e0b3
+Revises: a7d3c5e9f1b2
+Create Date: 2026-10-17 18:04:27.519306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f8a2d6e0b3'
+down_revision: Union[str, None] = 'a7d3c5e9f1b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('brief_versions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('brief_id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['brief_id'], ['briefs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('brief_id', 'content_hash', name='uq_brief_versions_content')
+    )
+    # Старые ответы остаются без версии и читаются с текущим брифом
+    op.add_column('submissions', sa.Column('brief_version_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_submissions_brief_version_id', 'submissions', 'brief_versions', ['brief_version_id'], ['id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_submissions_brief_version_id', 'submissions', type_='foreignkey')
+    op.drop_column('submissions', 'brief_version_id')
+    op.drop_table('brief_versions')
@@ -0,0 +1,36 @@
+"""add submission search indexes
+
+Revision ID: d5e1b7f3a9c4
+Revises: c4f8a2d6e0b3
+Create Date: 2026-10-17 19:41:09.265117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e1b7f3a9c4'
+down_revision: Union[str, None] = 'c4f8a2d6e0b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Выражения совпадают с условиями app.search; в других СУБД поиск идёт без индексов
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(
+        """CREATE INDEX ix_submissions_answers_text ON submissions """
+        """USING gin (jsonb_to_tsvector('russian', answers_data::jsonb, '["string", "numeric"]'))"""
+    )
+    op.execute("CREATE INDEX ix_submissions_answers_path ON submissions USING gin ((answers_data::jsonb) jsonb_path_ops)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_submissions_answers_path', table_name='submissions')
+    op.drop_index('ix_submissions_answers_text', table_name='submissions')
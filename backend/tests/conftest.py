@@ -0,0 +1,92 @@
+# backend/tests/conftest.py
+"""
+Общие фикстуры тестов: приложение на временной SQLite-базе, журнал SQL-запросов
+и фабрики владельцев и брифов.
+
+Окружение задаётся до импорта app, поэтому импорт приложения — только внутри фикстур.
+"""
+from __future__ import annotations
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+_WORK_DIR = Path(tempfile.mkdtemp(prefix="brief-tests-"))
+os.environ.update({
+    "DATABASE_URL": f"sqlite+aiosqlite:///{_WORK_DIR}/test.sqlite",
+    "SECRET_KEY": "test",
+    "DB_STARTUP_MODE": "create_all",
+    "BCRYPT_ROUNDS": "4",
+    "PDF_POOL_KIND": "thread",
+    "PDF_POOL_WARM_UP": "false",
+    "INSTRUMENTATION_SAMPLE_RATE": "0",
+    "PDF_CACHE_DIR": str(_WORK_DIR / "pdf_cache"),
+    "REPORT_JOBS_DIR": str(_WORK_DIR / "report_jobs"),
+    "SUBMISSION_SPOOL_DIR": str(_WORK_DIR / "submission_spool"),
+    "UPLOAD_DIR": str(_WORK_DIR / "uploads"),
+})
+
+
+class QueryLog:
+    """Запоминает SQL, выполненный движком приложения, пока включён."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self.enabled = False
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.enabled:
+            self.statements.append(" ".join(statement.split()))
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app.main import app as application
+    return application
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def query_log(app):
+    from sqlalchemy import event
+    from app.database import engine
+
+    log = QueryLog()
+    event.listen(engine.sync_engine, "before_cursor_execute", log)
+    yield log
+    event.remove(engine.sync_engine, "before_cursor_execute", log)
+
+
+@pytest.fixture(scope="session")
+def make_owner(client):
+    """make_owner(name) регистрирует name@example.com и возвращает его учётные данные и заголовки с токеном."""
+
+    def make(name: str) -> Dict[str, Any]:
+        credentials = {"email": f"{name}@example.com", "username": name, "password": "secret"}
+        assert client.post("/users", json=credentials).status_code == 201
+        token = client.post("/token", data={"username": credentials["email"], "password": credentials["password"]}).json()["access_token"]
+        return {**credentials, "headers": {"Authorization": f"Bearer {token}"}}
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def make_brief(client, make_owner):
+    """make_brief(name, brief) создаёт владельца name и его бриф; возвращает (бриф из ответа API, заголовки)."""
+
+    def make(name: str, brief: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        headers = make_owner(name)["headers"]
+        response = client.post("/briefs", json=brief, headers=headers)
+        assert response.status_code == 201, response.text
+        return response.json(), headers
+
+    return make
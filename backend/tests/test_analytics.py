@@ -0,0 +1,100 @@
+# backend/tests/test_analytics.py
+"""
+Агрегаты аналитики (app.analytics): пересчёт rebuild_rollups и команда
+python -m app.analytics rebuild дают те же счётчики, что и инкрементальная запись,
+включая день ответа по его created_at.
+"""
+from __future__ import annotations
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+BRIEF = {
+    "title": "Бриф для аналитики",
+    "steps": [{"title": "Шаг", "questions": [
+        {"text": "Имя", "question_type": "text"},
+        {"text": "Услуги", "question_type": "multi_choice", "options": ["сайт", "бренд"]},
+    ]}],
+}
+ANSWERS = [("Иван", ["сайт"]), ("Мария", ["сайт", "бренд"]), (None, ["бренд"]), ("Олег", [])]
+
+
+@pytest.fixture(scope="module")
+def brief(client, make_brief):
+    created, headers = make_brief("analytics", BRIEF)
+    keys = [str(q["id"]) for q in created["steps"][0]["questions"]]
+    created_at = []
+    for values in ANSWERS:
+        answers = {key: value for key, value in zip(keys, values) if value is not None}
+        response = client.post("/briefs/submissions", json={"brief_id": created["id"], "answers": answers})
+        assert response.status_code == 200, response.text
+        created_at.append(response.json()["created_at"])
+    # Ответ через черновик учитывается тем же путём
+    session_id = client.post(f"/briefs/{created['id']}/drafts", json={"answers": {keys[1]: ["сайт"]}}).json()["session_id"]
+    finalized = client.post(f"/briefs/drafts/{session_id}/finalize", json={})
+    assert finalized.status_code == 200, finalized.text
+    created_at.append(finalized.json()["created_at"])
+    return {"id": created["id"], "headers": headers, "created_at": created_at}
+
+
+def _analytics(client, brief):
+    response = client.get(f"/briefs/{brief['id']}/analytics", headers=brief["headers"])
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _drop_rollups(client, brief_id: int) -> None:
+    from sqlalchemy import delete
+    from app import models
+    from app.database import AsyncSessionLocal
+
+    async def drop():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(models.AnswerRollup).where(models.AnswerRollup.brief_id == brief_id))
+            await db.execute(delete(models.SubmissionDailyRollup).where(models.SubmissionDailyRollup.brief_id == brief_id))
+            await db.commit()
+
+    client.portal.call(drop)
+
+
+def test_incremental_days_follow_created_at(client, brief):
+    result = _analytics(client, brief)
+    days = Counter(moment[:10] for moment in brief["created_at"])
+    assert result["submissions_per_day"] == [{"day": day, "count": n} for day, n in sorted(days.items())]
+    services = result["questions"][1]
+    assert (services["answered"], services["option_counts"]) == (4, {"сайт": 3, "бренд": 2})
+
+
+def test_rebuild_reproduces_incremental_counts(client, brief):
+    from app import analytics
+    from app.database import AsyncSessionLocal
+
+    incremental = _analytics(client, brief)
+    _drop_rollups(client, brief["id"])
+    assert _analytics(client, brief)["total_submissions"] == 0
+
+    async def rebuild():
+        async with AsyncSessionLocal() as db:
+            return await analytics.rebuild_rollups(db, brief["id"])
+
+    assert client.portal.call(rebuild) == len(ANSWERS) + 1
+    assert _analytics(client, brief) == incremental
+    # Повторный пересчёт заменяет агрегаты, а не прибавляет к ним
+    client.portal.call(rebuild)
+    assert _analytics(client, brief) == incremental
+
+
+def test_rebuild_command(client, brief):
+    incremental = _analytics(client, brief)
+    _drop_rollups(client, brief["id"])
+
+    result = subprocess.run(
+        [sys.executable, "-m", "app.analytics", "rebuild", "--brief-id", str(brief["id"])],
+        cwd=Path(__file__).resolve().parents[1], capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == f"brief {brief['id']}: {len(ANSWERS) + 1} submissions"
+    assert _analytics(client, brief) == incremental
@@ -0,0 +1,42 @@
+# backend/tests/test_auth.py
+"""
+Вход (POST /token): хэш пароля, сохранённый с меньшей стоимостью bcrypt, при входе
+пересохраняется с текущей BCRYPT_ROUNDS, и вход по нему продолжает работать.
+"""
+from __future__ import annotations
+
+
+def _hashed_password(client, email: str) -> str:
+    from app import crud
+    from app.database import AsyncSessionLocal
+
+    async def read():
+        async with AsyncSessionLocal() as db:
+            return (await crud.get_user_by_email(db, email=email)).hashed_password
+
+    return client.portal.call(read)
+
+
+def _login(client, owner):
+    return client.post("/token", data={"username": owner["email"], "password": owner["password"]})
+
+
+def test_login_rehashes_at_new_cost(client, make_owner, monkeypatch):
+    from passlib.context import CryptContext
+    from app import auth, config
+
+    owner = make_owner("rehash")
+    old_hash = _hashed_password(client, owner["email"])
+    assert old_hash.startswith(f"$2b${config.BCRYPT_ROUNDS:02d}$")
+
+    # BCRYPT_ROUNDS подняли после регистрации
+    rounds = config.BCRYPT_ROUNDS + 1
+    monkeypatch.setattr(auth, "pwd_context", CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds))
+    assert _login(client, owner).status_code == 200
+    new_hash = _hashed_password(client, owner["email"])
+    assert new_hash.startswith(f"$2b${rounds:02d}$") and new_hash != old_hash
+
+    # Новый хэш принимается и больше не пересохраняется
+    assert _login(client, owner).status_code == 200
+    assert _hashed_password(client, owner["email"]) == new_hash
+    assert _login(client, {**owner, "password": "wrong"}).status_code == 401
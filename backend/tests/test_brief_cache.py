@@ -0,0 +1,59 @@
+# backend/tests/test_brief_cache.py
+"""
+Кэш брифов между воркерами (app.cache_sync): уведомление о правке сбрасывает запись,
+а устаревшая запись в воркере, до которого уведомление ещё не дошло, не приводит к
+отказу в корректном ответе.
+"""
+from __future__ import annotations
+
+import pytest
+
+BRIEF = {
+    "title": "Бриф для кэша",
+    "steps": [{"title": "Шаг", "questions": [
+        {"text": "Имя", "question_type": "text"},
+    ]}],
+}
+
+
+@pytest.fixture(scope="module")
+def brief(make_brief):
+    created, headers = make_brief("cache", BRIEF)
+    return {"id": created["id"], "headers": headers, "created": created}
+
+
+def test_notification_invalidates_brief(brief):
+    from app import cache, cache_sync
+
+    key = cache.brief_cache_key(brief["id"])
+    cache_sync.handle_notification(None, 0, cache_sync.CHANNEL, str(brief["id"]))
+    assert cache.brief_cache_key(brief["id"]) != key
+
+    key = cache.brief_cache_key(brief["id"])
+    cache_sync.handle_notification(None, 0, cache_sync.CHANNEL, cache_sync.ALL_BRIEFS)
+    assert cache.brief_cache_key(brief["id"]) != key
+
+
+def test_stale_cache_does_not_reject_new_question(client, brief):
+    from app import cache
+
+    stale = client.get(f"/briefs/{brief['id']}")
+    step = brief["created"]["steps"][0]
+    question = step["questions"][0]
+    update = {"title": BRIEF["title"], "steps": [{"id": step["id"], "title": step["title"], "questions": [
+        {"id": question["id"], "text": question["text"], "question_type": "text"},
+        {"text": "Бюджет", "question_type": "number"},
+    ]}]}
+    fresh = client.put(f"/briefs/{brief['id']}", json=update, headers=brief["headers"]).json()
+    added = str(fresh["steps"][0]["questions"][1]["id"])
+
+    # Воркер, до которого уведомление о правке ещё не дошло, держит старый бриф
+    cache.brief_cache.set(cache.brief_cache_key(brief["id"]), (stale.headers["ETag"], stale.content))
+    response = client.post("/briefs/submissions", json={"brief_id": brief["id"], "answers": {added: "100"}})
+    assert response.status_code == 200, response.text
+    assert response.json()["brief"] == fresh
+    assert client.get(f"/briefs/versions/{response.json()['brief_version_id']}").json() == fresh
+
+    # Ответ, неверный и по свежему брифу, отклоняется
+    rejected = client.post("/briefs/submissions", json={"brief_id": brief["id"], "answers": {added: "много"}})
+    assert rejected.status_code == 422
@@ -0,0 +1,83 @@
+# backend/tests/test_brief_update.py
+"""
+Правка брифа (crud.update_brief) по разнице с деревом в БД: неизменённые строки не
+обновляются, перестановка меняет только order, пропавшие строки удаляются, а
+повтор id в запросе даёт новую строку, а не перезапись существующей.
+"""
+from __future__ import annotations
+from typing import List
+
+import pytest
+
+BRIEF = {
+    "title": "Бриф для правки",
+    "steps": [
+        {"title": "Шаг 1", "questions": [
+            {"text": "Имя", "question_type": "text"},
+            {"text": "Канал", "question_type": "single_choice", "options": ["email", "телефон"]},
+        ]},
+        {"title": "Шаг 2", "questions": [
+            {"text": "Услуги", "question_type": "multi_choice", "options": ["сайт", "бренд"]},
+        ]},
+        {"title": "Шаг 3", "questions": [
+            {"text": "Комментарий", "question_type": "text"},
+        ]},
+    ],
+}
+FIELDS = ("id", "text", "question_type", "options", "is_required", "conditional_logic")
+
+
+def _payload(brief, steps=None):
+    steps = brief["steps"] if steps is None else steps
+    return {"title": brief["title"], "description": brief["description"], "steps": [
+        {"id": s["id"], "title": s["title"], "description": s["description"],
+         "conditional_logic": s["conditional_logic"], "questions": [{k: q[k] for k in FIELDS} for q in s["questions"]]}
+        for s in steps
+    ]}
+
+
+def _put(client, query_log, brief, headers, payload) -> List[str]:
+    query_log.statements.clear()
+    query_log.enabled = True
+    try:
+        response = client.put(f"/briefs/{brief['id']}", json=payload, headers=headers)
+    finally:
+        query_log.enabled = False
+    assert response.status_code == 200, response.text
+    return [sql for sql in query_log.statements if sql.startswith(("UPDATE steps", "UPDATE questions", "DELETE FROM steps", "DELETE FROM questions", "INSERT INTO steps", "INSERT INTO questions"))]
+
+
+def test_update_writes_only_the_difference(client, query_log, make_brief):
+    brief, headers = make_brief("update-diff", BRIEF)
+    assert _put(client, query_log, brief, headers, _payload(brief)) == []
+
+    # Вопросы первого шага переставлены, третий шаг удалён
+    first, second, _ = brief["steps"]
+    steps = [{**first, "questions": first["questions"][::-1]}, second]
+    writes = _put(client, query_log, brief, headers, _payload(brief, steps))
+    assert writes == [
+        'UPDATE questions SET "order"=? WHERE questions.id = ?',
+        "DELETE FROM questions WHERE questions.id IN (?)",
+        "DELETE FROM steps WHERE steps.id IN (?)",
+    ]
+
+    saved = client.get(f"/briefs/{brief['id']}").json()
+    assert [s["id"] for s in saved["steps"]] == [first["id"], second["id"]]
+    assert [q["id"] for q in saved["steps"][0]["questions"]] == [q["id"] for q in first["questions"][::-1]]
+
+
+def test_repeated_ids_become_new_rows(client, make_brief):
+    brief, headers = make_brief("update-repeat", BRIEF)
+    first, second, third = brief["steps"]
+    # Шаг продублирован в редакторе вместе с id шага и его вопросов
+    duplicate = {**first, "title": "Копия шага 1"}
+    response = client.put(f"/briefs/{brief['id']}", json=_payload(brief, [first, duplicate, second, third]), headers=headers)
+    assert response.status_code == 200, response.text
+
+    saved = response.json()["steps"]
+    assert [s["title"] for s in saved] == ["Шаг 1", "Копия шага 1", "Шаг 2", "Шаг 3"]
+    assert saved[0]["id"] == first["id"] and saved[1]["id"] not in {s["id"] for s in brief["steps"]}
+    assert [q["id"] for q in saved[0]["questions"]] == [q["id"] for q in first["questions"]]
+    copied = [q["id"] for q in saved[1]["questions"]]
+    assert [q["text"] for q in saved[1]["questions"]] == ["Имя", "Канал"]
+    assert not set(copied) & {q["id"] for s in brief["steps"] for q in s["questions"]}
@@ -0,0 +1,127 @@
+# backend/tests/test_drafts.py
+"""
+Черновики ответов: патчи по шагам сливаются в БД, устаревшая версия даёт 409,
+отправка создаёт ровно один ответ с тем же session_id и учитывается в аналитике.
+"""
+from __future__ import annotations
+
+import pytest
+
+BRIEF = {
+    "title": "Бриф с черновиком",
+    "steps": [
+        {"title": "Шаг 1", "questions": [
+            {"text": "Имя", "question_type": "text"},
+            {"text": "Канал", "question_type": "single_choice", "options": ["email", "телефон"]},
+        ]},
+        {"title": "Шаг 2", "questions": [
+            {"text": "Услуги", "question_type": "multi_choice", "options": ["сайт", "бренд"]},
+        ]},
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def brief(make_brief):
+    created, headers = make_brief("drafts", BRIEF)
+    name, channel, services = (str(q["id"]) for step in created["steps"] for q in step["questions"])
+    return {"id": created["id"], "headers": headers, "name": name, "channel": channel, "services": services}
+
+
+def _patch(client, session_id, version, answers):
+    return client.patch(f"/briefs/drafts/{session_id}", json={"version": version, "answers": answers})
+
+
+def test_patches_are_merged(client, brief):
+    created = client.post(f"/briefs/{brief['id']}/drafts", json={"answers": {brief["name"]: "Иван"}})
+    assert created.status_code == 201
+    session_id = created.json()["session_id"]
+    assert created.json()["version"] == 0
+
+    first = _patch(client, session_id, 0, {brief["channel"]: "email", brief["services"]: ["сайт", {"вложенный": [1.5, None]}]})
+    assert first.json() == {"session_id": session_id, "version": 1}
+    second = _patch(client, session_id, 1, {brief["name"]: None, brief["services"]: ["бренд"]})
+    assert second.json()["version"] == 2
+
+    draft = client.get(f"/briefs/drafts/{session_id}").json()
+    assert draft["version"] == 2
+    assert draft["answers_data"] == {brief["channel"]: "email", brief["services"]: ["бренд"]}
+
+
+def test_stale_version_conflicts(client, brief):
+    session_id = client.post(f"/briefs/{brief['id']}/drafts", json={}).json()["session_id"]
+    assert _patch(client, session_id, 0, {brief["name"]: "Первая вкладка"}).status_code == 200
+
+    stale = _patch(client, session_id, 0, {brief["name"]: "Вторая вкладка"})
+    assert stale.status_code == 409
+    assert stale.json()["detail"]["version"] == 1
+    assert client.get(f"/briefs/drafts/{session_id}").json()["answers_data"] == {brief["name"]: "Первая вкладка"}
+
+    assert _patch(client, "missing", 0, {brief["name"]: "x"}).status_code == 404
+    assert _patch(client, session_id, 1, {"$.name": "x"}).status_code == 422
+
+
+def test_finalize_creates_one_submission(client, brief):
+    before = client.get(f"/briefs/{brief['id']}/analytics", headers=brief["headers"]).json()["total_submissions"]
+    session_id = client.post(f"/briefs/{brief['id']}/drafts", json={"answers": {brief["name"]: "Иван"}}).json()["session_id"]
+    _patch(client, session_id, 0, {brief["channel"]: "телефон"})
+    # Пока черновик не отправлен, его нет среди ответов брифа
+    assert session_id not in [s["session_id"] for s in client.get(f"/briefs/{brief['id']}/submissions").json()]
+
+    assert client.post(f"/briefs/drafts/{session_id}/finalize", json={"version": 0}).status_code == 409
+    submitted = client.post(f"/briefs/drafts/{session_id}/finalize", json={"version": 1})
+    assert submitted.status_code == 200
+    assert submitted.json()["session_id"] == session_id
+    assert submitted.json()["answers_data"] == {brief["name"]: "Иван", brief["channel"]: "телефон"}
+
+    # Повтор (например, после обрыва связи) возвращает тот же ответ, не создавая новый
+    again = client.post(f"/briefs/drafts/{session_id}/finalize", json={})
+    assert again.content == submitted.content
+    assert client.get(f"/briefs/submission/{session_id}").content == submitted.content
+    assert client.get(f"/briefs/drafts/{session_id}").status_code == 404
+
+    submissions = client.get(f"/briefs/{brief['id']}/submissions").json()
+    assert [s["session_id"] for s in submissions].count(session_id) == 1
+    analytics = client.get(f"/briefs/{brief['id']}/analytics", headers=brief["headers"]).json()
+    assert analytics["total_submissions"] == before + 1
+    channel = next(q for q in analytics["questions"] if str(q["question_id"]) == brief["channel"])
+    assert channel["option_counts"]["телефон"] == 1
+
+
+def test_finalize_drops_answers_to_deleted_questions(client, make_brief):
+    created, headers = make_brief("drafts-edit", BRIEF)
+    name, channel, services = (str(q["id"]) for step in created["steps"] for q in step["questions"])
+    answers = {name: "Иван", services: ["сайт"]}
+    session_id = client.post(f"/briefs/{created['id']}/drafts", json={"answers": answers}).json()["session_id"]
+
+    # Вопрос «Услуги» удалён, пока черновик заполнялся
+    first = created["steps"][0]
+    update = {"title": created["title"], "steps": [{"id": first["id"], "title": first["title"], "questions": [
+        {k: q[k] for k in ("id", "text", "question_type", "options")} for q in first["questions"]
+    ]}]}
+    assert client.put(f"/briefs/{created['id']}", json=update, headers=headers).status_code == 200
+
+    # Прямая отправка по-прежнему отклоняет чужой вопрос, а черновик отправляется без него
+    direct = client.post("/briefs/submissions", json={"brief_id": created["id"], "answers": answers})
+    assert direct.status_code == 422
+    assert [e["type"] for e in direct.json()["detail"]] == ["unknown_question"]
+    submitted = client.post(f"/briefs/drafts/{session_id}/finalize", json={})
+    assert submitted.status_code == 200, submitted.text
+    assert submitted.json()["answers_data"] == {name: "Иван"}
+
+
+def test_stale_drafts_are_purged(client, brief):
+    from datetime import datetime, timedelta, timezone
+    from app import crud
+    from app.database import AsyncSessionLocal
+
+    session_id = client.post(f"/briefs/{brief['id']}/drafts", json={}).json()["session_id"]
+
+    async def purge(older_than):
+        async with AsyncSessionLocal() as db:
+            return await crud.delete_stale_drafts(db, older_than)
+
+    assert client.portal.call(purge, datetime.now(timezone.utc) - timedelta(days=1)) == 0
+    assert client.get(f"/briefs/drafts/{session_id}").status_code == 200
+    assert client.portal.call(purge, datetime.now(timezone.utc) + timedelta(days=1)) >= 1
+    assert client.get(f"/briefs/drafts/{session_id}").status_code == 404
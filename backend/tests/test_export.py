@@ -0,0 +1,150 @@
+# backend/tests/test_export.py
+"""
+Выгрузка ответов (app.export): колонки в порядке шагов и вопросов брифа, CSV с BOM,
+XLSX и Parquet с теми же строками, чтение курсора пачками и доступ только владельцу.
+"""
+from __future__ import annotations
+import csv
+import io
+import re
+import zipfile
+from typing import List
+from xml.etree import ElementTree
+
+import pytest
+
+BRIEF = {
+    "title": "Бриф для выгрузки",
+    "steps": [
+        {"title": "Контакты", "questions": [
+            {"text": "Имя", "question_type": "text"},
+            {"text": "Канал", "question_type": "single_choice", "options": ["email", "телефон"]},
+        ]},
+        {"title": "Услуги", "questions": [
+            {"text": "Услуги", "question_type": "multi_choice", "options": ["сайт", "бренд"]},
+        ]},
+    ],
+}
+ANSWERS = [
+    ("Иван", "email", ["сайт"]),
+    ("Мария, «кавычки»", "телефон", ["сайт", "бренд"]),
+    ("Пётр\nс переносом", None, ["бренд"]),
+    ("Анна", "email", None),
+    ("Олег", "телефон", ["сайт"]),
+]
+SHEET_NS = {"x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+@pytest.fixture(scope="module")
+def brief(client, make_brief):
+    created, headers = make_brief("export", BRIEF)
+    contacts, services = created["steps"]
+    name, channel = (str(q["id"]) for q in contacts["questions"])
+    (wanted,) = (str(q["id"]) for q in services["questions"])
+
+    # Шаги и вопросы переставлены после создания: колонки идут по order, а не по id
+    fields = ("id", "text", "question_type", "options")
+    update = {"title": created["title"], "steps": [
+        {"id": services["id"], "title": services["title"], "questions": [{k: q[k] for k in fields} for q in services["questions"]]},
+        {"id": contacts["id"], "title": contacts["title"], "questions": [{k: q[k] for k in fields} for q in reversed(contacts["questions"])]},
+    ]}
+    assert client.put(f"/briefs/{created['id']}", json=update, headers=headers).status_code == 200
+
+    rows = []
+    for values in ANSWERS:
+        answers = {key: value for key, value in zip((name, channel, wanted), values) if value is not None}
+        response = client.post("/briefs/submissions", json={"brief_id": created["id"], "answers": answers})
+        assert response.status_code == 200, response.text
+        submission = response.json()
+        cells = [values[2] and ", ".join(values[2]), values[1], values[0]]
+        rows.append([submission["session_id"], submission["created_at"]] + cells)
+    return {"id": created["id"], "headers": headers, "keys": [wanted, channel, name], "rows": rows}
+
+
+def _export(client, brief, format: str):
+    response = client.get(f"/briefs/{brief['id']}/submissions/export", params={"format": format}, headers=brief["headers"])
+    assert response.status_code == 200, response.text
+    return response
+
+
+def _comparable(rows) -> List[List]:
+    # created_at сравнивается до секунд: SQLite и JSON ответа пишут дробную часть по-разному
+    return sorted([row[0], row[1][:19]] + [cell or None for cell in row[2:]] for row in rows)
+
+
+def _xlsx_rows(content: bytes) -> List[List]:
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        shared = []
+        if "xl/sharedStrings.xml" in archive.namelist():
+            strings = ElementTree.fromstring(archive.read("xl/sharedStrings.xml"))
+            shared = ["".join(t.text or "" for t in si.iter(f"{{{SHEET_NS['x']}}}t")) for si in strings.findall("x:si", SHEET_NS)]
+        sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+    rows = []
+    for row in sheet.iterfind("x:sheetData/x:row", SHEET_NS):
+        values = {}
+        for cell in row.findall("x:c", SHEET_NS):
+            column = re.match(r"[A-Z]+", cell.get("r")).group()
+            if cell.get("t") == "inlineStr":
+                values[column] = "".join(t.text or "" for t in cell.iter(f"{{{SHEET_NS['x']}}}t"))
+            elif cell.get("t") == "s":
+                values[column] = shared[int(cell.find("x:v", SHEET_NS).text)]
+            else:
+                values[column] = cell.find("x:v", SHEET_NS).text
+        # Колонок меньше 26: буква колонки — одна
+        rows.append([values.get(chr(ord("A") + i)) for i in range(ord(max(values)) - ord("A") + 1)])
+    return rows
+
+
+def test_csv_has_bom_and_columns_in_brief_order(client, brief):
+    response = _export(client, brief, "csv")
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"] == f"attachment; filename=brief_{brief['id']}_submissions.csv"
+    assert response.content.startswith(b"\xef\xbb\xbf")
+
+    header, *rows = csv.reader(io.StringIO(response.content.decode("utf-8-sig")))
+    assert header == ["session_id", "created_at", "Услуги", "Канал", "Имя"]
+    assert _comparable(rows) == _comparable(brief["rows"])
+
+
+def test_xlsx_and_parquet_read_back_the_same_rows(client, brief):
+    import pyarrow.parquet as pq
+
+    header, *rows = csv.reader(io.StringIO(_export(client, brief, "csv").content.decode("utf-8-sig")))
+
+    sheet = _xlsx_rows(_export(client, brief, "xlsx").content)
+    assert sheet[0] == header
+    assert _comparable(sheet[1:]) == _comparable(rows)
+
+    table = pq.read_table(io.BytesIO(_export(client, brief, "parquet").content))
+    assert table.column_names == ["session_id", "created_at", *brief["keys"]]
+    assert _comparable(list(row.values()) for row in table.to_pylist()) == _comparable(rows)
+
+
+def test_rows_are_read_in_chunks(client, brief, monkeypatch, tmp_path):
+    import pyarrow.parquet as pq
+    from app import export, serializers
+    from app.database import AsyncSessionLocal
+    from app.responses import get_brief_json
+
+    monkeypatch.setattr(export, "EXPORT_CHUNK_SIZE", 2)
+
+    async def collect():
+        async with AsyncSessionLocal() as db:
+            columns = export.brief_columns(serializers.loads((await get_brief_json(db, brief["id"]))[1]))
+            pieces = [piece async for piece in export.iter_csv(db, brief["id"], columns)]
+            await export.write_parquet(str(tmp_path / "chunks.parquet"), db, brief["id"], columns)
+        return pieces
+
+    pieces = client.portal.call(collect)
+    # Заголовок и по куску на каждые две строки из пяти
+    assert len(pieces) == 1 + 3
+    assert b"".join(pieces) == _export(client, brief, "csv").content
+    parquet = pq.ParquetFile(tmp_path / "chunks.parquet")
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.metadata.num_rows == len(ANSWERS)
+
+
+def test_export_is_for_owner_only(client, brief, make_owner):
+    url = f"/briefs/{brief['id']}/submissions/export"
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers=make_owner("export-stranger")["headers"]).status_code == 404
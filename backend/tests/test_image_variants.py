@@ -0,0 +1,58 @@
+# backend/tests/test_image_variants.py
+"""
+Варианты изображений (app.image_variants): WebP-вариант генерируется один раз и
+дальше берётся с диска, для не-изображения — 404.
+"""
+from __future__ import annotations
+import io
+import uuid
+
+import pytest
+
+
+def _png(width: int, height: int) -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 90)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_variant_is_generated_once(client, monkeypatch):
+    from PIL import Image
+    from app import image_variants
+    from app.uploads import UPLOAD_DIR
+
+    # Файл кладётся напрямую, как старая загрузка без фоновой генерации вариантов
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    filename = f"{uuid.uuid4().hex}.png"
+    (UPLOAD_DIR / filename).write_bytes(_png(1000, 500))
+
+    render = image_variants._render_variant
+    calls = []
+
+    def counting(source, target, variant):
+        calls.append(variant)
+        return render(source, target, variant)
+
+    monkeypatch.setattr(image_variants, "_render_variant", counting)
+    url = f"/briefs/uploads/thumb/{filename}"
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "image/webp"
+    assert "immutable" in first.headers["cache-control"]
+    with Image.open(io.BytesIO(first.content)) as image:
+        assert (image.format, image.size) == ("WEBP", (320, 160))
+
+    assert client.get(url).content == first.content
+    assert calls == ["thumb"]
+
+
+@pytest.mark.parametrize("filename", ["not-an-image.png", "notes.txt", "missing.png"])
+def test_variant_of_non_image_is_404(client, filename):
+    from app.uploads import UPLOAD_DIR
+
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    if filename != "missing.png":
+        (UPLOAD_DIR / filename).write_bytes(b"plain text, not pixels")
+    assert client.get(f"/briefs/uploads/web/{filename}").status_code == 404
@@ -0,0 +1,216 @@
+# backend/tests/test_ingest.py
+"""
+Пакетная запись ответов (app.ingest): приём без SQL, запись пачками, 503 при
+переполнении очереди, перенос журнала после остановки без потери принятых ответов и
+вынос ответов, которые не записываются, в dead-letter вместо бесконечных повторов.
+"""
+from __future__ import annotations
+import asyncio
+import os
+
+import pytest
+
+BRIEF = {
+    "title": "Пакетный бриф",
+    "steps": [{"title": "Шаг", "questions": [
+        {"text": "Канал", "question_type": "single_choice", "options": ["email", "телефон"]},
+    ]}],
+}
+SUBMISSIONS = 20
+
+
+@pytest.fixture(scope="module")
+def brief(make_brief):
+    created, headers = make_brief("ingest", BRIEF)
+    question_id = str(created["steps"][0]["questions"][0]["id"])
+    return {"id": created["id"], "headers": headers, "answers": {question_id: "email"}}
+
+
+@pytest.fixture
+def batched(monkeypatch):
+    from app import config
+
+    monkeypatch.setattr(config, "SUBMISSION_INGEST_MODE", "batched")
+
+
+def _post(client, brief):
+    return client.post("/briefs/submissions", json={"brief_id": brief["id"], "answers": brief["answers"]})
+
+
+def test_batched_submissions_are_written_in_batches(client, query_log, brief, batched, monkeypatch):
+    from app import ingest
+    from app.ingest import submission_ingestor
+
+    # Писатель ждёт конца замера, иначе пачка по max_wait попадёт в журнал SQL
+    measured = asyncio.Event()
+    write_batch = ingest.write_batch
+
+    async def gated(rows, deduplicate=False):
+        await measured.wait()
+        return await write_batch(rows, deduplicate=deduplicate)
+
+    monkeypatch.setattr(ingest, "write_batch", gated)
+    _post(client, brief)  # бриф попадает в кэш, очередь и журнал создаются
+    batches_before = submission_ingestor.batches
+
+    query_log.statements.clear()
+    query_log.enabled = True
+    try:
+        responses = [_post(client, brief) for _ in range(SUBMISSIONS - 1)]
+    finally:
+        query_log.enabled = False
+        client.portal.call(measured.set)
+    assert [r.status_code for r in responses] == [202] * (SUBMISSIONS - 1)
+    assert query_log.statements == []
+    assert set(responses[0].json()) == {"session_id", "brief_id"}
+
+    client.portal.call(submission_ingestor.drain)
+    assert submission_ingestor.batches - batches_before < SUBMISSIONS - 1
+    for response in responses:
+        assert client.get(f"/briefs/submission/{response.json()['session_id']}").status_code == 200
+    analytics = client.get(f"/briefs/{brief['id']}/analytics", headers=brief["headers"]).json()
+    assert analytics["total_submissions"] == SUBMISSIONS
+    assert analytics["questions"][0]["option_counts"]["email"] == SUBMISSIONS
+
+
+def test_queue_full_and_spool_replay(client, brief, batched, monkeypatch, tmp_path):
+    from app import ingest
+
+    ingestor = ingest.SubmissionIngestor(spool_dir=str(tmp_path), batch_size=10, max_wait=0.01, max_queue=1)
+    monkeypatch.setattr(ingest, "submission_ingestor", ingestor)
+
+    async def stuck(rows, deduplicate=False):
+        await asyncio.Event().wait()
+
+    with monkeypatch.context() as patch:
+        # БД «зависла»: первую пачку забирает писатель, вторая ждёт в очереди, третьей места нет
+        patch.setattr(ingest, "write_batch", stuck)
+        first = _post(client, brief)
+        client.portal.call(asyncio.sleep, 0.05)
+        second = _post(client, brief)
+        third = _post(client, brief)
+        assert [first.status_code, second.status_code, third.status_code] == [202, 202, 503]
+        assert third.headers["Retry-After"] == "1"
+        client.portal.call(ingestor.shutdown, 0.1)
+
+    # Принятые ответы остались в журнале и переносятся при следующем старте
+    assert list(tmp_path.glob("*.jsonl"))
+    accepted = [first.json()["session_id"], second.json()["session_id"]]
+    for session_id in accepted:
+        assert client.get(f"/briefs/submission/{session_id}").status_code == 404
+
+    restarted = ingest.SubmissionIngestor(spool_dir=str(tmp_path), batch_size=10, max_wait=0.01, max_queue=10)
+    assert client.portal.call(restarted.replay_orphans) == 2
+    assert not list(tmp_path.glob("*.jsonl"))
+    for session_id in accepted:
+        assert client.get(f"/briefs/submission/{session_id}").status_code == 200
+
+
+def test_replay_skips_already_written(client, brief, tmp_path):
+    from app import ingest, serializers
+
+    session_id = client.post("/briefs/submissions", json={"brief_id": brief["id"], "answers": brief["answers"]}).json()["session_id"]
+    row = {"brief_id": brief["id"], "session_id": session_id, "answers_data": brief["answers"], "created_at": "2024-01-01T00:00:00Z"}
+    (tmp_path / "crashed.jsonl").write_bytes(
+        serializers.dumps(row) + b"\n" + serializers.dumps({**row, "session_id": "replayed"}) + b"\n" + b'{"brief_id": 1, "sess'
+    )
+
+    replayer = ingest.SubmissionIngestor(spool_dir=str(tmp_path), batch_size=10, max_wait=0.01, max_queue=10)
+    before = client.get(f"/briefs/{brief['id']}/analytics", headers=brief["headers"]).json()["total_submissions"]
+    client.portal.call(replayer.replay_orphans)
+    after = client.get(f"/briefs/{brief['id']}/analytics", headers=brief["headers"]).json()["total_submissions"]
+    assert after == before + 1
+    assert client.get("/briefs/submission/replayed").status_code == 200
+
+
+def test_replay_during_segment_creation_leaves_it_alone(client, monkeypatch, tmp_path):
+    from app import ingest
+
+    replayer = ingest.SubmissionIngestor(spool_dir=str(tmp_path), batch_size=10, max_wait=0.01, max_queue=10)
+    real_flock = ingest.fcntl.flock
+    replayed = []
+
+    def flock(fd, operation):
+        if operation == ingest.fcntl.LOCK_EX and not replayed:
+            # Перенос другого воркера между созданием сегмента и его блокировкой
+            replayed.append(client.portal.call(replayer.replay_orphans))
+        return real_flock(fd, operation)
+
+    monkeypatch.setattr(ingest.fcntl, "flock", flock)
+    segment = ingest._Segment(tmp_path)
+    monkeypatch.setattr(ingest.fcntl, "flock", real_flock)
+    try:
+        assert replayed == [0]
+        assert segment.path.exists() and os.fstat(segment.fd).st_nlink == 1
+        # Уже заблокированный сегмент перенос тоже не трогает
+        assert client.portal.call(replayer.replay_orphans) == 0
+        assert segment.path.exists()
+    finally:
+        segment.close(remove=True)
+
+
+def test_replay_skips_segment_committed_during_open(client, brief, monkeypatch, tmp_path):
+    from app import ingest, serializers
+
+    segment = ingest._Segment(tmp_path)
+    row = {"brief_id": brief["id"], "session_id": "committed", "answers_data": brief["answers"], "created_at": "2024-01-01T00:00:00Z"}
+    os.write(segment.fd, serializers.dumps(row) + b"\n")
+    real_flock = ingest.fcntl.flock
+
+    def flock(fd, operation):
+        if operation & ingest.fcntl.LOCK_NB and segment.path.exists():
+            # Владелец закоммитил записи и удалил сегмент между open и flock переноса
+            segment.close(remove=True)
+        return real_flock(fd, operation)
+
+    monkeypatch.setattr(ingest.fcntl, "flock", flock)
+    replayer = ingest.SubmissionIngestor(spool_dir=str(tmp_path), batch_size=10, max_wait=0.01, max_queue=10)
+    assert client.portal.call(replayer.replay_orphans) == 0
+    assert client.get("/briefs/submission/committed").status_code == 404
+
+
+def test_unwritable_rows_are_dead_lettered(client, brief, batched, monkeypatch, tmp_path):
+    from sqlalchemy.exc import IntegrityError, OperationalError
+    from app import ingest
+
+    ingestor = ingest.SubmissionIngestor(spool_dir=str(tmp_path), batch_size=10, max_wait=0.01, max_queue=10)
+    monkeypatch.setattr(ingest, "submission_ingestor", ingestor)
+    monkeypatch.setattr(ingest, "RETRY_SECONDS", 0)
+    write_batch = ingest.write_batch
+    released = asyncio.Event()
+    poisoned = set()
+    outages = [OperationalError("INSERT", {}, ConnectionResetError())] * 5
+
+    async def flaky(rows, deduplicate=False):
+        await released.wait()
+        if outages:
+            # Обрыв связи с БД повторяется без счёта попыток
+            raise outages.pop()
+        if poisoned & {row["session_id"] for row in rows}:
+            raise IntegrityError("INSERT", {}, Exception("FOREIGN KEY constraint failed"))
+        return await write_batch(rows, deduplicate=deduplicate)
+
+    monkeypatch.setattr(ingest, "write_batch", flaky)
+    accepted = [_post(client, brief) for _ in range(5)]
+    assert [r.status_code for r in accepted] == [202] * 5
+    sessions = [r.json()["session_id"] for r in accepted]
+    poisoned.add(sessions[2])
+    client.portal.call(released.set)
+    client.portal.call(ingestor.drain)
+
+    for session_id in sessions:
+        expected = 404 if session_id in poisoned else 200
+        assert client.get(f"/briefs/submission/{session_id}").status_code == expected
+    assert ingestor.metrics()["dead_lettered"] == 1 and ingestor.written == 4
+    dead = list((tmp_path / ingest.DEAD_LETTER_DIR_NAME).glob("*.jsonl"))
+    assert len(dead) == 1 and sessions[2] in dead[0].read_text()
+
+    # Очередь не застряла; dead-letter не переносится при старте
+    later = _post(client, brief)
+    assert later.status_code == 202
+    client.portal.call(ingestor.drain)
+    assert client.get(f"/briefs/submission/{later.json()['session_id']}").status_code == 200
+    client.portal.call(ingestor.shutdown, 0.1)
+    restarted = ingest.SubmissionIngestor(spool_dir=str(tmp_path), batch_size=10, max_wait=0.01, max_queue=10)
+    assert client.portal.call(restarted.replay_orphans) == 0
+    assert dead[0].exists()
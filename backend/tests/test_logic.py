@@ -0,0 +1,138 @@
+# backend/tests/test_logic.py
+"""
+Условия показа (app.logic): сохранение conditional_logic, видимость шагов и вопросов
+с учётом скрытых ответов, отбрасывание ответов на скрытые вопросы при отправке.
+"""
+from __future__ import annotations
+
+import pytest
+
+BRIEF = {
+    "title": "Бриф с условиями",
+    "steps": [
+        {"title": "Тип", "questions": [
+            {"text": "Что нужно", "question_type": "single_choice", "options": ["сайт", "логотип"]},
+        ]},
+        {"title": "Сайт", "questions": [
+            {"text": "Страницы", "question_type": "multi_choice", "options": ["каталог", "блог"]},
+            {"text": "Сколько товаров", "question_type": "number"},
+        ]},
+        {"title": "Блог", "questions": [
+            {"text": "Темы блога", "question_type": "text"},
+        ]},
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def brief(client, make_brief):
+    created, headers = make_brief("logic", BRIEF)
+    kind, pages, items, topics = (q["id"] for step in created["steps"] for q in step["questions"])
+
+    # Условия ссылаются на id вопросов, поэтому задаются правкой уже созданного брифа
+    update = {"title": created["title"], "steps": [
+        {"id": step["id"], "title": step["title"], "questions": [
+            {k: q[k] for k in ("id", "text", "question_type", "options")} for q in step["questions"]
+        ]}
+        for step in created["steps"]
+    ]}
+    update["steps"][1]["conditional_logic"] = {"show_if": {"question_id": kind, "operator": "equals", "value": "сайт"}}
+    update["steps"][1]["questions"][1]["conditional_logic"] = {"show_if": {"question_id": pages, "value": "каталог"}}
+    update["steps"][2]["conditional_logic"] = {"show_if": {"question_id": pages, "operator": "equals", "value": "блог"}}
+    updated = client.put(f"/briefs/{created['id']}", json=update, headers=headers)
+    assert updated.status_code == 200, updated.text
+    return {
+        "id": created["id"],
+        "steps": [step["id"] for step in created["steps"]],
+        "keys": {name: str(qid) for name, qid in zip(("kind", "pages", "items", "topics"), (kind, pages, items, topics))},
+        "ids": (kind, pages, items, topics),
+    }
+
+
+def _visibility(client, brief, answers, current_step_id=None):
+    response = client.post(f"/briefs/{brief['id']}/visibility", json={"answers": answers, "current_step_id": current_step_id})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_conditional_logic_is_stored(client, brief):
+    steps = client.get(f"/briefs/{brief['id']}").json()["steps"]
+    assert steps[0]["conditional_logic"] is None
+    assert steps[1]["conditional_logic"] == {"show_if": {"question_id": brief["ids"][0], "operator": "equals", "value": "сайт"}}
+    assert steps[1]["questions"][1]["conditional_logic"]["show_if"]["operator"] == "equals"
+
+
+def test_visibility_follows_answers(client, brief):
+    keys, (kind, pages, items, topics) = brief["keys"], brief["ids"]
+    first, site, blog = brief["steps"]
+
+    assert _visibility(client, brief, {}) == {"steps": [{"id": first, "question_ids": [kind]}], "next_step_id": first}
+
+    answers = {keys["kind"]: "сайт", keys["pages"]: ["каталог", "блог"]}
+    result = _visibility(client, brief, answers, current_step_id=first)
+    assert result["steps"] == [
+        {"id": first, "question_ids": [kind]},
+        {"id": site, "question_ids": [pages, items]},
+        {"id": blog, "question_ids": [topics]},
+    ]
+    assert result["next_step_id"] == site
+    assert _visibility(client, brief, answers, current_step_id=blog)["next_step_id"] is None
+
+    # Шаг «Сайт» скрыт: его ответ про блог уже не открывает шаг «Блог»
+    hidden = _visibility(client, brief, {**answers, keys["kind"]: "логотип"}, current_step_id=site)
+    assert hidden == {"steps": [{"id": first, "question_ids": [kind]}], "next_step_id": None}
+
+
+def test_hidden_answers_are_dropped_on_submit(client, brief):
+    keys = brief["keys"]
+    answers = {keys["kind"]: "логотип", keys["pages"]: ["блог"], keys["items"]: 10, keys["topics"]: "дизайн"}
+    created = client.post("/briefs/submissions", json={"brief_id": brief["id"], "answers": answers})
+    assert created.status_code == 200
+    assert created.json()["answers_data"] == {keys["kind"]: "логотип"}
+
+    session_id = client.post(f"/briefs/{brief['id']}/drafts", json={"answers": {keys["kind"]: "сайт", keys["pages"]: ["блог"], keys["items"]: 5}}).json()["session_id"]
+    submitted = client.post(f"/briefs/drafts/{session_id}/finalize", json={}).json()
+    assert submitted["answers_data"] == {keys["kind"]: "сайт", keys["pages"]: ["блог"]}
+
+
+def test_builder_contains_operators(client, make_brief):
+    # Конструктор предлагает contains/not_contains для вопросов с вариантами
+    created, headers = make_brief("logic-contains", BRIEF)
+    (kind,), (pages, items), (topics,) = ([q["id"] for q in step["questions"]] for step in created["steps"])
+    update = {"title": created["title"], "steps": [
+        {"id": step["id"], "title": step["title"], "questions": [
+            {k: q[k] for k in ("id", "text", "question_type", "options")} for q in step["questions"]
+        ]}
+        for step in created["steps"]
+    ]}
+    update["steps"][1]["questions"][1]["conditional_logic"] = {"show_if": {"question_id": pages, "operator": "contains", "value": "каталог"}}
+    update["steps"][2]["conditional_logic"] = {"show_if": {"question_id": pages, "operator": "not_contains", "value": "блог"}}
+    updated = client.put(f"/briefs/{created['id']}", json=update, headers=headers)
+    assert updated.status_code == 200, updated.text
+    assert updated.json()["steps"][2]["conditional_logic"]["show_if"]["operator"] == "not_contains"
+
+    brief = {"id": created["id"]}
+    site, blog = created["steps"][1]["id"], created["steps"][2]["id"]
+    shown = _visibility(client, brief, {str(kind): "сайт", str(pages): ["каталог"]})["steps"]
+    assert shown[1:] == [{"id": site, "question_ids": [pages, items]}, {"id": blog, "question_ids": [topics]}]
+    hidden = _visibility(client, brief, {str(kind): "сайт", str(pages): ["блог"]})["steps"]
+    assert hidden[1:] == [{"id": site, "question_ids": [pages]}]
+
+
+def test_compiled_logic_is_reused_per_brief_version(client, brief, monkeypatch):
+    from app import logic
+    from app.cache import compiled_brief_cache
+
+    compiled_brief_cache.clear()
+    calls = []
+    original = logic.BriefLogic.__init__
+
+    def counting_init(self, data):
+        calls.append(data["id"])
+        original(self, data)
+
+    monkeypatch.setattr(logic.BriefLogic, "__init__", counting_init)
+    for _ in range(3):
+        _visibility(client, brief, {})
+    client.post("/briefs/submissions", json={"brief_id": brief["id"], "answers": {}})
+    assert calls == [brief["id"]]
@@ -0,0 +1,186 @@
+# backend/tests/test_pdf.py
+"""
+PDF-отчёты: дисковый кэш (app.pdf_cache) — промах и попадание, ETag и 304, Range,
+вытеснение по размеру и повторный рендер файла, вытесненного перед отдачей; пул
+рендеринга (app.pdf_pool) — 503 при занятом пуле, 504 по таймауту, замена сломанного пула.
+"""
+from __future__ import annotations
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+BRIEF = {
+    "title": "Бриф для отчёта",
+    "steps": [{"title": "Шаг", "questions": [
+        {"text": "Имя", "question_type": "text"},
+        {"text": "Канал", "question_type": "single_choice", "options": ["email", "телефон"]},
+    ]}],
+}
+
+
+@pytest.fixture(scope="module")
+def brief(make_brief):
+    created, _ = make_brief("pdf", BRIEF)
+    return {"id": created["id"], "keys": [str(q["id"]) for q in created["steps"][0]["questions"]]}
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    from app.pdf_pool import pdf_pool
+
+    calls = []
+    render = pdf_pool.render
+
+    async def counting(report):
+        calls.append(report["session_id"])
+        return await render(report)
+
+    monkeypatch.setattr(pdf_pool, "render", counting)
+    return calls
+
+
+def _submit(client, brief) -> str:
+    answers = dict(zip(brief["keys"], ("Иван", "email")))
+    response = client.post("/briefs/submissions", json={"brief_id": brief["id"], "answers": answers})
+    assert response.status_code == 200, response.text
+    return response.json()["session_id"]
+
+
+def test_report_is_rendered_once_and_cached(client, brief, renders):
+    url = f"/briefs/submissions/{_submit(client, brief)}/pdf"
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "application/pdf"
+    assert first.content.startswith(b"%PDF")
+    assert len(renders) == 1
+
+    second = client.get(url)
+    assert second.content == first.content
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert len(renders) == 1
+
+    not_modified = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    partial = client.get(url, headers={"Range": "bytes=0-3"})
+    assert partial.status_code == 206
+    assert partial.content == b"%PDF"
+    assert partial.headers["Content-Range"] == f"bytes 0-3/{len(first.content)}"
+    assert len(renders) == 1
+
+
+def test_report_evicted_before_sending_is_rendered_again(client, brief, renders, monkeypatch):
+    from app import reports
+
+    get_report_path = reports.get_report_path
+    evicted = []
+
+    async def evicting(submission, brief):
+        path = await get_report_path(submission, brief)
+        if not evicted:
+            # Другой воркер вытеснил файл между попаданием в кэш и отдачей
+            evicted.append(path)
+            os.unlink(path)
+        return path
+
+    monkeypatch.setattr(reports, "get_report_path", evicting)
+    response = client.get(f"/briefs/submissions/{_submit(client, brief)}/pdf")
+    assert response.status_code == 200
+    assert response.content.startswith(b"%PDF")
+    assert len(renders) == 2
+    assert evicted[0].exists()
+
+
+def test_cache_evicts_least_recently_read(tmp_path):
+    from app.pdf_cache import PdfDiskCache
+
+    cache = PdfDiskCache(tmp_path, max_bytes=1000)
+    now = time.time()
+    for age, key in ((30, "a"), (20, "b"), (10, "c")):
+        os.utime(cache.put(key, b"x" * 300), (now - age, now - age))
+    # Чтение обновляет mtime: «a» становится самым свежим
+    assert cache.get("a") == cache.path_for("a")
+    assert cache.get("missing") is None
+
+    # 1200 байт при лимите 1000: вытесняется до 90% лимита, начиная с давно читавшихся
+    cache.put("d", b"x" * 300)
+    assert sorted(p.stem for p in tmp_path.glob("*.pdf")) == ["a", "c", "d"]
+
+    # Только что записанный файл не вытесняется, даже если сам больше лимита
+    cache.put("big", b"x" * 2000)
+    assert [p.stem for p in tmp_path.glob("*.pdf")] == ["big"]
+
+
+@pytest.fixture
+def slow_pool(monkeypatch):
+    from app import pdf_pool as pool_module, reports
+
+    def slow_render(report):
+        time.sleep(0.3)
+        return b"%PDF-slow"
+
+    pool = pool_module.PdfRenderPool(kind="thread", workers=1, max_queue=0, timeout=0.05)
+    monkeypatch.setattr(pool_module, "_render", slow_render)
+    monkeypatch.setattr(reports, "pdf_pool", pool)
+    yield pool
+    pool.shutdown()
+
+
+def test_timeout_gives_504_and_busy_pool_503(client, brief, slow_pool):
+    timed_out = client.get(f"/briefs/submissions/{_submit(client, brief)}/pdf")
+    assert timed_out.status_code == 504
+    # Отменённый по таймауту рендер ещё держит единственный слот
+    busy = client.get(f"/briefs/submissions/{_submit(client, brief)}/pdf")
+    assert busy.status_code == 503
+    assert busy.headers["Retry-After"] == "5"
+    assert (slow_pool.timeouts, slow_pool.rejected) == (1, 1)
+
+    client.portal.call(asyncio.sleep, 0.4)
+    assert slow_pool.in_flight == 0
+
+
+class _BrokenPool(Executor):
+    """Пул, чей воркер умер: как ProcessPoolExecutor после гибели процесса."""
+
+    def __init__(self, on_submit: bool):
+        self.on_submit = on_submit
+
+    def submit(self, fn, *args, **kwargs):
+        if self.on_submit:
+            raise BrokenProcessPool("A child process terminated abruptly")
+        future = Future()
+        future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+        return future
+
+
+async def _start(pool) -> None:
+    # Семафор слотов создаётся в event loop приложения
+    pool.start()
+
+
+@pytest.mark.parametrize("on_submit", [False, True], ids=["during-render", "already-broken"])
+def test_broken_pool_is_replaced(client, brief, monkeypatch, on_submit):
+    from app import pdf_pool as pool_module, reports
+
+    pool = pool_module.PdfRenderPool(kind="thread", workers=1, max_queue=0, timeout=5)
+    monkeypatch.setattr(reports, "pdf_pool", pool)
+    client.portal.call(_start, pool)
+    pool._executor = broken = _BrokenPool(on_submit)
+    try:
+        crashed = client.get(f"/briefs/submissions/{_submit(client, brief)}/pdf")
+        assert crashed.status_code == 503
+        assert crashed.headers["Retry-After"] == "1"
+        assert pool._executor is not broken and pool.restarts == 1
+
+        # Слот освобождён, новый пул рендерит
+        rendered = client.get(f"/briefs/submissions/{_submit(client, brief)}/pdf")
+        assert rendered.status_code == 200
+        assert rendered.content.startswith(b"%PDF")
+        assert pool.in_flight == 0 and pool.completed == 1
+    finally:
+        pool.shutdown()
@@ -0,0 +1,244 @@
+# backend/tests/test_query_budgets.py
+"""
+Бюджет SQL-запросов на каждый маршрут API.
+
+Каждый маршрут вызывается на заполненной базе с холодными кэшами; число выполненных
+SQL-выражений сравнивается с объявленным бюджетом. При превышении тест падает и
+печатает все выражения запроса — видно, какой selectin или лишний SELECT добавился.
+Новый маршрут без бюджета роняет test_every_route_has_budget.
+
+Бюджет — верхняя граница: если маршрут стал делать меньше запросов, стоит уменьшить
+и его бюджет, чтобы зафиксировать улучшение.
+"""
+from __future__ import annotations
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pytest
+
+# Бриф для сида: вопросы с вариантами нужны для аналитики. От его размера зависят
+# бюджеты создания и удаления: строки шагов и вопросов вставляются и удаляются по одной
+BRIEF = {
+    "title": "Бриф",
+    "description": "Описание",
+    "steps": [
+        {"title": "Шаг 1", "questions": [
+            {"text": "Имя", "question_type": "text", "is_required": True},
+            {"text": "Бюджет", "question_type": "single_choice", "options": ["до 100", "больше 100"]},
+        ]},
+        {"title": "Шаг 2", "questions": [
+            {"text": "Услуги", "question_type": "multi_choice", "options": ["сайт", "бренд", "SMM"]},
+        ]},
+    ],
+}
+SUBMISSIONS = 5
+
+
+@dataclass
+class Budget:
+    queries: int
+    request: Callable[[Dict[str, Any]], Tuple[str, Dict[str, Any]]]
+    # Бюджет повторного запроса, когда кэши уже прогреты (None — не проверяется)
+    warm_queries: Optional[int] = None
+    status: int = 200
+
+
+def _auth(ctx, **kwargs):
+    return {"headers": ctx["headers"], **kwargs}
+
+
+BUDGETS: Dict[Tuple[str, str], Budget] = {
+    # Публичные страницы
+    ("GET", "/main-brief"): Budget(4, lambda c: ("/main-brief", {}), warm_queries=0),
+    ("GET", "/briefs/{brief_id}"): Budget(3, lambda c: (f"/briefs/{c['brief_id']}", {}), warm_queries=0),
+    ("POST", "/briefs/submissions"): Budget(
+        7, lambda c: ("/briefs/submissions", {"json": {"brief_id": c["brief_id"], "answers": c["answers"]}})
+    ),
+    ("GET", "/briefs/submission/{session_id}"): Budget(2, lambda c: (f"/briefs/submission/{c['session_id']}", {})),
+    ("GET", "/briefs/submissions/{session_id}/pdf"): Budget(2, lambda c: (f"/briefs/submissions/{c['session_id']}/pdf", {})),
+    ("GET", "/briefs/versions/{version_id}"): Budget(
+        1, lambda c: (f"/briefs/versions/{c['version_id']}", {}), warm_queries=0
+    ),
+    ("POST", "/briefs/{brief_id}/visibility"): Budget(
+        2, lambda c: (f"/briefs/{c['brief_id']}/visibility", {"json": {"answers": c["answers"]}}), warm_queries=0
+    ),
+    # Черновики ответов: у патча и отправки свои черновики из сида
+    ("POST", "/briefs/{brief_id}/drafts"): Budget(
+        3, lambda c: (f"/briefs/{c['brief_id']}/drafts", {"json": {"answers": c["answers"]}}), status=201
+    ),
+    ("GET", "/briefs/drafts/{session_id}"): Budget(1, lambda c: (f"/briefs/drafts/{c['draft_session_id']}", {})),
+    ("PATCH", "/briefs/drafts/{session_id}"): Budget(
+        1, lambda c: (f"/briefs/drafts/{c['draft_session_id']}", {"json": {"version": 0, "answers": c["draft_patch"]}})
+    ),
+    ("POST", "/briefs/drafts/{session_id}/finalize"): Budget(
+        9, lambda c: (f"/briefs/drafts/{c['finalize_session_id']}/finalize", {"json": {}})
+    ),
+    ("POST", "/briefs/uploadfile"): Budget(0, lambda c: ("/briefs/uploadfile", {"files": {"file": ("a.txt", b"hello")}})),
+    ("GET", "/briefs/uploads/{variant}/{filename}"): Budget(
+        0, lambda c: ("/briefs/uploads/thumb/missing.png", {}), status=404
+    ),
+    # Ответы брифа
+    ("GET", "/briefs/{brief_id}/submissions"): Budget(2, lambda c: (f"/briefs/{c['brief_id']}/submissions", {})),
+    ("GET", "/briefs/{brief_id}/submissions/page"): Budget(4, lambda c: (f"/briefs/{c['brief_id']}/submissions/page", {})),
+    ("GET", "/briefs/{brief_id}/submissions/export"): Budget(
+        4, lambda c: (f"/briefs/{c['brief_id']}/submissions/export", _auth(c))
+    ),
+    # Кабинет владельца
+    ("POST", "/users"): Budget(
+        2, lambda c: ("/users", {"json": {"email": "new@example.com", "username": "new", "password": "secret"}}), status=201
+    ),
+    ("POST", "/token"): Budget(1, lambda c: ("/token", {"data": {"username": c["email"], "password": c["password"]}})),
+    ("GET", "/users/me"): Budget(5, lambda c: ("/users/me", _auth(c))),
+    ("GET", "/briefs/"): Budget(4, lambda c: ("/briefs/", _auth(c))),
+    ("POST", "/briefs"): Budget(11, lambda c: ("/briefs", _auth(c, json=BRIEF)), status=201),
+    ("PUT", "/briefs/{brief_id}"): Budget(10, lambda c: (f"/briefs/{c['brief_id']}", _auth(c, json=c["brief_update"]))),
+    ("PUT", "/briefs/{brief_id}/set-main"): Budget(7, lambda c: (f"/briefs/{c['brief_id']}/set-main", _auth(c))),
+    ("DELETE", "/briefs/{brief_id}"): Budget(11, lambda c: (f"/briefs/{c['spare_brief_id']}", _auth(c)), status=204),
+    ("GET", "/briefs/{brief_id}/analytics"): Budget(6, lambda c: (f"/briefs/{c['brief_id']}/analytics", _auth(c))),
+    ("POST", "/briefs/{brief_id}/submissions/search"): Budget(
+        4, lambda c: (f"/briefs/{c['brief_id']}/submissions/search", _auth(c, json=c["search"]))
+    ),
+    # Выгрузка отчётов: сама задача идёт в фоне, здесь — только запросы обработчиков
+    ("POST", "/briefs/{brief_id}/reports/jobs"): Budget(2, lambda c: (f"/briefs/{c['brief_id']}/reports/jobs", _auth(c)), status=202),
+    ("GET", "/briefs/reports/jobs/{job_id}"): Budget(1, lambda c: (f"/briefs/reports/jobs/{c['job_id']}", _auth(c))),
+    ("GET", "/briefs/reports/jobs/{job_id}/download"): Budget(1, lambda c: (f"/briefs/reports/jobs/{c['job_id']}/download", _auth(c))),
+    # Служебные
+    ("GET", "/"): Budget(0, lambda c: ("/", {})),
+    ("GET", "/metrics"): Budget(0, lambda c: ("/metrics", {})),
+    ("GET", "/metrics/pdf-pool"): Budget(0, lambda c: ("/metrics/pdf-pool", {})),
+    ("GET", "/metrics/db-pool"): Budget(0, lambda c: ("/metrics/db-pool", {})),
+    ("GET", "/metrics/ingest"): Budget(0, lambda c: ("/metrics/ingest", {})),
+    ("GET", "/metrics/startup"): Budget(0, lambda c: ("/metrics/startup", {})),
+}
+
+# Порядок важен: задачу отчётов нужно создать и дождаться до запросов её статуса
+JOB_ROUTES = [
+    ("POST", "/briefs/{brief_id}/reports/jobs"),
+    ("GET", "/briefs/reports/jobs/{job_id}"),
+    ("GET", "/briefs/reports/jobs/{job_id}/download"),
+]
+
+
+def _reset_caches():
+    from app.cache import brief_version_cache, compiled_brief_cache, invalidate_all_briefs, principal_cache
+
+    invalidate_all_briefs()
+    principal_cache.clear()
+    compiled_brief_cache.clear()
+    brief_version_cache.clear()
+
+
+def _counted(client, query_log, method: str, url: str, **kwargs):
+    query_log.statements.clear()
+    query_log.enabled = True
+    try:
+        response = client.request(method, url, **kwargs)
+    finally:
+        query_log.enabled = False
+    return response, list(query_log.statements)
+
+
+def _check_budget(route: Tuple[str, str], statements, budget: int, label: str = "") -> None:
+    if len(statements) > budget:
+        listing = "\n".join(f"  {i}. {sql}" for i, sql in enumerate(statements, 1))
+        pytest.fail(
+            f"{route[0]} {route[1]}{label}: {len(statements)} SQL statements, budget {budget}\n{listing}",
+            pytrace=False,
+        )
+
+
+@pytest.fixture(scope="module")
+def ctx(client, make_owner):
+    owner = make_owner("owner")
+    headers = owner["headers"]
+
+    brief = client.post("/briefs", json=BRIEF, headers=headers).json()
+    spare = client.post("/briefs", json=BRIEF, headers=headers).json()
+    client.put(f"/briefs/{brief['id']}/set-main", headers=headers)
+    questions = [q for step in brief["steps"] for q in step["questions"]]
+    answers = {str(questions[0]["id"]): "Иван", str(questions[1]["id"]): "до 100", str(questions[2]["id"]): ["сайт", "SMM"]}
+    session_ids = [
+        client.post("/briefs/submissions", json={"brief_id": brief["id"], "answers": answers}).json()["session_id"]
+        for _ in range(SUBMISSIONS)
+    ]
+    version_id = client.get(f"/briefs/submission/{session_ids[0]}").json()["brief_version_id"]
+    drafts = [client.post(f"/briefs/{brief['id']}/drafts", json={"answers": answers}).json()["session_id"] for _ in range(2)]
+    # Правка без изменений структуры: тот же бриф с id шагов и вопросов
+    brief_update = {
+        "title": brief["title"] + " (ред.)",
+        "description": brief["description"],
+        "steps": [
+            {"id": s["id"], "title": s["title"], "questions": [
+                {k: q[k] for k in ("id", "text", "question_type", "options", "is_required")} for q in s["questions"]
+            ]}
+            for s in brief["steps"]
+        ],
+    }
+    return {
+        **owner,
+        "brief_id": brief["id"],
+        "spare_brief_id": spare["id"],
+        "answers": answers,
+        "session_id": session_ids[0],
+        "version_id": version_id,
+        "draft_session_id": drafts[0],
+        "draft_patch": {str(questions[0]["id"]): "Пётр", str(questions[2]["id"]): None},
+        "finalize_session_id": drafts[1],
+        "brief_update": brief_update,
+        "search": {"query": "Иван", "filters": [{"question_id": questions[2]["id"], "value": "SMM"}]},
+    }
+
+
+ROUTES = [route for route in BUDGETS if route not in JOB_ROUTES]
+
+
+@pytest.mark.parametrize("route", ROUTES, ids=[f"{m} {p}" for m, p in ROUTES])
+def test_route_query_budget(client, query_log, ctx, route):
+    budget = BUDGETS[route]
+    url, kwargs = budget.request(ctx)
+
+    _reset_caches()
+    response, statements = _counted(client, query_log, route[0], url, **kwargs)
+    assert response.status_code == budget.status, response.text
+    _check_budget(route, statements, budget.queries)
+
+    if budget.warm_queries is not None:
+        response, statements = _counted(client, query_log, route[0], url, **kwargs)
+        assert response.status_code == budget.status, response.text
+        _check_budget(route, statements, budget.warm_queries, " (warm cache)")
+
+
+def test_report_job_query_budgets(client, query_log, ctx, monkeypatch):
+    from app import report_jobs
+
+    create, status_route, download = JOB_ROUTES
+    # Фоновое выполнение запускаем вручную после замера, чтобы его SQL не попал в счёт
+    with monkeypatch.context() as patch:
+        patch.setattr(report_jobs, "start", lambda job_id: None)
+        url, kwargs = BUDGETS[create].request(ctx)
+        _reset_caches()
+        response, statements = _counted(client, query_log, create[0], url, **kwargs)
+    assert response.status_code == BUDGETS[create].status, response.text
+    _check_budget(create, statements, BUDGETS[create].queries)
+
+    ctx = {**ctx, "job_id": response.json()["job_id"]}
+    deadline = time.monotonic() + 60
+    while client.get(f"/briefs/reports/jobs/{ctx['job_id']}", headers=ctx["headers"]).json()["status"] != "done":
+        assert time.monotonic() < deadline, "report job did not finish"
+        time.sleep(0.05)
+
+    for route in (status_route, download):
+        url, kwargs = BUDGETS[route].request(ctx)
+        _reset_caches()
+        response, statements = _counted(client, query_log, route[0], url, **kwargs)
+        assert response.status_code == BUDGETS[route].status, response.text
+        _check_budget(route, statements, BUDGETS[route].queries)
+
+
+def test_every_route_has_budget(app):
+    from fastapi.routing import APIRoute
+
+    routes = {(method, route.path) for route in app.routes if isinstance(route, APIRoute) for method in route.methods}
+    missing = sorted(routes - set(BUDGETS))
+    assert not missing, f"Routes without a query budget: {missing}"
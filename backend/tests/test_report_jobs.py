@@ -0,0 +1,66 @@
+# backend/tests/test_report_jobs.py
+"""
+Фоновые выгрузки отчётов (app.report_jobs): lock задачи освобождается при любой
+ошибке, а завершённые таски не копятся в воркере.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import os
+import uuid
+
+import pytest
+
+
+def _job(state=None):
+    from app import report_jobs
+
+    job_id = str(uuid.uuid4())
+    report_jobs._job_dir(job_id).mkdir(parents=True)
+    if state is not None:
+        (report_jobs._job_dir(job_id) / "job.json").write_text(json.dumps({"job_id": job_id, **state}))
+    return job_id
+
+
+def _assert_unlocked(job_id):
+    from app import report_jobs
+
+    fd = report_jobs._try_lock(job_id)
+    assert fd is not None
+    os.close(fd)
+
+
+def test_lock_released_when_state_is_missing(client):
+    from app import report_jobs
+
+    job_id = _job()
+    client.portal.call(report_jobs._run, job_id)
+    _assert_unlocked(job_id)
+
+
+def test_lock_released_when_state_cannot_be_read(client, monkeypatch):
+    from app import report_jobs
+
+    def unreadable(job_id):
+        raise PermissionError(job_id)
+
+    job_id = _job()
+    monkeypatch.setattr(report_jobs, "read_state", unreadable)
+    with pytest.raises(PermissionError):
+        client.portal.call(report_jobs._run, job_id)
+    _assert_unlocked(job_id)
+
+
+def test_finished_tasks_are_forgotten(client):
+    from app import report_jobs
+
+    job_id = _job({"status": "done"})
+
+    async def poll():
+        for _ in range(3):
+            report_jobs.start(job_id)
+            await asyncio.gather(*report_jobs._tasks.values())
+            await asyncio.sleep(0)
+
+    client.portal.call(poll)
+    assert job_id not in report_jobs._tasks
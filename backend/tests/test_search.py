@@ -0,0 +1,123 @@
+# backend/tests/test_search.py
+"""
+Поиск по ответам брифа (app.search): текст ответов, фильтры «равно» и «больше/меньше»
+по вопросам, постраничная выдача и доступ только владельцу. Тесты идут на SQLite —
+проверяется запасной путь без индексов; выражения для Postgres — в test_search_postgresql_conditions.
+"""
+from __future__ import annotations
+
+import pytest
+
+BRIEF = {
+    "title": "Бриф для поиска",
+    "steps": [{"title": "Шаг", "questions": [
+        {"text": "О проекте", "question_type": "text"},
+        {"text": "Нужен сайт", "question_type": "single_choice", "options": ["Да", "Нет"]},
+        {"text": "Услуги", "question_type": "multi_choice", "options": ["сайт", "бренд", "SMM"]},
+        {"text": "Бюджет", "question_type": "number"},
+        {"text": "Запуск", "question_type": "date"},
+    ]}],
+}
+ANSWERS = [
+    ("Нужен лендинг, бюджет обсуждаем", "Да", ["сайт"], "1500000", "2025-03-01"),
+    ("Ребрендинг сети кофеен", "Нет", ["бренд", "SMM"], "900000", "2025-06-15"),
+    ("Интернет-магазин и реклама", "Да", ["сайт", "SMM"], "2000000.5", "2025-09-30"),
+    ("Пока не знаем", "Нет", [], "не знаю", None),
+]
+
+
+@pytest.fixture(scope="module")
+def brief(client, make_brief):
+    created, headers = make_brief("search", BRIEF)
+    keys = [q["id"] for q in created["steps"][0]["questions"]]
+    sessions = []
+    for values in ANSWERS:
+        answers = {str(key): value for key, value in zip(keys, values) if value is not None}
+        if answers[str(keys[3])] == "не знаю":
+            del answers[str(keys[3])]
+            answers[str(keys[0])] += ", бюджет не знаю"
+        response = client.post("/briefs/submissions", json={"brief_id": created["id"], "answers": answers})
+        assert response.status_code == 200, response.text
+        sessions.append(response.json()["session_id"])
+    return {"id": created["id"], "headers": headers, "keys": keys, "sessions": sessions}
+
+
+def _search(client, brief, **payload):
+    response = client.post(f"/briefs/{brief['id']}/submissions/search", json=payload, headers=brief["headers"])
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _found(client, brief, **payload):
+    return {brief["sessions"].index(item["session_id"]) for item in _search(client, brief, **payload)["items"]}
+
+
+def test_text_query(client, brief):
+    assert _found(client, brief, query="бюджет") == {0, 3}
+    assert _found(client, brief, query="бюджет лендинг") == {0}
+    assert _found(client, brief, query="SMM") == {1, 2}
+    assert _found(client, brief, query="smm") == {1, 2}
+    assert _found(client, brief, query="   ") == {0, 1, 2, 3}
+
+
+def test_equality_filters(client, brief):
+    site, services = brief["keys"][1], brief["keys"][2]
+    assert _found(client, brief, filters=[{"question_id": site, "value": "Да"}]) == {0, 2}
+    # Ответ-список подходит, если содержит значение
+    assert _found(client, brief, filters=[{"question_id": services, "value": "SMM"}]) == {1, 2}
+    assert _found(client, brief, filters=[{"question_id": site, "value": "Да"}, {"question_id": services, "value": "SMM"}]) == {2}
+    assert _found(client, brief, query="Ребрендинг", filters=[{"question_id": site, "value": "Да"}]) == set()
+
+
+def test_range_filters(client, brief):
+    budget, launch = brief["keys"][3], brief["keys"][4]
+    # Числа из формы приходят строками; сравнение числовое, ответ без числа не подходит
+    assert _found(client, brief, filters=[{"question_id": budget, "operator": "gt", "value": 1000000}]) == {0, 2}
+    assert _found(client, brief, filters=[{"question_id": budget, "operator": "lte", "value": 1500000}]) == {0, 1}
+    assert _found(client, brief, filters=[{"question_id": budget, "value": 900000}]) == {1}
+    assert _found(client, brief, filters=[
+        {"question_id": launch, "operator": "gte", "value": "2025-04-01"},
+        {"question_id": launch, "operator": "lt", "value": "2025-12-31"},
+    ]) == {1, 2}
+
+
+def test_results_are_paged_newest_first(client, brief):
+    positive = [{"question_id": brief["keys"][3], "operator": "gt", "value": 0}]
+    first = _search(client, brief, filters=positive, limit=2)
+    assert len(first["items"]) == 2 and first["next_cursor"]
+    found = _search(client, brief, filters=positive, limit=3)
+    assert found["next_cursor"] is None
+    assert [item["session_id"] for item in found["items"]] == [brief["sessions"][i] for i in (2, 1, 0)]
+
+
+def test_search_errors(client, brief, make_owner):
+    url = f"/briefs/{brief['id']}/submissions/search"
+    assert client.post(url, json={"cursor": "bad"}, headers=brief["headers"]).status_code == 400
+    assert client.post(url, json={"filters": [{"question_id": 1, "operator": "like", "value": "x"}]}, headers=brief["headers"]).status_code == 422
+    # Число вне double (inf) в jsonpath не выразить
+    overflow = b'{"filters": [{"question_id": 1, "operator": "gt", "value": 1e999}]}'
+    rejected = client.post(url, content=overflow, headers={**brief["headers"], "Content-Type": "application/json"})
+    assert rejected.status_code == 422
+    assert rejected.json()["detail"][0]["type"] == "finite_number"
+    assert client.post(url, json={}).status_code == 401
+
+    assert client.post(url, json={}, headers=make_owner("stranger")["headers"]).status_code == 404
+
+
+def test_search_postgresql_conditions():
+    from sqlalchemy.dialects import postgresql
+
+    from app import schemas, search
+
+    filters = [
+        schemas.SearchFilter(question_id=3, value="Да"),
+        schemas.SearchFilter(question_id=4, operator="gt", value=1000000),
+        schemas.SearchFilter(question_id=5, operator="lt", value='2025-"12"'),
+    ]
+    text_condition, path_condition = search._postgresql_conditions("бюджет", filters)
+    compiled = text_condition.compile(dialect=postgresql.dialect())
+    # Выражение совпадает с индексом ix_submissions_answers_text
+    assert """jsonb_to_tsvector('russian', answers_data::jsonb, '["string", "numeric"]')""" in str(compiled)
+    assert compiled.params == {"search_query": "бюджет"}
+    path = path_condition.compile(dialect=postgresql.dialect()).params["search_path"]
+    assert path == '$ ? (@."3" == "\\u0414\\u0430" && @."4".double() > 1000000.0 && @."5" < "2025-\\"12\\"")'
@@ -0,0 +1,129 @@
+# backend/tests/test_serialization.py
+"""
+Быстрая сериализация (app.serializers) отдаёт те же байты, что и прежний путь:
+ORM-объекты с selectinload → валидация pydantic-схем → dump_json, как делает FastAPI
+для response_model. Данные подобраны под расхождения JSON-кодировщиков: не-ASCII,
+управляющие символы, float с экспонентой, вложенные структуры в ответах.
+"""
+from __future__ import annotations
+from typing import Any, List
+
+import pytest
+from pydantic import TypeAdapter
+
+BRIEF = {
+    "title": 'Бриф «с кавычками» "и" \\ слэшами',
+    "description": None,
+    "steps": [
+        {"title": "Шаг 1\nс переносом", "description": "Эмодзи 🚀 и   разделитель", "questions": [
+            {"text": "Имя\tтаб", "question_type": "text", "is_required": True},
+            {"text": "Бюджет", "question_type": "single_choice", "options": ["до 100", "больше 100", "\x1f"]},
+        ]},
+        {"title": "Шаг 2", "questions": []},
+        {"title": "Шаг 3", "conditional_logic": {"show_if": {"question_id": 1, "operator": "not_equals", "value": "до 100"}}, "questions": [
+            {"text": "Число", "question_type": "number"},
+            {"text": "Услуги", "question_type": "multi_choice", "options": ["сайт", "бренд"]},
+            {"text": "Файлы", "question_type": "file"},
+        ]},
+    ],
+}
+ANSWER_VALUES: List[Any] = [
+    "Иван 🚀\n\"кавычки\"",
+    "до 100",
+    1e20,
+    ["сайт", "бренд"],
+    [{"name": "ТЗ 🚀.pdf", "url": "/uploads/tz.pdf", "вложенный": [0.1, -0.0, 1.5e-7, 2**53, None, True]}],
+]
+
+
+def _fastapi_json(annotation, value) -> bytes:
+    """Как прежний ответ с response_model: валидация ORM-объектов и dump_json схемы."""
+    adapter = TypeAdapter(annotation)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+@pytest.fixture(scope="module")
+def data(client, make_brief):
+    created, headers = make_brief("serial", BRIEF)
+    brief_ids = [created["id"], client.post("/briefs", json=BRIEF, headers=headers).json()["id"]]
+
+    questions = [q for step in client.get(f"/briefs/{brief_ids[0]}").json()["steps"] for q in step["questions"]]
+    answers = {str(q["id"]): value for q, value in zip(questions, ANSWER_VALUES)}
+    created = [client.post("/briefs/submissions", json={"brief_id": brief_ids[0], "answers": answers}) for _ in range(3)]
+    return {"headers": headers, "brief_ids": brief_ids, "created": created}
+
+
+@pytest.fixture(scope="module")
+def orm_session(app):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.database import engine
+
+    sync_engine = create_engine(engine.url.set(drivername="sqlite"))
+    with Session(sync_engine) as session:
+        yield session
+    sync_engine.dispose()
+
+
+def _orm_briefs(session, *filters):
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+    from app import models
+
+    query = select(models.Brief).options(selectinload(models.Brief.steps).selectinload(models.Step.questions))
+    return session.execute(query.filter(*filters).order_by(models.Brief.id)).scalars().all()
+
+
+def _orm_submissions(session, *filters):
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+    from app import models
+
+    query = select(models.Submission).options(
+        selectinload(models.Submission.brief).selectinload(models.Brief.steps).selectinload(models.Step.questions)
+    )
+    return session.execute(query.filter(*filters).order_by(models.Submission.id)).scalars().all()
+
+
+def test_brief_matches_pydantic(client, data, orm_session):
+    from app import models, schemas
+
+    brief_id = data["brief_ids"][0]
+    (db_brief,) = _orm_briefs(orm_session, models.Brief.id == brief_id)
+    expected = schemas.Brief.model_validate(db_brief, from_attributes=True).model_dump_json().encode("utf-8")
+    assert client.get(f"/briefs/{brief_id}").content == expected
+
+
+def test_user_briefs_match_pydantic(client, data, orm_session):
+    from app import models, schemas
+
+    owner_id = client.get(f"/briefs/{data['brief_ids'][0]}").json()["owner_id"]
+    expected = _fastapi_json(List[schemas.Brief], _orm_briefs(orm_session, models.Brief.owner_id == owner_id))
+    assert client.get("/briefs/", headers=data["headers"]).content == expected
+
+
+def test_submissions_match_pydantic(client, data, orm_session):
+    from app import models, schemas
+
+    brief_id = data["brief_ids"][0]
+    db_submissions = _orm_submissions(orm_session, models.Submission.brief_id == brief_id)
+    assert len(db_submissions) == len(data["created"])
+
+    assert client.get(f"/briefs/{brief_id}/submissions").content == _fastapi_json(List[schemas.Submission], db_submissions)
+    for response, db_submission in zip(data["created"], db_submissions):
+        expected = _fastapi_json(schemas.Submission, db_submission)
+        assert response.content == expected
+        assert client.get(f"/briefs/submission/{db_submission.session_id}").content == expected
+
+
+def test_submission_page_matches_pydantic(client, data, orm_session):
+    from app import models, schemas
+
+    brief_id = data["brief_ids"][0]
+    rows = list(reversed(_orm_submissions(orm_session, models.Submission.brief_id == brief_id)))
+    expected = _fastapi_json(schemas.SubmissionPage, {"brief": rows[0].brief, "items": rows, "next_cursor": None})
+    assert client.get(f"/briefs/{brief_id}/submissions/page").content == expected
+
+
+def test_missing_brief_submissions_empty(client):
+    assert client.get("/briefs/999999/submissions").content == b"[]"
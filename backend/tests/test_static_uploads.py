@@ -0,0 +1,82 @@
+# backend/tests/test_static_uploads.py
+"""
+Раздача /uploads (app.static_uploads): сжатие в фоне после первого запроса, одно на
+файл и кодировку, и отдача оригинала, пока сжатой копии нет или сжать не удалось.
+"""
+from __future__ import annotations
+import asyncio
+import time
+import uuid
+
+import pytest
+
+TEXT = ("Строка текстового вложения для сжатия.\n" * 200).encode("utf-8")
+
+
+@pytest.fixture
+def upload(app):
+    from app.uploads import UPLOAD_DIR
+
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    path = UPLOAD_DIR / f"{uuid.uuid4().hex}.txt"
+    path.write_bytes(TEXT)
+    return path
+
+
+def _wait_for_compression(client) -> None:
+    from app import static_uploads
+
+    async def wait():
+        await asyncio.gather(*static_uploads._pending.values())
+
+    client.portal.call(wait)
+
+
+def test_compressed_copy_is_made_in_background(client, upload):
+    url = f"/uploads/{upload.name}"
+    first = client.get(url, headers={"Accept-Encoding": "br"})
+    assert first.status_code == 200
+    assert "content-encoding" not in first.headers
+    assert first.content == TEXT
+
+    _wait_for_compression(client)
+    second = client.get(url, headers={"Accept-Encoding": "br"})
+    assert second.headers["content-encoding"] == "br"
+    assert second.headers["ETag"].endswith('-br"')
+    assert second.content == TEXT
+
+
+def test_concurrent_first_requests_compress_once(client, upload, monkeypatch):
+    from app import static_uploads
+
+    compress = static_uploads._compress
+    calls = []
+
+    def slow(source, target, encoding):
+        calls.append(encoding)
+        time.sleep(0.2)
+        compress(source, target, encoding)
+
+    monkeypatch.setattr(static_uploads, "_compress", slow)
+    url = f"/uploads/{upload.name}"
+    for _ in range(3):
+        assert client.get(url, headers={"Accept-Encoding": "gzip"}).status_code == 200
+    _wait_for_compression(client)
+    assert calls == ["gzip"]
+    assert client.get(url, headers={"Accept-Encoding": "gzip"}).headers["content-encoding"] == "gzip"
+
+
+def test_failed_compression_serves_original(client, upload, monkeypatch):
+    from app import static_uploads
+
+    def full_disk(source, target, encoding):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(static_uploads, "_compress", full_disk)
+    url = f"/uploads/{upload.name}"
+    for _ in range(2):
+        response = client.get(url, headers={"Accept-Encoding": "br, gzip"})
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert response.content == TEXT
+        _wait_for_compression(client)
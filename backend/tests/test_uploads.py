@@ -0,0 +1,39 @@
+# backend/tests/test_uploads.py
+"""
+Загрузки (app.uploads): имя по хэшу содержимого без дубликатов на диске, 413 при
+превышении UPLOAD_MAX_BYTES без брошенных .part.
+"""
+from __future__ import annotations
+import uuid
+
+
+def _upload(client, name: str, data: bytes):
+    return client.post("/briefs/uploadfile", files={"file": (name, data)})
+
+
+def test_same_bytes_are_stored_once(client):
+    from app.uploads import UPLOAD_DIR
+
+    data = f"вложение {uuid.uuid4()}".encode("utf-8")
+    first = _upload(client, "ТЗ.TXT", data)
+    assert first.status_code == 200, first.text
+    second = _upload(client, "другое имя.txt", data)
+    assert second.json() == first.json()
+
+    filename = first.json()["url"].rsplit("/", 1)[1]
+    assert filename.endswith(".txt") and first.json()["variants"] == {}
+    assert [p.name for p in UPLOAD_DIR.glob(f"{filename.split('.')[0]}*")] == [filename]
+    assert client.get(first.json()["url"]).content == data
+
+
+def test_too_large_upload_leaves_no_part_file(client, monkeypatch):
+    from app import config
+    from app.uploads import UPLOAD_DIR
+
+    monkeypatch.setattr(config, "UPLOAD_MAX_BYTES", 1000)
+    before = set(UPLOAD_DIR.iterdir())
+    # Меньше ранней отсечки по Content-Length: лимит срабатывает уже при копировании
+    response = _upload(client, "big.bin", b"x" * 5000)
+    assert response.status_code == 413
+    assert set(UPLOAD_DIR.iterdir()) == before
+    assert not list(UPLOAD_DIR.glob("*.part"))
@@ -0,0 +1,128 @@
+# backend/tests/test_validation.py
+"""
+Проверка ответов по брифу (app.validation): обязательные вопросы, варианты ответа,
+типы значений, чужие ключи; ошибки по вопросам и пересборка проверок после правки брифа.
+"""
+from __future__ import annotations
+
+import pytest
+
+BRIEF = {
+    "title": "Бриф с проверкой",
+    "steps": [
+        {"title": "Шаг 1", "questions": [
+            {"text": "Имя", "question_type": "text", "is_required": True},
+            {"text": "Канал", "question_type": "single_choice", "options": ["email", "телефон"], "is_required": True},
+            {"text": "Услуги", "question_type": "multi_choice", "options": ["сайт", "бренд"]},
+        ]},
+        {"title": "Шаг 2", "questions": [
+            {"text": "Бюджет", "question_type": "number"},
+            {"text": "Срок", "question_type": "date"},
+            {"text": "Оценка", "question_type": "linear_scale", "options": ["1", "2", "3"]},
+            {"text": "Файлы", "question_type": "file"},
+        ]},
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def brief(make_brief):
+    created, headers = make_brief("validation", BRIEF)
+    names = ("name", "channel", "services", "budget", "deadline", "score", "files")
+    keys = dict(zip(names, (str(q["id"]) for step in created["steps"] for q in step["questions"])))
+    return {"id": created["id"], "headers": headers, "created": created, "keys": keys}
+
+
+def _submit(client, brief, answers):
+    return client.post("/briefs/submissions", json={"brief_id": brief["id"], "answers": answers})
+
+
+def _errors(response):
+    assert response.status_code == 422, response.text
+    return sorted((error["question_id"], error["type"]) for error in response.json()["detail"])
+
+
+def test_valid_form_answers_are_accepted(client, brief):
+    keys = brief["keys"]
+    # Так шлёт форма: число и шкала — строками из <input>, файл — списком загруженных
+    answers = {
+        keys["name"]: "Иван",
+        keys["channel"]: "email",
+        keys["services"]: ["сайт", "бренд"],
+        keys["budget"]: "150000",
+        keys["deadline"]: "2026-12-01",
+        keys["score"]: "3",
+        keys["files"]: [{"name": "tz.pdf", "url": "/uploads/tz.pdf"}],
+    }
+    assert _submit(client, brief, answers).status_code == 200
+    assert _submit(client, brief, {keys["name"]: "Иван", keys["channel"]: "телефон", keys["budget"]: 1.5e6, keys["services"]: []}).status_code == 200
+
+
+def test_invalid_answers_report_each_question(client, brief):
+    keys = brief["keys"]
+    before = client.get(f"/briefs/{brief['id']}/analytics", headers=brief["headers"]).json()["total_submissions"]
+    response = _submit(client, brief, {
+        keys["name"]: "",
+        keys["services"]: ["сайт", "видео"],
+        keys["budget"]: "много",
+        keys["deadline"]: "01.12.2026",
+        keys["score"]: 5,
+        keys["files"]: "tz.pdf",
+        "999999": "чужой",
+    })
+    assert _errors(response) == sorted([
+        (keys["name"], "required"),
+        (keys["channel"], "required"),
+        (keys["services"], "invalid_option"),
+        (keys["budget"], "type_error"),
+        (keys["deadline"], "type_error"),
+        (keys["score"], "invalid_option"),
+        (keys["files"], "type_error"),
+        ("999999", "unknown_question"),
+    ])
+    assert response.json()["detail"][0]["loc"][:2] == ["body", "answers"]
+    assert client.get(f"/briefs/{brief['id']}/analytics", headers=brief["headers"]).json()["total_submissions"] == before
+
+
+def test_invalid_answers_rejected_in_batched_mode(client, brief, monkeypatch):
+    from app import config
+
+    monkeypatch.setattr(config, "SUBMISSION_INGEST_MODE", "batched")
+    assert _errors(_submit(client, brief, {brief["keys"]["name"]: "Иван"})) == [(brief["keys"]["channel"], "required")]
+
+
+def test_invalid_draft_stays_a_draft(client, brief):
+    keys = brief["keys"]
+    session_id = client.post(f"/briefs/{brief['id']}/drafts", json={"answers": {keys["name"]: "Иван"}}).json()["session_id"]
+    assert _errors(client.post(f"/briefs/drafts/{session_id}/finalize", json={})) == [(keys["channel"], "required")]
+    assert client.get(f"/briefs/drafts/{session_id}").status_code == 200
+
+    client.patch(f"/briefs/drafts/{session_id}", json={"version": 0, "answers": {keys["channel"]: "email"}})
+    assert client.post(f"/briefs/drafts/{session_id}/finalize", json={}).status_code == 200
+
+
+def test_validator_follows_brief_update(client, brief):
+    keys = brief["keys"]
+    answers = {keys["name"]: "Иван", keys["channel"]: "email"}
+    assert _submit(client, brief, answers).status_code == 200
+
+    created = brief["created"]
+    update = {"title": created["title"], "steps": [
+        {"id": step["id"], "title": step["title"], "questions": [
+            {k: q[k] for k in ("id", "text", "question_type", "options", "is_required")} for q in step["questions"]
+        ]}
+        for step in created["steps"]
+    ]}
+    update["steps"][0]["questions"][1]["options"] = ["телефон", "мессенджер"]
+    assert client.put(f"/briefs/{brief['id']}", json=update, headers=brief["headers"]).status_code == 200
+
+    assert _errors(_submit(client, brief, answers)) == [(keys["channel"], "invalid_option")]
+    assert _submit(client, brief, {**answers, keys["channel"]: "мессенджер"}).status_code == 200
+
+
+def test_hidden_required_question_is_not_required():
+    from app.validation import SubmissionValidator
+
+    validator = SubmissionValidator({"steps": [{"questions": [{"id": 1, "question_type": "text", "is_required": True}]}]})
+    assert [error["type"] for error in validator.validate({})] == ["required"]
+    assert validator.validate({}, visible_keys=set()) == []
@@ -0,0 +1,102 @@
+# backend/tests/test_versions.py
+"""
+Версии брифов (app.versions): ответ хранит версию, на которую дан, и читается с ней
+после правки брифа; одинаковое содержимое — одна версия; снимок отдаётся как неизменяемый.
+"""
+from __future__ import annotations
+
+import pytest
+
+BRIEF = {
+    "title": "Бриф с версиями",
+    "steps": [{"title": "Шаг", "questions": [
+        {"text": "Канал", "question_type": "single_choice", "options": ["email", "телефон"]},
+    ]}],
+}
+
+
+@pytest.fixture(scope="module")
+def brief(make_brief):
+    created, headers = make_brief("versions", BRIEF)
+    question = created["steps"][0]["questions"][0]
+    return {"id": created["id"], "headers": headers, "created": created, "key": str(question["id"])}
+
+
+def _update(client, brief, text, options):
+    step = brief["created"]["steps"][0]
+    question = step["questions"][0]
+    payload = {"title": BRIEF["title"], "steps": [{"id": step["id"], "title": step["title"], "questions": [
+        {"id": question["id"], "text": text, "question_type": "single_choice", "options": options},
+    ]}]}
+    response = client.put(f"/briefs/{brief['id']}", json=payload, headers=brief["headers"])
+    assert response.status_code == 200, response.text
+    return response
+
+
+def _submit(client, brief, answer):
+    response = client.post("/briefs/submissions", json={"brief_id": brief["id"], "answers": {brief["key"]: answer}})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_submission_keeps_the_version_it_answered(client, brief):
+    old = _submit(client, brief, "email")
+    _update(client, brief, "Как связаться", ["телефон", "мессенджер"])
+    new = _submit(client, brief, "мессенджер")
+    assert old["brief_version_id"] != new["brief_version_id"]
+
+    # Старый ответ читается с тем брифом, который видел респондент
+    stored = client.get(f"/briefs/submission/{old['session_id']}").json()
+    assert stored["brief"]["steps"][0]["questions"][0]["options"] == ["email", "телефон"]
+    assert stored["brief"] == old["brief"]
+
+    listed = {s["session_id"]: s for s in client.get(f"/briefs/{brief['id']}/submissions").json()}
+    assert listed[old["session_id"]]["brief"]["steps"][0]["questions"][0]["text"] == "Канал"
+    assert listed[new["session_id"]]["brief"]["steps"][0]["questions"][0]["text"] == "Как связаться"
+    assert listed[new["session_id"]]["brief"] == client.get(f"/briefs/{brief['id']}").json()
+
+
+def test_same_content_is_one_version(client, brief):
+    response = _update(client, brief, "Канал", ["email", "телефон"])
+    first = _submit(client, brief, "email")["brief_version_id"]
+    assert _update(client, brief, "Канал", ["email", "телефон"]).content == response.content
+    assert _submit(client, brief, "телефон")["brief_version_id"] == first
+
+
+def test_version_snapshot_is_immutable(client, brief):
+    submission = _submit(client, brief, "email")
+    response = client.get(f"/briefs/versions/{submission['brief_version_id']}")
+    assert response.status_code == 200
+    assert response.json() == submission["brief"]
+    assert "immutable" in response.headers["Cache-Control"]
+    revalidated = client.get(f"/briefs/versions/{submission['brief_version_id']}", headers={"If-None-Match": response.headers["ETag"]})
+    assert revalidated.status_code == 304
+    assert client.get("/briefs/versions/999999").status_code == 404
+
+
+def test_batched_submission_records_version(client, brief, monkeypatch):
+    from app import config
+    from app.ingest import submission_ingestor
+
+    monkeypatch.setattr(config, "SUBMISSION_INGEST_MODE", "batched")
+    accepted = client.post("/briefs/submissions", json={"brief_id": brief["id"], "answers": {brief["key"]: "email"}})
+    assert accepted.status_code == 202
+    client.portal.call(submission_ingestor.drain)
+    stored = client.get(f"/briefs/submission/{accepted.json()['session_id']}").json()
+    assert stored["brief_version_id"] is not None
+    assert stored["brief"] == client.get(f"/briefs/{brief['id']}").json()
+
+
+def test_legacy_submission_reads_live_brief(client, brief):
+    from app import crud, schemas
+    from app.database import AsyncSessionLocal
+
+    async def create_legacy():
+        async with AsyncSessionLocal() as db:
+            row = await crud.create_submission(db, schemas.SubmissionCreate(brief_id=brief["id"], answers={}), choice_options={})
+            return row.session_id
+
+    session_id = client.portal.call(create_legacy)
+    stored = client.get(f"/briefs/submission/{session_id}").json()
+    assert stored["brief_version_id"] is None
+    assert stored["brief"] == client.get(f"/briefs/{brief['id']}").json()
@@ -106,6 +106,25 @@ export const createSubmission = (submissionData) => {
   return client.post('/briefs/submissions', submissionData); 
 };
 
+// --- ЧЕРНОВИКИ ОТВЕТОВ (автосохранение по шагам) ---
+
+export const createDraft = (briefId, answers) => {
+  return client.post(`/briefs/${briefId}/drafts`, { answers });
+};
+
+export const getDraft = (sessionId) => {
+  return client.get(`/briefs/drafts/${sessionId}`);
+};
+
+// answers — только изменённые ответы, null удаляет ответ; при устаревшей version — 409
+export const patchDraft = (sessionId, version, answers) => {
+  return client.patch(`/briefs/drafts/${sessionId}`, { version, answers });
+};
+
+export const finalizeDraft = (sessionId, version) => {
+  return client.post(`/briefs/drafts/${sessionId}/finalize`, { version });
+};
+
 // --- ЭНДПОИНТЫ ОТВЕТОВ ПОЛЬЗОВАТЕЛЕЙ ---
 
 export const submitAnswers = async (answersData) => {
@@ -136,6 +155,11 @@ export const getSubmissionsForBrief = (briefId) => {
   return client.get(`/briefs/${briefId}/submissions`);
 };
 
+// Поиск по ответам: search = { query, filters: [{ question_id, operator, value }], cursor, limit }
+export const searchSubmissions = (briefId, search) => {
+  return client.post(`/briefs/${briefId}/submissions/search`, search);
+};
+
 export const getSubmissionById = (sessionId) => {
   return client.get(`/briefs/submission/${sessionId}`);
 };
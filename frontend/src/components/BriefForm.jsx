@@ -1,7 +1,7 @@
 // frontend/src/components/BriefForm.jsx
-import React, { useState, useEffect, useCallback, useMemo } from 'react';
+import React, { useState, useEffect, useCallback, useMemo, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
-import { getBriefById, createSubmission } from '../api/client';
+import { getBriefById, createDraft, getDraft, patchDraft, finalizeDraft } from '../api/client';
 import Question from './Question';
 import ProgressBar from './ProgressBar';
 
@@ -15,43 +15,42 @@ const BriefForm = ({ briefId: propBriefId }) => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
 
+  // Черновик на сервере: session_id и версия, плюс последние сохранённые ответы,
+  // чтобы отправлять только изменения
+  const draftRef = useRef(null);
+  const savedAnswersRef = useRef({});
+  // Сохранения идут по очереди: «Далее» не ждёт ответа, а отправка не должна его обогнать
+  const savingRef = useRef(Promise.resolve());
+  const draftKey = `brief_draft_${briefId}`;
+
   // --- ЛОГИКА УСЛОВНЫХ ПЕРЕХОДОВ ---
+  // Те же правила, что и на сервере (app/logic.py, POST /briefs/{id}/visibility):
+  // условие видит только ответы на видимые вопросы, стоящие раньше, поэтому ответы
+  // скрытого шага не открывают следующие шаги; сервер такие ответы не сохраняет.
   const visibleSteps = useMemo(() => {
     if (!brief?.steps) return [];
 
-    const visible = [];
-    // Проходим по всем шагам, чтобы определить, какие из них видимы
-    for (const step of brief.steps) {
-      const logic = step.conditional_logic;
-      // Если у шага нет логики, он всегда видим
-      if (!logic || !logic.show_if || !logic.show_if.question_id) {
-        visible.push(step);
-        continue;
-      }
-      
+    const matches = (answer, value) => (Array.isArray(answer) ? answer.includes(value) : answer === value);
+    const isShown = (logic, seen) => {
+      // Если у шага или вопроса нет логики, он всегда видим
+      if (!logic || !logic.show_if || logic.show_if.question_id == null) return true;
       const { question_id, operator, value } = logic.show_if;
-      const actualAnswer = answers[question_id];
-
-      let shouldShow = false;
-      // Проверяем условие
-      if (operator === 'equals') {
-        if (Array.isArray(actualAnswer)) { // для чекбоксов
-          shouldShow = actualAnswer.includes(value);
-        } else { // для радио и текста
-          shouldShow = actualAnswer === value;
-        }
-      } else if (operator === 'not_equals') {
-        if (Array.isArray(actualAnswer)) {
-            shouldShow = !actualAnswer.includes(value);
-        } else {
-            shouldShow = actualAnswer !== value;
-        }
-      }
-      // Здесь можно добавить другие операторы: 'contains', 'greater_than', etc.
+      const actualAnswer = seen[question_id];
+      if (operator === 'equals' || operator === 'contains') return matches(actualAnswer, value);
+      if (operator === 'not_equals' || operator === 'not_contains') return !matches(actualAnswer, value);
+      return false;
+    };
 
-      if (shouldShow) {
-        visible.push(step);
-      }
+    const seen = {};
+    const visible = [];
+    for (const step of brief.steps) {
+      if (!isShown(step.conditional_logic, seen)) continue;
+      const questions = step.questions.filter(q => {
+        if (!isShown(q.conditional_logic, seen)) return false;
+        if (q.id in answers) seen[q.id] = answers[q.id];
+        return true;
+      });
+      visible.push({ ...step, questions });
     }
     return visible;
   }, [brief, answers]); // Пересчитываем каждый раз при изменении брифа или ответов
@@ -75,6 +74,22 @@ const BriefForm = ({ briefId: propBriefId }) => {
       try {
         const response = await getBriefById(briefId);
         setBrief(response.data);
+        // Восстанавливаем незаконченный черновик после закрытия вкладки
+        const sessionId = localStorage.getItem(draftKey);
+        if (sessionId) {
+          try {
+            const { data } = await getDraft(sessionId);
+            draftRef.current = { sessionId, version: data.version };
+            savedAnswersRef.current = data.answers_data;
+            // Ответы на вопросы, удалённые из брифа, не показываем; при сохранении они уйдут из черновика
+            const questionIds = new Set(response.data.steps.flatMap(s => s.questions.map(q => String(q.id))));
+            setAnswers(Object.fromEntries(
+              Object.entries(data.answers_data).filter(([key]) => questionIds.has(key))
+            ));
+          } catch (draftErr) {
+            localStorage.removeItem(draftKey);
+          }
+        }
       } catch (err) {
         setError('Не удалось загрузить бриф.');
         console.error(err);
@@ -83,7 +98,7 @@ const BriefForm = ({ briefId: propBriefId }) => {
       }
     };
     fetchBrief();
-  }, [briefId]);
+  }, [briefId, draftKey]);
 
   // Сброс индекса, если текущий шаг исчез из видимых
   useEffect(() => {
@@ -100,18 +115,68 @@ const BriefForm = ({ briefId: propBriefId }) => {
     setAnswers(prev => ({ ...prev, [questionId]: value }));
   }, []);
   
+  // Сохраняет в черновик только ответы, изменённые с прошлого сохранения
+  const persistDraft = async (snapshot) => {
+    const saved = savedAnswersRef.current;
+    const changes = {};
+    for (const [key, value] of Object.entries(snapshot)) {
+      if (JSON.stringify(value) !== JSON.stringify(saved[key])) changes[key] = value ?? null;
+    }
+    for (const key of Object.keys(saved)) {
+      if (!(key in snapshot)) changes[key] = null;
+    }
+
+    if (!draftRef.current) {
+      const { data } = await createDraft(brief.id, snapshot);
+      draftRef.current = { sessionId: data.session_id, version: data.version };
+      localStorage.setItem(draftKey, data.session_id);
+    } else if (Object.keys(changes).length > 0) {
+      const draft = draftRef.current;
+      try {
+        const { data } = await patchDraft(draft.sessionId, draft.version, changes);
+        draft.version = data.version;
+      } catch (err) {
+        // Черновик изменили в другой вкладке: изменения этой вкладки применяются поверх
+        if (err.response?.status !== 409) throw err;
+        const { data } = await patchDraft(draft.sessionId, err.response.data.detail.version, changes);
+        draft.version = data.version;
+      }
+    }
+    savedAnswersRef.current = snapshot;
+  };
+
+  const saveDraft = () => {
+    const snapshot = answers;
+    savingRef.current = savingRef.current.catch(() => {}).then(() => persistDraft(snapshot));
+    return savingRef.current;
+  };
+
+  const saveDraftQuietly = () => {
+    saveDraft().catch(err => console.error("Не удалось сохранить черновик:", err));
+  };
+
   const handleSubmit = async (e) => {
     e.preventDefault();
     try {
-      await createSubmission({ brief_id: brief.id, answers });
+      await saveDraft();
+      await finalizeDraft(draftRef.current.sessionId, draftRef.current.version);
+      localStorage.removeItem(draftKey);
       navigate('/thank-you');
     } catch (err) {
       console.error("Ошибка при отправке брифа:", err);
+      // 422: сервер вернул ошибки по вопросам (обязательный без ответа, вариант не из списка)
+      const errors = err.response?.status === 422 ? err.response.data.detail : null;
+      if (Array.isArray(errors)) {
+        const questions = Object.fromEntries(brief.steps.flatMap(step => step.questions).map(q => [String(q.id), q.text]));
+        alert('Проверьте ответы:\n' + errors.map(e => `${questions[e.question_id] || e.question_id}: ${e.msg}`).join('\n'));
+        return;
+      }
       alert('Произошла ошибка при отправке.');
     }
   };
 
   const nextStep = () => {
+    saveDraftQuietly();
     setVisibleStepIndex(prev => Math.min(prev + 1, visibleSteps.length - 1));
   };
 
@@ -1,7 +1,7 @@
 // frontend/src/components/ResultsPage.jsx
 import React, { useState, useEffect } from 'react';
 import { useParams, Link } from 'react-router-dom';
-import { getSubmissionsForBrief } from '../api/client';
+import { getSubmissionsForBrief, searchSubmissions } from '../api/client';
 import { DocumentTextIcon } from '@heroicons/react/24/outline';
 
 const ResultsPage = () => {
@@ -9,6 +9,9 @@ const ResultsPage = () => {
   const [submissions, setSubmissions] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [query, setQuery] = useState('');
+  const [found, setFound] = useState(null);
+  const [searching, setSearching] = useState(false);
 
   useEffect(() => {
     const fetchSubmissions = async () => {
@@ -25,14 +28,46 @@ const ResultsPage = () => {
     fetchSubmissions();
   }, [briefId]);
 
+  const handleSearch = async (e) => {
+    e.preventDefault();
+    if (!query.trim()) {
+      setFound(null);
+      return;
+    }
+    setSearching(true);
+    try {
+      const response = await searchSubmissions(briefId, { query });
+      setFound(response.data.items);
+    } catch (err) {
+      setError('Не удалось выполнить поиск.');
+      console.error(err);
+    } finally {
+      setSearching(false);
+    }
+  };
+
+  const shown = found ?? submissions;
+
   if (loading) return <div className="text-center p-8">Загрузка ответов...</div>;
   if (error) return <div className="p-4 bg-red-100 text-red-700 rounded-md">{error}</div>;
 
   return (
     <div>
       <h1 className="text-2xl font-bold text-gray-900 mb-4">Ответы на бриф</h1>
-      {submissions.length === 0 ? (
-        <p className="text-gray-500">Пока нет ни одного ответа на этот бриф.</p>
+      <form onSubmit={handleSearch} className="flex gap-2 mb-4">
+        <input
+          type="search"
+          value={query}
+          onChange={(e) => setQuery(e.target.value)}
+          placeholder="Поиск по тексту ответов"
+          className="flex-1 rounded-md border border-gray-300 px-3 py-2 text-sm"
+        />
+        <button type="submit" disabled={searching} className="rounded-md bg-indigo-600 px-4 py-2 text-sm font-medium text-white hover:bg-indigo-700 disabled:opacity-50">
+          Найти
+        </button>
+      </form>
+      {shown.length === 0 ? (
+        <p className="text-gray-500">{found ? 'Ничего не найдено.' : 'Пока нет ни одного ответа на этот бриф.'}</p>
       ) : (
         <div className="mt-8 flow-root">
           <div className="-my-2 -mx-4 overflow-x-auto sm:-mx-6 lg:-mx-8">
@@ -52,7 +87,7 @@ const ResultsPage = () => {
                   </tr>
                 </thead>
                 <tbody className="divide-y divide-gray-200 bg-white">
-                  {submissions.map((submission) => (
+                  {shown.map((submission) => (
                     <tr key={submission.session_id}>
                       <td className="whitespace-nowrap py-4 pl-4 pr-3 text-sm font-mono text-gray-500 sm:pl-0">
                         {submission.session_id.split('-')[0]}...